@@ -0,0 +1,192 @@
+import os
+import sqlite3
+from motor import *
+
+"""!
+@file arquivo.py
+@brief Arquivo persistente dos resultados dos cálculos estatísticos, por par de nós.
+Guarda numa base de dados SQLite ('output/resultados.sqlite') o resultado do TSA e do Suurballe em
+cada par (custos, número de saltos, sucesso e tempo de cálculo), identificado pelo hash da rede, pela
+versão do motor e pelo modo (disjuntos em nós ou em ligações). As perguntas sobre os resultados
+(p.ex., os pares em que o TSA falhou) são respondidas a partir do arquivo, sem repetir os cálculos.
+"""
+
+STORE_PATH = os.path.join("output", "resultados.sqlite")
+
+# colunas de cada par, pela ordem das linhas passadas a `save_results`
+STORE_COLUMNS = ('origem', 'destino',
+                 'custo_tsa_1', 'custo_tsa_2', 'custo_sur_1', 'custo_sur_2',
+                 'saltos_tsa_1', 'saltos_tsa_2', 'saltos_sur_1', 'saltos_sur_2',
+                 'tsa_resolvido', 'sur_resolvido', 'tempo')
+
+# erro percentual do custo total do TSA em relação ao do Suurballe (em SQL)
+ERRO_SQL = ("((custo_tsa_1 + custo_tsa_2) - (custo_sur_1 + custo_sur_2)) "
+            "/ (custo_sur_1 + custo_sur_2) * 100")
+
+def open_store(caminho=STORE_PATH):
+    """!
+    @brief Abre (e cria, se não existir) o arquivo dos resultados.
+
+    @param caminho Caminho do ficheiro SQLite (por omissão, 'output/resultados.sqlite').
+    @return sqlite3.Connection com a tabela `pares` criada.
+    """
+
+    os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+    conexao = sqlite3.connect(caminho)
+    conexao.execute("""
+        CREATE TABLE IF NOT EXISTS pares (
+            rede TEXT, hash TEXT, versao INTEGER, ligacoes INTEGER,
+            origem TEXT, destino TEXT,
+            custo_tsa_1 REAL, custo_tsa_2 REAL, custo_sur_1 REAL, custo_sur_2 REAL,
+            saltos_tsa_1 INTEGER, saltos_tsa_2 INTEGER, saltos_sur_1 INTEGER, saltos_sur_2 INTEGER,
+            tsa_resolvido INTEGER, sur_resolvido INTEGER, tempo REAL,
+            PRIMARY KEY (hash, versao, ligacoes, origem, destino))""")
+    return conexao
+
+# ------------------------------------------------------
+def store_key(G, ligacoes):
+    """!
+    @brief Identificação de uma rede no arquivo: (hash do ficheiro, versão do motor, modo).
+
+    @param G O grafo criado por `load_network` (com `G.graph['hash']`).
+    @param ligacoes Booleano. Se True, o modo é o dos caminhos disjuntos em ligações.
+    @return Tuple (hash, versao, ligacoes), ou None se o grafo não vier de um ficheiro.
+    """
+
+    if 'hash' not in G.graph:
+        return None
+    return G.graph['hash'], ENGINE_VERSION, int(ligacoes)
+
+# ------------------------------------------------------
+def save_results(G, linhas, ligacoes=False, caminho=STORE_PATH):
+    """!
+    @brief Acrescenta (ou substitui) os resultados de vários pares no arquivo, numa só transação.
+
+    @param G O grafo criado por `load_network`.
+    @param linhas Lista de tuplos com os valores de `STORE_COLUMNS` de cada par (None nos
+                  custos e saltos dos caminhos que não existem; tempo em segundos ou None).
+    @param ligacoes Booleano. Se True, os resultados são os dos caminhos disjuntos em ligações.
+    @param caminho Caminho do ficheiro SQLite.
+    """
+
+    chave = store_key(G, ligacoes)
+    if chave is None or not linhas:
+        return
+
+    rede = os.path.splitext(os.path.basename(G.graph.get('ficheiro', '')))[0]
+    colunas = ('rede', 'hash', 'versao', 'ligacoes') + STORE_COLUMNS
+    sql = f"INSERT OR REPLACE INTO pares ({', '.join(colunas)}) VALUES ({', '.join('?' * len(colunas))})"
+    conexao = open_store(caminho)
+    try:
+        with conexao:
+            conexao.executemany(sql, ((rede,) + chave + tuple(linha) for linha in linhas))
+    finally:
+        conexao.close()
+
+# ------------------------------------------------------
+def clear_results(G, ligacoes=False, caminho=STORE_PATH):
+    """!
+    @brief Apaga do arquivo os resultados de uma rede (com a versão atual do motor e o modo indicado).
+
+    @param G O grafo criado por `load_network`.
+    @param ligacoes Booleano. Se True, apaga os resultados dos caminhos disjuntos em ligações.
+    @param caminho Caminho do ficheiro SQLite.
+    """
+
+    chave = store_key(G, ligacoes)
+    if chave is None or not os.path.exists(caminho):
+        return
+
+    conexao = open_store(caminho)
+    try:
+        with conexao:
+            conexao.execute("DELETE FROM pares WHERE hash = ? AND versao = ? AND ligacoes = ?", chave)
+    finally:
+        conexao.close()
+
+# ------------------------------------------------------
+def load_record(G, ligacoes=False, caminho=STORE_PATH):
+    """!
+    @brief Lê do arquivo o registo de uma rede, no formato de `sweep_record`.
+
+    @param G O grafo criado por `load_network`.
+    @param ligacoes Booleano. Se True, lê os resultados dos caminhos disjuntos em ligações.
+    @param caminho Caminho do ficheiro SQLite.
+    @return dict: `{(origem, destino): (custo_tsa, custo_sur)}`, com o custo total dos dois
+            caminhos de cada algoritmo (None se não os encontrou). Vazio se a rede (com a
+            versão atual do motor) não estiver no arquivo.
+    """
+
+    chave = store_key(G, ligacoes)
+    if chave is None or not os.path.exists(caminho):
+        return {}
+
+    conexao = open_store(caminho)
+    try:
+        linhas = conexao.execute(
+            """SELECT origem, destino, custo_tsa_1, custo_tsa_2, custo_sur_1, custo_sur_2,
+                      tsa_resolvido, sur_resolvido
+               FROM pares WHERE hash = ? AND versao = ? AND ligacoes = ?""", chave).fetchall()
+    finally:
+        conexao.close()
+
+    return {(origem, destino): (c1_tsa + c2_tsa if tsa else None, c1_sur + c2_sur if sur else None)
+            for origem, destino, c1_tsa, c2_tsa, c1_sur, c2_sur, tsa, sur in linhas}
+
+# ------------------------------------------------------
+def query_pairs(G, condicao="1", parametros=(), ordem=None, limite=None, colunas=STORE_COLUMNS,
+                ligacoes=False, caminho=STORE_PATH):
+    """!
+    @brief Consulta os resultados guardados de uma rede.
+
+    @param G O grafo criado por `load_network`.
+    @param condicao Condição SQL sobre as colunas de `STORE_COLUMNS` (p.ex., "tsa_resolvido = 0").
+    @param parametros Valores dos '?' da condição.
+    @param ordem Opcional. Expressão SQL de ordenação (p.ex., "tempo DESC").
+    @param limite Opcional. Número máximo de pares devolvidos.
+    @param colunas Colunas (ou expressões SQL) a devolver.
+    @param ligacoes Booleano. Se True, consulta os resultados dos caminhos disjuntos em ligações.
+    @param caminho Caminho do ficheiro SQLite.
+    @return list: Tuplos com os valores das colunas pedidas, um por par.
+    """
+
+    chave = store_key(G, ligacoes)
+    if chave is None or not os.path.exists(caminho):
+        return []
+
+    sql = f"SELECT {', '.join(colunas)} FROM pares WHERE hash = ? AND versao = ? AND ligacoes = ? AND ({condicao})"
+    if ordem is not None:
+        sql += f" ORDER BY {ordem}"
+    if limite is not None:
+        sql += f" LIMIT {int(limite)}"
+
+    conexao = open_store(caminho)
+    try:
+        return conexao.execute(sql, chave + tuple(parametros)).fetchall()
+    finally:
+        conexao.close()
+
+# ------------------------------------------------------
+def tsa_failures(G, ligacoes=False, caminho=STORE_PATH):
+    """!
+    @brief Pares em que o TSA não encontrou dois caminhos disjuntos.
+
+    @return list: Tuplos (origem, destino, sur_resolvido), com sur_resolvido = 1 se o
+            Suurballe encontrou os dois caminhos nesse par (armadilhas do TSA).
+    """
+
+    return query_pairs(G, "tsa_resolvido = 0", colunas=('origem', 'destino', 'sur_resolvido'),
+                       ligacoes=ligacoes, caminho=caminho)
+
+# ------------------------------------------------------
+def top_tsa_errors(G, n=10, ligacoes=False, caminho=STORE_PATH):
+    """!
+    @brief Os n pares com maior erro do TSA em relação ao Suurballe.
+
+    @return list: Tuplos (origem, destino, erro), com o erro percentual do custo total do
+            TSA, por ordem decrescente do erro.
+    """
+
+    return query_pairs(G, "tsa_resolvido = 1 AND sur_resolvido = 1", ordem="erro DESC", limite=n,
+                       colunas=('origem', 'destino', f"{ERRO_SQL} AS erro"),
+                       ligacoes=ligacoes, caminho=caminho)
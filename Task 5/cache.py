@@ -0,0 +1,311 @@
+import os
+import shutil
+import hashlib
+import tempfile
+import numpy as np
+from functions import *
+from csr import *
+
+"""!
+@file cache.py
+@brief Módulo da cache compilada das redes.
+Guarda cada rede já lida num ficheiro binário (.npz) em 'output/.cache', identificado pelo hash
+do conteúdo do ficheiro de texto. As leituras seguintes da mesma rede não voltam a analisar o texto.
+Guarda também, quando é pedido, o grafo no formato CSR em disco (ver `save_csr`), que é aberto
+mapeado em memória sem criar o grafo NetworkX. As redes grandes (ver `GRANDE_REDE`) são sempre
+abertas assim (`load_large_network`).
+"""
+
+CACHE_DIR = os.path.join("output", ".cache")
+
+# versão do formato dos ficheiros da cache (entradas de outras versões são ignoradas)
+CACHE_VERSAO = 3
+
+# arrays de G.graph guardados com o grafo (procuras e dados das ligações)
+GRAPH_ARRAYS = ('demands', 'demand_ids', 'links', 'link_ids', 'modules', 'modules_ptr')
+
+# umask do processo, lida uma só vez ao importar o módulo (os.umask altera-a para todo o
+# processo, pelo que não pode ser consultada enquanto outras threads criam ficheiros)
+UMASK = os.umask(0)
+os.umask(UMASK)
+
+# permissões das entradas da cache: as de um ficheiro criado com open() (0o666 sem a umask)
+CACHE_MODO = 0o666 & ~UMASK
+
+# tamanho (em bytes) a partir do qual um ficheiro de rede é aberto no formato CSR em disco
+# (`load_large_network`), sem grafo NetworkX: com centenas de milhares de ligações, o grafo
+# NetworkX ocupa vários GB
+GRANDE_REDE = 16 * 2**20
+
+def file_hash(caminho):
+    """!
+    @brief Calcula o hash (SHA-1) do conteúdo de um ficheiro.
+
+    O ficheiro é lido em blocos, para não o carregar todo para memória.
+
+    @param caminho Caminho para o ficheiro.
+    @return str: O hash do conteúdo, em hexadecimal.
+    """
+
+    h = hashlib.sha1()
+    with open(caminho, 'rb') as file:
+        for bloco in iter(lambda: file.read(1 << 20), b''):
+            h.update(bloco)
+    return h.hexdigest()
+
+# ------------------------------------------------------
+def cache_path(caminho, hash_ficheiro):
+    """!
+    @brief Devolve o caminho da entrada da cache de uma rede.
+
+    O nome da entrada tem o nome do ficheiro (com a extensão) e um hash curto do diretório
+    onde está, pelo que ficheiros com o mesmo nome noutros diretórios (ou com outra
+    extensão, como 'abilene.txt' e 'abilene.xml') têm entradas diferentes.
+
+    @param caminho Caminho para o ficheiro da rede.
+    @param hash_ficheiro Hash do conteúdo do ficheiro (ver `file_hash`).
+    @return str: Caminho do ficheiro .npz correspondente
+            (p.ex., 'output/.cache/abilene.txt-<diretório>-<hash>.npz').
+    """
+
+    diretorio = hashlib.sha1(os.path.abspath(os.path.dirname(caminho)).encode()).hexdigest()[:8]
+    return os.path.join(CACHE_DIR, f"{os.path.basename(caminho)}-{diretorio}-{hash_ficheiro[:16]}.npz")
+
+# ------------------------------------------------------
+def load_network(caminho):
+    """!
+    @brief Lê uma rede, usando a cache compilada sempre que possível.
+
+    Se existir uma entrada na cache para o conteúdo atual do ficheiro, o grafo é
+    reconstruído diretamente dos arrays guardados, sem analisar o texto.
+    Caso contrário, o ficheiro é lido com `retrieve_data` (ou `retrieve_xml_data`,
+    para ficheiros .xml) e o resultado é guardado na cache. As entradas antigas da mesma rede (de versões anteriores do ficheiro)
+    são apagadas, pelo que alterar o ficheiro invalida a cache automaticamente.
+
+    @param caminho Caminho para o ficheiro da rede (formato SNDlib nativo ou XML).
+    @return Tuple (G, node_mapping), como em `retrieve_data`.
+            O caminho e o hash do ficheiro ficam guardados em `G.graph['ficheiro']`
+            e `G.graph['hash']`.
+    """
+
+    hash_ficheiro = file_hash(caminho)
+    entrada = cache_path(caminho, hash_ficheiro)
+
+    G, node_mapping = None, None
+    if os.path.exists(entrada):
+        G, node_mapping = read_cache(entrada)
+
+    if G is None:
+        if caminho.endswith('.xml'):
+            G, node_mapping = retrieve_xml_data(caminho)
+        else:
+            with open(caminho, 'r') as file:
+                G, node_mapping = retrieve_data(file)
+        write_cache(entrada, G, node_mapping)
+
+    G.graph['ficheiro'] = caminho
+    G.graph['hash'] = hash_ficheiro
+    return G, node_mapping
+
+# ------------------------------------------------------
+def large_network(caminho):
+    """!
+    @brief Indica se um ficheiro de rede deve ser aberto no formato CSR em disco (ver `GRANDE_REDE`).
+
+    @param caminho Caminho para o ficheiro da rede.
+    @return Booleano. True se o ficheiro tiver pelo menos `GRANDE_REDE` bytes.
+    """
+
+    return os.path.getsize(caminho) >= GRANDE_REDE
+
+# ------------------------------------------------------
+def load_large_network(caminho):
+    """!
+    @brief Abre uma rede no formato CSR em disco (`load_csr`), sem criar o grafo NetworkX.
+
+    O resultado é usado pelos cálculos estatísticos no lugar de G: `engine_graph` cria o
+    motor com `csr_engine` sobre os arrays mapeados em memória, os resultados ficam no
+    arquivo (ver `save_results`, com o mesmo hash que teria o grafo de `load_network`) e os
+    processos dos cálculos em paralelo abrem o mesmo diretório (ver `network_csr`).
+
+    @param caminho Caminho para o ficheiro da rede (formato SNDlib nativo ou XML).
+    @return RedeCSR, com o caminho e o hash do ficheiro em `graph['ficheiro']` e `graph['hash']`.
+    """
+
+    hash_ficheiro = file_hash(caminho)
+    return RedeCSR({'ficheiro': caminho, 'hash': hash_ficheiro}, load_csr(caminho, hash_ficheiro))
+
+# ------------------------------------------------------
+def network_size(G):
+    """!
+    @brief Devolve o número de nós e de ligações de uma rede (grafo NetworkX ou `RedeCSR`).
+
+    @param G O grafo criado por `load_network`, ou a rede de `load_large_network`.
+    @return Tuple (nos, ligacoes).
+    """
+
+    if isinstance(G, RedeCSR):
+        return len(G.grafo.nomes), len(G.grafo.ligacoes)
+    return G.number_of_nodes(), len(G.graph.get('links', ()))
+
+# ------------------------------------------------------
+def read_cache(entrada):
+    """!
+    @brief Lê uma entrada da cache e reconstrói o grafo.
+
+    @param entrada Caminho do ficheiro .npz.
+    @return Tuple (G, node_mapping), ou (None, None) se a entrada for de outra versão
+            do formato ou estiver corrompida.
+    """
+
+    try:
+        with np.load(entrada) as dados:
+            if int(dados['versao']) != CACHE_VERSAO:
+                return None, None
+            grafo = GrafoCSR(*(dados[campo] for campo in CSR_CAMPOS))
+            arrays = {chave: dados[chave] for chave in GRAPH_ARRAYS}
+    except (OSError, KeyError, ValueError):
+        return None, None
+
+    G, node_mapping = csr_to_graph(grafo)
+    G.graph.update(arrays)
+    return G, node_mapping
+
+# ------------------------------------------------------
+def write_cache(entrada, G, node_mapping):
+    """!
+    @brief Guarda um grafo na cache e apaga as entradas antigas da mesma rede.
+
+    O ficheiro é escrito com um nome temporário único (um por escrita, mesmo entre threads
+    do mesmo processo) e só depois renomeado, para que uma leitura em simultâneo nunca
+    encontre uma entrada incompleta. O ficheiro temporário é criado só com permissões para
+    o dono (`tempfile.mkstemp`); antes de ser renomeado recebe as permissões normais
+    (`CACHE_MODO`), para que a cache possa ser partilhada por vários utilizadores.
+
+    @param entrada Caminho do ficheiro .npz a criar.
+    @param G O grafo criado por `retrieve_data`.
+    @param node_mapping Dicionário que mapeia o índice numérico para o nome do nó.
+    """
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    grafo = graph_to_csr(G, node_mapping)
+
+    descritor, temporario = tempfile.mkstemp(prefix=os.path.basename(entrada) + '.', suffix='.tmp', dir=CACHE_DIR)
+    try:
+        with os.fdopen(descritor, 'wb') as file:
+            np.savez(file, versao=CACHE_VERSAO, **{chave: G.graph[chave] for chave in GRAPH_ARRAYS},
+                     **grafo._asdict())
+        os.chmod(temporario, CACHE_MODO)
+        os.replace(temporario, entrada)
+    except BaseException:
+        os.remove(temporario)
+        raise
+
+    # entradas antigas do mesmo ficheiro: '<nome>-<diretório>-<hash>.npz'
+    prefixo = os.path.basename(entrada).rsplit('-', 1)[0] + '-'
+    for ficheiro in os.listdir(CACHE_DIR):
+        if ficheiro.startswith(prefixo) and ficheiro.endswith('.npz') and ficheiro != os.path.basename(entrada):
+            if len(ficheiro) == len(prefixo) + 16 + len('.npz'):
+                # outra thread do catálogo pode já ter apagado a mesma entrada
+                try:
+                    os.remove(os.path.join(CACHE_DIR, ficheiro))
+                except FileNotFoundError:
+                    pass
+
+# ------------------------------------------------------
+def csr_path(caminho, hash_ficheiro):
+    """!
+    @brief Devolve o caminho do grafo em disco (formato CSR, ver `save_csr`) de uma rede.
+
+    @param caminho Caminho para o ficheiro da rede.
+    @param hash_ficheiro Hash do conteúdo do ficheiro (ver `file_hash`).
+    @return str: Caminho do diretório, junto da entrada da cache compilada
+            (p.ex., 'output/.cache/abilene.txt-<diretório>-<hash>.csr').
+    """
+
+    return os.path.splitext(cache_path(caminho, hash_ficheiro))[0] + '.csr'
+
+# ------------------------------------------------------
+def load_csr(caminho, hash_ficheiro=None):
+    """!
+    @brief Abre uma rede no formato CSR em disco, mapeada em memória, sem criar um grafo NetworkX.
+
+    Na primeira vez (para cada conteúdo do ficheiro) a rede é lida com `sndlib_to_csr`
+    (ou, para ficheiros .xml, com `retrieve_xml_data`) e guardada com `write_csr`;
+    as chamadas seguintes, também noutros processos, só abrem os arrays com `open_csr`.
+    O motor dos algoritmos é criado a partir do resultado com `csr_engine`.
+
+    @param caminho Caminho para o ficheiro da rede (formato SNDlib nativo ou XML).
+    @param hash_ficheiro Opcional. Hash do conteúdo do ficheiro, se já tiver sido calculado
+                         (ver `file_hash`).
+    @return GrafoCSR cujos arrays são `numpy.memmap` (os nós pela ordem do `node_mapping`
+            de `retrieve_data`).
+    """
+
+    if hash_ficheiro is None:
+        hash_ficheiro = file_hash(caminho)
+    entrada = csr_path(caminho, hash_ficheiro)
+    if not os.path.isdir(entrada):
+        if caminho.endswith('.xml'):
+            grafo = graph_to_csr(*retrieve_xml_data(caminho))
+        else:
+            with open(caminho, 'r') as file:
+                grafo = sndlib_to_csr(file)
+        write_csr(entrada, grafo)
+    return open_csr(entrada)
+
+# ------------------------------------------------------
+def network_csr(G):
+    """!
+    @brief Devolve o caminho do grafo em disco de uma rede lida com `load_network`, criando-o se preciso.
+
+    Se o diretório ainda não existir, é criado a partir de G (com a mesma numeração dos nós
+    e dos arcos de `engine_graph`), pelo que um motor aberto a partir dele (`attach_engine`)
+    dá os mesmos índices que o motor de G.
+
+    @param G O grafo criado por `load_network`, ou a rede de `load_large_network`.
+    @return str: Caminho do diretório, ou None se o grafo não vier de um ficheiro ou tiver
+            sido alterado depois de lido (ver `graph_changed`).
+    """
+
+    if 'ficheiro' not in G.graph or 'hash' not in G.graph or G.graph.get('versao_grafo', 0):
+        return None
+    entrada = csr_path(G.graph['ficheiro'], G.graph['hash'])
+    if not os.path.isdir(entrada):
+        write_csr(entrada, G.grafo if isinstance(G, RedeCSR) else graph_to_csr(G, dict(enumerate(G.nodes))))
+    return entrada
+
+# ------------------------------------------------------
+def write_csr(entrada, grafo):
+    """!
+    @brief Guarda um grafo no formato CSR em disco e apaga os diretórios antigos da mesma rede.
+
+    Como em `write_cache`, o diretório é escrito com um nome temporário único e só depois
+    renomeado, com as permissões normais. Se outro processo tiver criado o mesmo diretório
+    entretanto, o temporário é apagado (o conteúdo é o mesmo).
+
+    @param entrada Caminho do diretório a criar (ver `csr_path`).
+    @param grafo GrafoCSR a guardar.
+    """
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    temporario = tempfile.mkdtemp(prefix=os.path.basename(entrada) + '.', suffix='.tmp', dir=CACHE_DIR)
+    try:
+        save_csr(grafo, temporario)
+        os.chmod(temporario, 0o777 & ~UMASK)
+        try:
+            os.rename(temporario, entrada)
+        except OSError:
+            if not os.path.isdir(entrada):
+                raise
+            shutil.rmtree(temporario)
+    except BaseException:
+        shutil.rmtree(temporario, ignore_errors=True)
+        raise
+
+    # diretórios antigos do mesmo ficheiro: '<nome>-<diretório>-<hash>.csr'
+    prefixo = os.path.basename(entrada).rsplit('-', 1)[0] + '-'
+    for ficheiro in os.listdir(CACHE_DIR):
+        if ficheiro.startswith(prefixo) and ficheiro.endswith('.csr') and ficheiro != os.path.basename(entrada):
+            if len(ficheiro) == len(prefixo) + 16 + len('.csr'):
+                shutil.rmtree(os.path.join(CACHE_DIR, ficheiro), ignore_errors=True)
@@ -1,30 +1,74 @@
+import os
 import itertools
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from functions import *
 from menus import *
+from rotas import *
+from arquivo import *
 
 """!
 @file calculos.py
 @brief Módulo para cálculos estatísticos relacionados com a resolução de caminhos em grafos.
-Este módulo contém funções para calcular taxas de resolução, taxas de resolução ótima e erro médio entre algoritmos de caminhos disjuntos como TSA e Suurballe.
+Este módulo contém funções para calcular taxas de resolução, taxas de resolução ótima e erro médio entre algoritmos de caminhos disjuntos como TSA e Suurballe, com caminhos disjuntos em nós ou em ligações.
 """
 
-def calculos_auxiliares(G, otimo, calcular_erro_medio):
+# número de processos usados por omissão nos cálculos estatísticos (1: em série; 0: um por CPU)
+WORKERS = 1
+
+# número de origens de cada bloco enviado a um processo (blocos pequenos equilibram melhor a
+# carga e limitam o trabalho perdido se o cálculo for interrompido)
+ORIGENS_POR_BLOCO = 2
+
+# intervalo (em segundos) entre os pontos de retoma guardados durante os cálculos estatísticos
+CHECKPOINT_SEGUNDOS = 60
+
+# se True, os pares já guardados no arquivo (e no ficheiro de rotas) não são recalculados;
+# se False, os resultados guardados de cada rede e modo são apagados uma vez por sessão
+RETOMAR = True
+
+# nota mostrada com as estatísticas: o TSA usa o Dijkstra do motor (motor.py), que desempata os
+# caminhos mais curtos com o mesmo custo de forma diferente do NetworkX das versões anteriores,
+# pelo que os valores do TSA podem não coincidir com os obtidos antes do motor
+NOTA_TSA = ("Nota: o TSA usa o Dijkstra do motor, que desempata os caminhos com o mesmo custo de forma\n"
+            "diferente do NetworkX das versões anteriores; os valores do TSA podem não coincidir com\n"
+            "os obtidos antes (p.ex., nobel-germany em nós: 108 pares resolvidos em vez de 107).")
+
+# registos dos resultados (ver `sweep_record`):
+# (hash da rede, versão do motor, ligacoes) -> {(origem, destino): (custo_tsa, custo_sur)}
+registos = {}
+
+def calculos_auxiliares(G, otimo, calcular_erro_medio, pares=None, ligacoes=False, workers=None, retomar=None):
     """!
     @brief Realiza cálculos auxiliares para comparar os algoritmos TSA e Suurballe.
 
-    Itera sobre todos os pares de nós únicos no grafo, executa ambos os algoritmos
-    (TSA e Suurballe) para cada par e recolhe estatísticas como o número de
-    soluções encontradas por cada um, soluções ótimas (se aplicável) e o erro
-    percentual do TSA em relação ao Suurballe.
+    Obtém o registo dos resultados de todos os pares (`sweep_record`, que só executa os
+    algoritmos nos pares que ainda não estão registados) e calcula as estatísticas a partir
+    dele (`record_statistics`), como o número de soluções encontradas por cada algoritmo,
+    as soluções ótimas (se aplicável) e o erro percentual do TSA em relação ao Suurballe.
+    Chamadas seguintes com a mesma rede (p.ex., as várias opções do menu) não voltam a
+    executar os algoritmos.
 
-    @param G O grafo (NetworkX DiGraph) sobre o qual os cálculos são realizados.
+    @param G O grafo (NetworkX DiGraph) sobre o qual os cálculos são realizados, ou uma rede
+             grande aberta no formato CSR em disco (`RedeCSR`, ver `load_large_network`), cujo
+             motor é criado com `csr_engine` sem grafo NetworkX.
     @param otimo Booleano. Se True, verifica se o custo do TSA é igual ao do Suurballe
                  (considerado como ótimo) e conta essas ocorrências.
     @param calcular_erro_medio Booleano. Se True, calcula o erro percentual médio
                                do custo total do TSA em relação ao custo total do Suurballe.
+    @param pares Opcional. Lista de pares (origem, destino) a analisar, p.ex. os pares da
+                 matriz de procuras (`demand_pairs`). Se None, são usados todos os pares de nós.
+    @param ligacoes Booleano. Se True, os dois algoritmos procuram caminhos disjuntos em
+                    ligações; caso contrário (por omissão), disjuntos em nós. Cada modo tem
+                    o seu registo e o seu ficheiro de rotas.
+    @param workers Opcional. Número de processos (1: em série; 0: um por CPU). Por omissão,
+                   usa `WORKERS`.
+    @param retomar Opcional. Se False, apaga os resultados guardados e recalcula os pares
+                   (ver `sweep_record`).
 
     @return Tuple contendo:
-        - pares (list): Lista de todos os pares de nós (origem, destino) no grafo.
+        - total_pares (int): Número de pares de nós (origem, destino) analisados.
         - pares_validos (int): Número de pares para os quais tanto o TSA como o Suurballe
                                encontraram uma solução (ambos os caminhos).
         - resolvidos_tsa (int): Número total de pares para os quais o TSA encontrou
@@ -39,48 +83,321 @@ def calculos_auxiliares(G, otimo, calcular_erro_medio):
                               Caso contrário, é 0.0.
     """
 
-    pares = list(itertools.combinations(G.nodes, 2))
+    # todos os pares são gerados à medida que são precisos, sem serem guardados numa lista
+    if pares is None:
+        n = len(engine_graph(G).nomes)
+        total_pares = n * (n - 1) // 2
+    else:
+        total_pares = len(pares)
+
+    registo = sweep_record(G, pares, ligacoes, workers, retomar)
+    pares_validos, resolvidos_tsa, resolvidos_sur, resolvidos_otimos, erro_medio = \
+        record_statistics(registo, all_pairs(G) if pares is None else pares)
+
+    if not otimo:
+        resolvidos_otimos = 0
+    if not calcular_erro_medio:
+        pares_validos, erro_medio = 0, 0.0
+
+    return total_pares, pares_validos , resolvidos_tsa, resolvidos_sur, resolvidos_otimos, erro_medio
+
+# ------------------------------------------------------
+def all_pairs(G):
+    """!
+    @brief Gera todos os pares de nós (origem, destino), um de cada vez.
+
+    Os pares saem agrupados por origem, pela ordem dos nós do grafo, como em
+    `itertools.combinations`, mas nunca são guardados todos numa lista.
+
+    @param G O grafo (NetworkX DiGraph), ou uma `RedeCSR`.
+    @return Gerador de tuplos (origem, destino).
+    """
+
+    yield from itertools.combinations(engine_graph(G).nomes, 2)
+
+# ------------------------------------------------------
+def source_groups(pares):
+    """!
+    @brief Agrupa os pares por origem, sem percorrer os pares mais de uma vez.
+
+    Uma lista de pares (p.ex., a de `demand_pairs`) já está em memória e é agrupada por
+    completo; um gerador (p.ex., `all_pairs`) é agrupado à medida que é lido, juntando
+    os pares consecutivos com a mesma origem.
+
+    @param pares Lista ou gerador de pares (origem, destino).
+    @return Gerador de tuplos (origem, destinos).
+    """
+
+    if isinstance(pares, (list, tuple)):
+        grupos = {}
+        for origem, destino in pares:
+            grupos.setdefault(origem, []).append(destino)
+        yield from grupos.items()
+    else:
+        for origem, grupo in itertools.groupby(pares, key=lambda par: par[0]):
+            yield origem, [destino for _, destino in grupo]
+
+# ------------------------------------------------------
+def sweep_record(G, pares=None, ligacoes=False, workers=None, retomar=None):
+    """!
+    @brief Devolve o registo dos resultados do TSA e do Suurballe em cada par de nós.
+
+    O registo de cada rede é guardado em memória, identificado pelo hash do ficheiro da rede
+    (`G.graph['hash']`), pela versão do motor (`ENGINE_VERSION`) e pelo modo (nós/ligações),
+    e no arquivo persistente (`save_results`), de onde é lido na primeira utilização da rede;
+    só os pares que ainda não estão no registo são calculados.
+    Os caminhos dos pares novos são acrescentados ao ficheiro de rotas da rede (`append_routes`).
+    Se o arquivo não tiver nenhum resultado da rede (p.ex., se foi apagado), os caminhos desse
+    ficheiro são lidos (`iter_routes`) e registados em vez de recalculados.
+    Os dois algoritmos são calculados por origem (`sweep_sources`): uma só árvore de caminhos
+    mais curtos serve todos os pares novos com a mesma origem, e as origens podem ser
+    repartidas por vários processos.
+    Os pares são lidos à medida que são calculados e, a cada `CHECKPOINT_SEGUNDOS` (e se o
+    cálculo for interrompido, p.ex. com Ctrl-C), os resultados já obtidos são guardados no
+    arquivo e no ficheiro de rotas: uma nova execução retoma a partir desse ponto.
+
+    @param G O grafo (NetworkX DiGraph), ou uma `RedeCSR` (sem ficheiro de rotas, ver `routes_path`).
+    @param pares Opcional. Lista (ou gerador) de pares (origem, destino). Se None, são usados
+                 todos os pares de nós (`all_pairs`).
+    @param ligacoes Booleano. Se True, os caminhos são disjuntos em ligações.
+    @param workers Opcional. Número de processos (1: em série; 0: um por CPU). Por omissão,
+                   usa `WORKERS`.
+    @param retomar Opcional. Se False, apaga os resultados guardados da rede (em memória, no
+                   arquivo e no ficheiro de rotas) antes de calcular os pares. Por omissão, usa
+                   `RETOMAR` na primeira chamada com cada rede e modo; as seguintes usam o
+                   registo em memória.
+    @return dict: `{(origem, destino): (custo_tsa, custo_sur)}`, com o custo total dos dois
+            caminhos de cada algoritmo, ou None se o algoritmo não encontrou ambos os caminhos.
+            Contém pelo menos os pares pedidos.
+    """
+
+    if pares is None:
+        pares = all_pairs(G)
+    if workers is None:
+        workers = WORKERS
+
+    # grafos que não vêm de um ficheiro (sem hash) não ficam registados
+    chave = (G.graph.get('hash'), ENGINE_VERSION, ligacoes)
+    if retomar is None:
+        # sem RETOMAR, cada rede e modo só recomeçam uma vez por sessão
+        retomar = RETOMAR or chave in registos
+
+    if not retomar:
+        clear_results(G, ligacoes)
+        remove_routes(G, ligacoes)
+        registo = {}
+    else:
+        registo = registos.get(chave) if chave[0] is not None else None
+        if registo is None:
+            registo = load_record(G, ligacoes)
+    if chave[0] is not None:
+        registos[chave] = registo
+
+    # pares calculados desde o último ponto de retoma, ainda por guardar
+    rotas = {}           # rotas (ver `append_routes`)
+    linhas = []          # linhas do arquivo (ver STORE_COLUMNS)
+    ultimo_checkpoint = time.perf_counter()
+
+    def registar(origem, destino, path1, cost_1_tsa, path2, cost_2_tsa, P1, cost_1_sur, P2, cost_2_sur, tempo):
+        # Verifica se cada algoritmo encontrou ambos os caminhos
+        tsa_valido = (path2 is not None) and (cost_2_tsa is not None)
+        sur_valido = (P2 is not None) and (cost_2_sur is not None)
+        registo[(origem, destino)] = (cost_1_tsa + cost_2_tsa if tsa_valido else None,
+                                      cost_1_sur + cost_2_sur if sur_valido else None)
+        linhas.append((origem, destino, cost_1_tsa, cost_2_tsa, cost_1_sur, cost_2_sur,
+                       *(len(path) - 1 if path else None for path in (path1, path2, P1, P2)),
+                       int(tsa_valido), int(sur_valido), tempo))
+
+    def checkpoint():
+        # guarda os pares calculados desde o último ponto de retoma, para as próximas execuções
+        nonlocal ultimo_checkpoint
+        save_results(G, linhas, ligacoes)
+        append_routes(G, rotas, ligacoes)
+        linhas.clear()
+        rotas.clear()
+        ultimo_checkpoint = time.perf_counter()
+
+    try:
+        # arquivo vazio: os caminhos já calculados no ficheiro de rotas só precisam do custo
+        if retomar and not registo:
+            for (origem, destino), rota in iter_routes(G, ligacoes):
+                path1, path2 = rota['TSA']
+                P1, P2 = rota['SUR']
+                registar(origem, destino, path1, path_cost(path1, G), path2, path_cost(path2, G),
+                         P1, path_cost(P1, G), P2, path_cost(P2, G), None)
+                if time.perf_counter() - ultimo_checkpoint >= CHECKPOINT_SEGUNDOS:
+                    checkpoint()
+
+        # Executa TSA e Suurballe nos pares novos (todos os destinos de cada origem de uma vez)
+        origens = ((origem, [destino for destino in destinos if (origem, destino) not in registo])
+                   for origem, destinos in source_groups(pares))
+        for parcial in sweep_sources(G, ((origem, destinos) for origem, destinos in origens if destinos),
+                                     ligacoes, workers):
+            for (origem, destino), (tsa, sur, tempo) in parcial.items():
+                path1, cost_1_tsa, path2, cost_2_tsa = tsa
+                P1, cost_1_sur, P2, cost_2_sur = sur
+                rotas[(origem, destino)] = {'TSA': [path1, path2], 'SUR': [P1, P2]}
+                registar(origem, destino, path1, cost_1_tsa, path2, cost_2_tsa, P1, cost_1_sur, P2, cost_2_sur, tempo)
+            if time.perf_counter() - ultimo_checkpoint >= CHECKPOINT_SEGUNDOS:
+                checkpoint()
+    finally:
+        checkpoint()
+
+    return registo
+
+# ------------------------------------------------------
+def record_statistics(registo, pares):
+    """!
+    @brief Calcula as estatísticas de comparação do TSA com o Suurballe a partir do registo.
+
+    @param registo Registo devolvido por `sweep_record`.
+    @param pares Lista (ou gerador) de pares (origem, destino) a considerar (todos devem estar no registo).
+    @return Tuple (pares_validos, resolvidos_tsa, resolvidos_sur, resolvidos_otimos, erro_medio),
+            como em `calculos_auxiliares`.
+    """
+
     resolvidos_tsa = 0
     resolvidos_sur = 0
     resolvidos_otimos = 0
     erro_acumulado = 0.0  # Acumula as diferenças percentuais
     pares_validos = 0     # Conta pares onde ambos TSA e Suurballe funcionaram
 
-    for origem, destino in pares:
-        # Executa TSA
-        _, cost_1_tsa, path2, cost_2_tsa = find_best_paths(G, origem, destino, algoritmo=None)
-        # Executa Suurballe
-        _, cost_1_sur, P2, cost_2_sur = suurballe(G, origem, destino, algoritmo=None, option=0, calculo=True)
-        
-        # Verifica se ambos encontraram soluções
-        tsa_valido = (path2 is not None) and (cost_2_tsa is not None)
-        sur_valido = (P2 is not None) and (cost_2_sur is not None)
-        
-        if tsa_valido:
+    for par in pares:
+        custo_tsa, custo_sur = registo[par]
+
+        if custo_tsa is not None:
             resolvidos_tsa += 1
-        if sur_valido:
+        if custo_sur is not None:
             resolvidos_sur += 1
-        
+
         # Se ambos algoritmos encontraram soluções, compara custos
-        if tsa_valido and sur_valido:
-            custo_tsa = cost_1_tsa + cost_2_tsa
-            custo_sur = cost_1_sur + cost_2_sur
-            
-            if calcular_erro_medio:
-                erro_percentual = ((custo_tsa - custo_sur) / custo_sur) * 100
-                erro_acumulado += erro_percentual
-                pares_validos += 1
-            
-            if otimo and (custo_tsa == custo_sur):
+        if custo_tsa is not None and custo_sur is not None:
+            erro_percentual = ((custo_tsa - custo_sur) / custo_sur) * 100
+            erro_acumulado += erro_percentual
+            pares_validos += 1
+
+            if custo_tsa == custo_sur:
                 resolvidos_otimos += 1
-    
-    # Calcula o erro médio se solicitado
+
+    # Calcula o erro médio
     erro_medio = (erro_acumulado / pares_validos) if pares_validos > 0 else 0.0
-    
-    return pares, pares_validos , resolvidos_tsa, resolvidos_sur, resolvidos_otimos, erro_medio
+
+    return pares_validos, resolvidos_tsa, resolvidos_sur, resolvidos_otimos, erro_medio
+
+# ------------------------------------------------------
+def sweep_sources(G, origens, ligacoes=False, workers=1):
+    """!
+    @brief Executa o TSA e o Suurballe de cada origem para os respetivos destinos.
+
+    As origens são lidas à medida que são precisas e os resultados são devolvidos por blocos,
+    pela ordem das origens, para poderem ser guardados durante o cálculo.
+    Com mais de um processo, as origens são repartidas em blocos de `ORIGENS_POR_BLOCO`
+    origens consecutivas (cada bloco mantém juntos todos os destinos de uma origem, que
+    partilham a árvore de caminhos mais curtos) por um `ProcessPoolExecutor`, com no máximo
+    dois blocos em curso por processo. O grafo não é enviado aos processos: numa rede lida
+    de um ficheiro, cada processo abre o grafo em disco (`network_csr`) mapeado em memória,
+    pelo que todos partilham as mesmas páginas; caso contrário, os arrays do motor são
+    publicados uma só vez em memória partilhada (`share_engine`). Em ambos os casos, cada
+    processo abre-os sem cópias (`init_worker`). Os processos trabalham com os índices
+    dos nós, que são convertidos para os nomes neste processo.
+
+    @param G O grafo (NetworkX DiGraph), ou uma `RedeCSR`.
+    @param origens Lista (ou gerador) de pares (origem, destinos), com a lista de destinos de cada origem.
+    @param ligacoes Booleano. Se True, os caminhos são disjuntos em ligações.
+    @param workers Número de processos (1: em série; 0: um por CPU).
+    @return Gerador de dicts `{(origem, destino): (resultado TSA, resultado Suurballe, tempo)}`,
+            um por bloco, com os tuplos devolvidos por `find_best_paths` e `suurballe` e o tempo
+            de cálculo do par (em segundos: o tempo da origem repartido pelos seus destinos).
+    """
+
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    if workers <= 1:
+        for origem, destinos in origens:
+            yield sweep_block(G, [(origem, destinos)], ligacoes)
+        return
+
+    motor = engine_graph(G)
+    origens = ((motor.indice[origem], [motor.indice[destino] for destino in destinos]) for origem, destinos in origens)
+    blocos = iter(lambda: list(itertools.islice(origens, ORIGENS_POR_BLOCO)), [])
+
+    entrada = network_csr(G)
+    if entrada is not None:
+        memorias, descritor = [], entrada
+    else:
+        memorias, descritor = share_engine(motor)
+    executor = ProcessPoolExecutor(workers, initializer=init_worker, initargs=(descritor,))
+    terminou = False
+    try:
+        # os blocos são recebidos pela ordem em que foram submetidos
+        em_curso = deque(executor.submit(worker_block, bloco, ligacoes)
+                         for bloco in itertools.islice(blocos, 2 * workers))
+        while em_curso:
+            parcial = em_curso.popleft().result()
+            for bloco in itertools.islice(blocos, 1):
+                em_curso.append(executor.submit(worker_block, bloco, ligacoes))
+            yield {(motor.nomes[origem], motor.nomes[destino]): tuple(
+                       (engine_names(motor, caminho1), custo1, engine_names(motor, caminho2), custo2)
+                       for caminho1, custo1, caminho2, custo2 in resultado) + (tempo,)
+                   for (origem, destino), (*resultado, tempo) in parcial.items()}
+        terminou = True
+    finally:
+        # cálculo interrompido: não espera pelos blocos em curso, cujos resultados já não são lidos
+        executor.shutdown(wait=terminou, cancel_futures=True)
+        release_engine(memorias)
 
 # ------------------------------------------------------
-def calculo_taxa_resolusao(G):
+def sweep_block(G, origens, ligacoes):
+    """!
+    @brief Executa o TSA e o Suurballe para um bloco de origens (ver `sweep_sources`).
+    """
+
+    resultados = {}
+    for origem, destinos in origens:
+        inicio = time.perf_counter()
+        tsa = find_best_paths_from_source(G, origem, destinos, ligacoes)
+        sur = suurballe_from_source(G, origem, destinos, ligacoes)
+        tempo = (time.perf_counter() - inicio) / len(destinos)
+        for destino in destinos:
+            resultados[(origem, destino)] = (tsa[destino], sur[destino], tempo)
+    return resultados
+
+# ------------------------------------------------------
+# motor de cada processo do ProcessPoolExecutor, sobre a memória partilhada (ver init_worker)
+memorias_worker = None
+motor_worker = None
+
+def init_worker(descritor):
+    """!
+    @brief Inicialização de cada processo dos cálculos em paralelo: abre o motor partilhado
+           (em memória partilhada ou no grafo em disco, ver `attach_engine`).
+    """
+
+    global memorias_worker, motor_worker
+    memorias_worker, motor_worker = attach_engine(descritor)
+
+# ------------------------------------------------------
+def worker_block(origens, ligacoes):
+    """!
+    @brief Tarefa de cada processo: TSA e Suurballe (em índices) para um bloco de origens.
+
+    @param origens Lista de pares (origem, destinos), com os índices dos nós.
+    @param ligacoes Booleano. Se True, os caminhos são disjuntos em ligações.
+    @return dict: `{(origem, destino): (resultado TSA, resultado Suurballe, tempo)}`, em índices.
+    """
+
+    resultados = {}
+    for origem, destinos in origens:
+        inicio = time.perf_counter()
+        tsa = tsa_source_engine(motor_worker, origem, destinos, ligacoes)
+        sur = suurballe_source_engine(motor_worker, origem, destinos, ligacoes)
+        tempo = (time.perf_counter() - inicio) / len(destinos)
+        for destino in destinos:
+            resultados[(origem, destino)] = (tsa[destino], sur[destino], tempo)
+    return resultados
+
+# ------------------------------------------------------
+def calculo_taxa_resolusao(G, ligacoes=False, pares=None):
     """!
     @brief Calcula e exibe a taxa de resolução dos algoritmos TSA e Suurballe.
 
@@ -89,27 +406,31 @@ def calculo_taxa_resolusao(G):
     de resolução percentual para cada um.
 
     @param G O grafo (NetworkX DiGraph) para análise.
+    @param ligacoes Booleano. Se True, os caminhos são disjuntos em ligações (em nós, por omissão).
+    @param pares Opcional. Lista de pares (origem, destino) a analisar, p.ex. os da matriz de
+                 procuras (`demand_pairs`). Se None, são usados todos os pares de nós.
     @note Espera que o utilizador pressione Enter para continuar após a exibição.
     """
 
     
-    pares, _,resolvidos_tsa, resolvidos_sur, _, _ = calculos_auxiliares(G, otimo=False, calcular_erro_medio=False)
+    total_pares, _,resolvidos_tsa, resolvidos_sur, _, _ = calculos_auxiliares(G, otimo=False, calcular_erro_medio=False, pares=pares, ligacoes=ligacoes)
     
     clear_screen()
     print("\n\n----------------- Taxa de resolução TSA -----------------\n")
-    print(f"Total de pares: {len(pares)}")
+    print(f"Total de pares: {total_pares}")
     print(f"Total de pares resolvidos pelo TSA: {resolvidos_tsa}")
-    print(f"Taxa de resolução do TSA: {resolvidos_tsa / len(pares) * 100:.2f}%")
+    print(f"Taxa de resolução do TSA: {resolvidos_tsa / total_pares * 100:.2f}%")
     print("\n----------------- Taxa de resolução Surballe -----------------\n")
-    print(f"Total de pares: {len(pares)}")
+    print(f"Total de pares: {total_pares}")
     print(f"Total de pares resolvidos pelo Suurballe: {resolvidos_sur}")
-    print(f"Taxa de resolução do Suurballe: {resolvidos_sur / len(pares) * 100:.2f}%")
+    print(f"Taxa de resolução do Suurballe: {resolvidos_sur / total_pares * 100:.2f}%")
+    print(f"\n{NOTA_TSA}")
     print("\n---------------------------------------------------------------")
 
     input("Enter para continuar")
 
 # ------------------------------------------------------   
-def calculo_taxa_resolusao_otima(G):
+def calculo_taxa_resolusao_otima(G, ligacoes=False, pares=None):
     """!
     @brief Calcula e exibe a taxa de resolução ótima do TSA em comparação com o Suurballe.
 
@@ -119,24 +440,28 @@ def calculo_taxa_resolusao_otima(G):
     soluções encontradas pelo Suurballe (que é considerado o benchmark ótimo).
 
     @param G O grafo (NetworkX DiGraph) para análise.
+    @param ligacoes Booleano. Se True, os caminhos são disjuntos em ligações (em nós, por omissão).
+    @param pares Opcional. Lista de pares (origem, destino) a analisar, p.ex. os da matriz de
+                 procuras (`demand_pairs`). Se None, são usados todos os pares de nós.
     @note Utiliza `calculos_auxiliares`. Espera que o utilizador pressione Enter para continuar.
     """
 
 
-    pares, _, _, resolvidos_sur, resolvidos_otimos, _ = calculos_auxiliares(G, otimo=True, calcular_erro_medio=False)
+    total_pares, _, _, resolvidos_sur, resolvidos_otimos, _ = calculos_auxiliares(G, otimo=True, calcular_erro_medio=False, pares=pares, ligacoes=ligacoes)
     
     clear_screen()
     
     print("\n\n----------------- Taxa de resolução ótima -----------------\n")
-    print(f"Total de pares: {len(pares)}")
+    print(f"Total de pares: {total_pares}")
     print(f"Total de soluções ótimas: {resolvidos_sur}")
     print(f"Total de soluções ótimas encontradas pelo TSA: {resolvidos_otimos}")
     print(f"Taxa de resolução ótima: {resolvidos_otimos / resolvidos_sur * 100:.2f}%")
+    print(f"\n{NOTA_TSA}")
     print("\n---------------------------------------------------------------")
     input("Enter para continuar")    
 
 # ------------------------------------------------------    
-def calculo_erro(G):
+def calculo_erro(G, ligacoes=False, pares=None):
     """!
     @brief Calcula e exibe o erro médio percentual do custo do TSA em relação ao Suurballe.
 
@@ -145,16 +470,121 @@ def calculo_erro(G):
     A função exibe o erro médio acumulado sobre todos esses pares válidos.
 
     @param G O grafo (NetworkX DiGraph) para análise.
+    @param ligacoes Booleano. Se True, os caminhos são disjuntos em ligações (em nós, por omissão).
+    @param pares Opcional. Lista de pares (origem, destino) a analisar, p.ex. os da matriz de
+                 procuras (`demand_pairs`). Se None, são usados todos os pares de nós.
     @note Utiliza `calculos_auxiliares`. Espera que o utilizador pressione Enter para continuar.
     """
 
     
-    pares, pares_validos, _, _, _, erro_medio = calculos_auxiliares(G, otimo=False, calcular_erro_medio=True)
+    total_pares, pares_validos, _, _, _, erro_medio = calculos_auxiliares(G, otimo=False, calcular_erro_medio=True, pares=pares, ligacoes=ligacoes)
     clear_screen()
     
     print("\n\n----------------- Erro Médio do TSA -----------------\n")
-    print(f"Total de pares analisados: {len(pares)}")
+    print(f"Total de pares analisados: {total_pares}")
     print(f"Pares onde ambos TSA e Suurballe encontraram soluções: {pares_validos}")
     print(f"Erro médio do TSA em relação à solução ótima: {erro_medio:.2f}%")
+    print(f"\n{NOTA_TSA}")
     print("\n------------------------------------------------------")
-    input("Enter para continuar")
\ No newline at end of file
+    input("Enter para continuar")
+# ------------------------------------------------------
+def calculo_estatisticas(G, ligacoes=False, pares=None):
+    """!
+    @brief Calcula e exibe as três estatísticas (taxa de resolução, taxa de resolução ótima e erro médio).
+
+    As três são obtidas do mesmo registo (`sweep_record`), pelo que os algoritmos são
+    executados uma só vez em cada par.
+
+    @param G O grafo (NetworkX DiGraph) para análise.
+    @param ligacoes Booleano. Se True, os caminhos são disjuntos em ligações (em nós, por omissão).
+    @param pares Opcional. Lista de pares (origem, destino) a analisar, p.ex. os da matriz de
+                 procuras (`demand_pairs`). Se None, são usados todos os pares de nós.
+    @note Espera que o utilizador pressione Enter para continuar após a exibição.
+    """
+
+    total_pares, pares_validos, resolvidos_tsa, resolvidos_sur, resolvidos_otimos, erro_medio = \
+        calculos_auxiliares(G, otimo=True, calcular_erro_medio=True, pares=pares, ligacoes=ligacoes)
+
+    clear_screen()
+    print("\n\n----------------- Taxa de resolução -----------------\n")
+    print(f"Total de pares: {total_pares}")
+    print(f"Taxa de resolução do TSA: {resolvidos_tsa / total_pares * 100:.2f}% ({resolvidos_tsa} pares)")
+    print(f"Taxa de resolução do Suurballe: {resolvidos_sur / total_pares * 100:.2f}% ({resolvidos_sur} pares)")
+    print("\n----------------- Taxa de resolução ótima -----------------\n")
+    print(f"Total de soluções ótimas encontradas pelo TSA: {resolvidos_otimos}")
+    print(f"Taxa de resolução ótima: {resolvidos_otimos / resolvidos_sur * 100:.2f}%")
+    print("\n----------------- Erro Médio do TSA -----------------\n")
+    print(f"Pares onde ambos TSA e Suurballe encontraram soluções: {pares_validos}")
+    print(f"Erro médio do TSA em relação à solução ótima: {erro_medio:.2f}%")
+    print(f"\n{NOTA_TSA}")
+    print("\n---------------------------------------------------------------")
+    input("Enter para continuar")
+
+# ------------------------------------------------------
+def calculo_tempos(G):
+    """!
+    @brief Compara os tempos de execução do Suurballe e do Bhandari em todos os pares de nós.
+
+    Os dois algoritmos encontram o par de caminhos disjuntos (em nós) de custo mínimo,
+    pelo que os custos totais devem coincidir; os pares em que diferem são contados
+    e apresentados, como verificação.
+
+    @param G O grafo (NetworkX DiGraph) para análise.
+    @note Espera que o utilizador pressione Enter para continuar após a exibição.
+    """
+
+    pares = list(itertools.combinations(G.nodes, 2))
+    resultados = {}
+    tempos = {}
+    for nome, algoritmo in (("Suurballe", lambda o, d: suurballe(G, o, d, algoritmo=None, option=0, calculo=True)),
+                            ("Bhandari", lambda o, d: bhandari(G, o, d, algoritmo=None, calculo=True))):
+        inicio = time.perf_counter()
+        resultados[nome] = [algoritmo(origem, destino) for origem, destino in pares]
+        tempos[nome] = time.perf_counter() - inicio
+
+    diferentes = 0
+    for sur, bh in zip(resultados["Suurballe"], resultados["Bhandari"]):
+        custo_sur = None if sur[2] is None else sur[1] + sur[3]
+        custo_bh = None if bh[2] is None else bh[1] + bh[3]
+        if (custo_sur is None) != (custo_bh is None) or (custo_sur is not None and abs(custo_sur - custo_bh) > 1e-9 * custo_sur):
+            diferentes += 1
+
+    clear_screen()
+    print("\n\n----------------- Tempos Suurballe / Bhandari -----------------\n")
+    print(f"Total de pares: {len(pares)}")
+    for nome, tempo in tempos.items():
+        print(f"{nome}: {tempo:.3f} s ({tempo / len(pares) * 1000:.3f} ms por par)")
+    print(f"Pares com custos diferentes: {diferentes}")
+    print("\n---------------------------------------------------------------")
+    input("Enter para continuar")
+
+# ------------------------------------------------------
+def calculo_taxa_resolusao_modos(G, pares=None):
+    """!
+    @brief Compara as taxas de resolução do TSA e do Suurballe com caminhos disjuntos em nós e em ligações.
+
+    Executa `calculos_auxiliares` nos dois modos e apresenta, para cada algoritmo, a
+    percentagem de pares resolvidos em cada um. Os caminhos disjuntos em nós também o
+    são em ligações, pelo que a taxa em ligações nunca é inferior.
+
+    @param G O grafo (NetworkX DiGraph) para análise.
+    @param pares Opcional. Lista de pares (origem, destino) a analisar, p.ex. os da matriz de
+                 procuras (`demand_pairs`). Se None, são usados todos os pares de nós.
+    @note Espera que o utilizador pressione Enter para continuar após a exibição.
+    """
+
+    resultados = {}
+    for ligacoes in (False, True):
+        total_pares, _, resolvidos_tsa, resolvidos_sur, _, _ = calculos_auxiliares(G, otimo=False, calcular_erro_medio=False, pares=pares, ligacoes=ligacoes)
+        resultados[ligacoes] = (resolvidos_tsa, resolvidos_sur)
+
+    clear_screen()
+    print("\n\n----------------- Taxa de resolução por modo -----------------\n")
+    print(f"Total de pares: {total_pares}\n")
+    print(f"{'':<12}{'Disjuntos em nós':>20}{'Disjuntos em ligações':>24}")
+    for i, nome in enumerate(("TSA", "Suurballe")):
+        em_nos, em_ligacoes = resultados[False][i], resultados[True][i]
+        print(f"{nome:<12}{em_nos / total_pares * 100:>19.2f}%{em_ligacoes / total_pares * 100:>23.2f}%")
+    print(f"\n{NOTA_TSA}")
+    print("\n---------------------------------------------------------------")
+    input("Enter para continuar")
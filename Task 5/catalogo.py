@@ -0,0 +1,185 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from cache import *
+
+"""!
+@file catalogo.py
+@brief Catálogo das redes disponíveis, carregadas em segundo plano.
+Procura os ficheiros de rede nos diretórios indicados e lê-os todos num conjunto de threads
+(ou processos), guardando os grafos em memória. Escolher uma rede no menu passa a ser imediato.
+"""
+
+# diretórios procurados por omissão e extensões reconhecidas
+NETWORK_DIRS = ("networks",)
+NETWORK_EXTENSIONS = ('.txt', '.xml')
+
+# caminho do ficheiro -> dicionário com o estado da rede:
+#   'future'   - leitura em curso (ou terminada) de load_network
+#   'assinatura' - assinatura do ficheiro quando a leitura começou (ver `file_signature`)
+#   'nos'      - número de nós (depois de lida)
+#   'ligacoes' - número de ligações (depois de lida)
+#   'tempo'    - tempo de leitura, em segundos (depois de lida)
+catalogo = {}
+executor = None
+catalogo_lock = threading.Lock()
+
+def scan_networks(diretorios=NETWORK_DIRS):
+    """!
+    @brief Procura os ficheiros de rede (.txt e .xml) nos diretórios indicados.
+
+    @param diretorios Lista de diretórios a procurar (os que não existirem são ignorados).
+    @return list: Caminhos dos ficheiros encontrados, ordenados por diretório e nome.
+    """
+
+    ficheiros = []
+    for diretorio in diretorios:
+        if os.path.isdir(diretorio):
+            for nome in sorted(os.listdir(diretorio)):
+                if nome.endswith(NETWORK_EXTENSIONS):
+                    ficheiros.append(f"{diretorio.rstrip('/')}/{nome}")
+    return ficheiros
+
+# ------------------------------------------------------
+def file_signature(caminho):
+    """!
+    @brief Devolve a assinatura de um ficheiro (data de modificação e tamanho), para detetar alterações.
+
+    @param caminho Caminho do ficheiro.
+    @return Tuple (mtime em ns, tamanho), ou None se o ficheiro não existir.
+    """
+
+    try:
+        estado = os.stat(caminho)
+    except OSError:
+        return None
+    return estado.st_mtime_ns, estado.st_size
+
+# ------------------------------------------------------
+def timed_load(caminho):
+    """!
+    @brief Lê uma rede com `load_network` e mede o tempo de leitura.
+
+    As redes grandes (ver `large_network`) são abertas no formato CSR em disco, com
+    `load_large_network`, em vez de criar o grafo NetworkX.
+
+    @param caminho Caminho do ficheiro da rede.
+    @return Tuple (G, node_mapping, tempo), com o tempo em segundos. Numa rede grande, G é
+            a `RedeCSR` e node_mapping é None.
+    """
+
+    inicio = time.perf_counter()
+    if large_network(caminho):
+        G, node_mapping = load_large_network(caminho), None
+    else:
+        G, node_mapping = load_network(caminho)
+    return G, node_mapping, time.perf_counter() - inicio
+
+# ------------------------------------------------------
+def start_catalog(diretorios=NETWORK_DIRS, workers=None, processos=False):
+    """!
+    @brief Inicia o catálogo: procura as redes e começa a lê-las todas em segundo plano.
+
+    Cada ficheiro encontrado por `scan_networks` é submetido a um `ThreadPoolExecutor`
+    (ou a um `ProcessPoolExecutor`, se `processos` for True). A função regressa de
+    imediato; os grafos ficam disponíveis à medida que as leituras terminam.
+
+    @param diretorios Diretórios a procurar (por omissão, apenas 'networks/').
+    @param workers Número de threads/processos (None usa o valor por omissão do executor).
+    @param processos Booleano. Se True, usa processos em vez de threads (útil para ler
+                     redes grandes que ainda não estão na cache compilada; os grafos
+                     são depois copiados para o processo principal).
+    """
+
+    global executor
+    if executor is None:
+        executor = ProcessPoolExecutor(workers) if processos else ThreadPoolExecutor(workers)
+
+    for caminho in scan_networks(diretorios):
+        add_network(caminho)
+
+# ------------------------------------------------------
+def add_network(caminho):
+    """!
+    @brief Acrescenta uma rede ao catálogo e começa a lê-la em segundo plano.
+
+    Se a rede já estiver no catálogo e o ficheiro não tiver sido alterado desde que a
+    leitura começou (mesma `file_signature`), nada é feito. Se tiver sido alterado,
+    a entrada é substituída e a rede é lida de novo.
+
+    @param caminho Caminho do ficheiro da rede.
+    """
+
+    global executor
+    assinatura = file_signature(caminho)
+    with catalogo_lock:
+        if caminho in catalogo and catalogo[caminho]['assinatura'] == assinatura:
+            return
+        if executor is None:
+            executor = ThreadPoolExecutor()
+
+        entrada = {'future': executor.submit(timed_load, caminho), 'assinatura': assinatura}
+        catalogo[caminho] = entrada
+
+    def terminou(future):
+        # estatísticas da rede, assim que a leitura termina
+        if future.exception() is None:
+            G, _, tempo = future.result()
+            nos, ligacoes = network_size(G)
+            entrada.update(nos=nos, ligacoes=ligacoes, tempo=tempo)
+
+    entrada['future'].add_done_callback(terminou)
+
+# ------------------------------------------------------
+def list_networks():
+    """!
+    @brief Devolve os caminhos das redes do catálogo, pela ordem em que foram acrescentadas.
+
+    @return list: Caminhos dos ficheiros das redes.
+    """
+
+    with catalogo_lock:
+        return list(catalogo)
+
+# ------------------------------------------------------
+def network_info(caminho):
+    """!
+    @brief Devolve uma descrição curta do estado de uma rede do catálogo.
+
+    @param caminho Caminho do ficheiro da rede.
+    @return str: P.ex. "12 nós, 15 ligações, 3.1 ms", "a carregar..." ou "erro na leitura".
+    """
+
+    entrada = catalogo.get(caminho)
+    if entrada is None:
+        return ""
+    if not entrada['future'].done():
+        return "a carregar..."
+    if entrada['future'].exception() is not None:
+        return "erro na leitura"
+    if 'tempo' not in entrada:
+        return ""
+    return f"{entrada['nos']} nós, {entrada['ligacoes']} ligações, {entrada['tempo'] * 1000:.1f} ms"
+
+# ------------------------------------------------------
+def get_network(caminho):
+    """!
+    @brief Devolve o grafo de uma rede do catálogo, esperando pela leitura se ainda não tiver terminado.
+
+    Se a rede não estiver no catálogo, é acrescentada (e lida) nesse momento; se o ficheiro
+    tiver sido alterado desde a leitura, é lido de novo (ver `add_network`).
+    Enquanto o ficheiro não mudar, o mesmo grafo é devolvido em todas as chamadas, pelo que
+    não deve ser alterado.
+
+    @param caminho Caminho do ficheiro da rede.
+    @return Tuple (G, node_mapping), como em `load_network`, ou (RedeCSR, None) numa rede
+            grande (ver `timed_load`).
+    @note Os erros da leitura (p.ex., FileNotFoundError ou ValueError) são levantados aqui.
+    """
+
+    add_network(caminho)
+    with catalogo_lock:
+        entrada = catalogo[caminho]
+    G, node_mapping, _ = entrada['future'].result()
+    return G, node_mapping
@@ -0,0 +1,237 @@
+import os
+from array import array
+from collections import namedtuple
+import numpy as np
+import networkx as nx
+from sndlib import *
+
+"""!
+@file csr.py
+@brief Módulo com a representação compacta (CSR) dos grafos.
+Contém a conversão entre o grafo NetworkX criado por `retrieve_data` e arrays NumPy no
+formato CSR (Compressed Sparse Row), indexados pelos mesmos índices do `node_mapping`.
+Define também um formato em disco (um diretório com um ficheiro .npy por array) que é aberto
+com `numpy.memmap`, para redes demasiado grandes para um grafo NetworkX.
+"""
+
+# Grafo em formato CSR:
+# - nomes: nome de cada nó, pela ordem do node_mapping
+# - pos: coordenadas (n x 2) de cada nó (NaN se o nó não tiver coordenadas)
+# - indptr: os vizinhos do nó i estão em indices[indptr[i]:indptr[i+1]]
+# - indices: índice (int32) do nó de destino de cada arco
+# - custo: custo (float64) de cada arco
+# - ligacao: índice (int32) da ligação SNDlib de cada arco em ligacoes (-1 se não tiver)
+# - ligacoes: identificador de cada ligação SNDlib (link_id)
+GrafoCSR = namedtuple('GrafoCSR', ['nomes', 'pos', 'indptr', 'indices', 'custo', 'ligacao', 'ligacoes'])
+
+# arrays do GrafoCSR (guardados um a um na cache compilada, ver `write_cache`, e no formato
+# em disco, um ficheiro por campo)
+CSR_CAMPOS = GrafoCSR._fields
+
+# rede aberta no formato em disco, sem grafo NetworkX (ver `load_large_network`):
+# - graph: dados da rede, como em G.graph ('ficheiro' e 'hash'; 'motor' depois de `engine_graph`)
+# - grafo: GrafoCSR com os arrays mapeados em memória
+RedeCSR = namedtuple('RedeCSR', ['graph', 'grafo'])
+
+def graph_to_csr(G, node_mapping):
+    """!
+    @brief Converte um grafo NetworkX para o formato CSR.
+
+    Os nós são numerados pela ordem do `node_mapping` e os vizinhos de cada nó
+    mantêm a ordem de inserção do grafo original, para que `csr_to_graph` reconstrua
+    exatamente o mesmo grafo.
+    O índice da ligação de cada arco (`ligacao`) segue a ordem de `G.graph['link_ids']`,
+    ou seja, as mesmas linhas de `G.graph['links']`.
+
+    @param G O grafo NetworkX direcionado (arestas com atributo 'cost').
+    @param node_mapping Dicionário que mapeia o índice numérico para o nome do nó.
+    @return GrafoCSR com os arrays do grafo.
+    """
+
+    n = len(node_mapping)
+    indices_nos = {nome: i for i, nome in node_mapping.items()}
+    # link_id -> índice (pela ordem de G.graph['link_ids'], se existir)
+    ligacoes = {link: i for i, link in enumerate(G.graph.get('link_ids', []))}
+
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    indices = np.empty(G.number_of_edges(), dtype=np.int32)
+    custo = np.empty(G.number_of_edges(), dtype=np.float64)
+    ligacao = np.empty(G.number_of_edges(), dtype=np.int32)
+    pos = np.full((n, 2), np.nan)
+
+    k = 0
+    for i in range(n):
+        nome = node_mapping[i]
+        if 'pos' in G.nodes[nome]:
+            pos[i] = G.nodes[nome]['pos']
+        for vizinho, data in G.adj[nome].items():
+            indices[k] = indices_nos[vizinho]
+            custo[k] = data.get('cost', 1)
+            link = data.get('link')
+            ligacao[k] = -1 if link is None else ligacoes.setdefault(link, len(ligacoes))
+            k += 1
+        indptr[i + 1] = k
+
+    nomes = np.array([node_mapping[i] for i in range(n)], dtype=str)
+
+    return GrafoCSR(nomes, pos, indptr, indices, custo, ligacao, np.array(list(ligacoes), dtype=str))
+
+# ------------------------------------------------------
+def csr_to_graph(grafo):
+    """!
+    @brief Reconstrói o grafo NetworkX e o `node_mapping` a partir do formato CSR.
+
+    @param grafo GrafoCSR com os arrays do grafo.
+    @return Tuple (G, node_mapping), com a mesma estrutura devolvida por `retrieve_data`.
+    """
+
+    G = nx.DiGraph()
+    nomes = grafo.nomes.tolist()
+    node_mapping = dict(enumerate(nomes))
+
+    for nome, (x, y) in zip(nomes, grafo.pos.tolist()):
+        if x != x:  # NaN: nó sem coordenadas
+            G.add_node(nome)
+        else:
+            G.add_node(nome, pos=(x, y))
+
+    # arestas pela ordem dos arrays (mantém a ordem dos vizinhos)
+    indptr = grafo.indptr.tolist()
+    indices = grafo.indices.tolist()
+    custo = grafo.custo.tolist()
+    ligacao = grafo.ligacao.tolist()
+    ligacoes = grafo.ligacoes.tolist()
+    for i, nome in enumerate(nomes):
+        for k in range(indptr[i], indptr[i + 1]):
+            if ligacao[k] < 0:
+                G.add_edge(nome, nomes[indices[k]], cost=custo[k])
+            else:
+                G.add_edge(nome, nomes[indices[k]], cost=custo[k], link=ligacoes[ligacao[k]])
+
+    return G, node_mapping
+
+# ------------------------------------------------------
+def build_csr(nomes, pos, origem, destino, custo, ligacao, ligacoes):
+    """!
+    @brief Constrói um GrafoCSR a partir da lista de arcos, pela ordem em que foram lidos.
+
+    Os arcos repetidos (o mesmo par origem->destino, p.ex. duas ligações entre os mesmos
+    nós) são fundidos como em `retrieve_data`, onde `G.add_edge` atualiza a aresta que já
+    existe: o arco fica na posição da primeira ocorrência, com o custo e a ligação da última.
+    Os arcos são depois ordenados pelo nó de origem com uma ordenação estável, pelo que os
+    vizinhos de cada nó mantêm a ordem que teriam num grafo NetworkX construído com
+    `retrieve_data` (o resultado é igual ao de `graph_to_csr` sobre esse grafo).
+
+    @param nomes Lista com o nome de cada nó (pela ordem dos índices).
+    @param pos Sequência plana de coordenadas (x0, y0, x1, y1, ...).
+    @param origem Sequência com o índice do nó de origem de cada arco.
+    @param destino Sequência com o índice do nó de destino de cada arco.
+    @param custo Sequência com o custo de cada arco.
+    @param ligacao Sequência com o índice (em `ligacoes`) da ligação de cada arco.
+    @param ligacoes Lista com o identificador de cada ligação.
+    @return GrafoCSR com os arrays do grafo.
+    """
+
+    n = len(nomes)
+    origem = np.asarray(origem, dtype=np.int64)
+    destino = np.asarray(destino, dtype=np.int64)
+    custo = np.asarray(custo, dtype=np.float64)
+    ligacao = np.asarray(ligacao, dtype=np.int32)
+
+    # arcos repetidos: primeira e última ocorrência de cada par (origem, destino)
+    chave = origem * n + destino
+    _, primeira = np.unique(chave, return_index=True)
+    _, ultima = np.unique(chave[::-1], return_index=True)
+    ultima = len(chave) - 1 - ultima
+    ordem = np.argsort(primeira, kind='stable')
+    primeira, ultima = primeira[ordem], ultima[ordem]
+    origem, destino = origem[primeira], destino[primeira]
+    custo, ligacao = custo[ultima], ligacao[ultima]
+
+    ordem = np.argsort(origem, kind='stable')
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(origem, minlength=n), out=indptr[1:])
+
+    return GrafoCSR(np.array(nomes, dtype=str), np.asarray(pos, dtype=np.float64).reshape(n, 2),
+                    indptr, destino[ordem].astype(np.int32), custo[ordem], ligacao[ordem],
+                    np.array(ligacoes, dtype=str))
+
+# ------------------------------------------------------
+def sndlib_to_csr(linhas):
+    """!
+    @brief Lê um ficheiro SNDlib diretamente para o formato CSR, sem criar um grafo NetworkX.
+
+    Os nós e as ligações são acumulados em arrays compactos à medida que são lidos
+    por `parse_sndlib`. Tal como em `retrieve_data`, cada ligação dá origem a dois arcos
+    (source->target e target->source) com o mesmo custo, e as ligações repetidas entre
+    os mesmos nós são fundidas (ver `build_csr`).
+
+    @param linhas Iterável de linhas do ficheiro (p.ex., o ficheiro aberto).
+    @return GrafoCSR com os arrays do grafo (igual a `graph_to_csr` do grafo de `retrieve_data`).
+    """
+
+    nomes = []
+    indices_nos = {}   # nome do nó -> índice
+    pos = array('d')
+    origem = array('i')
+    destino = array('i')
+    custo = array('d')
+    ligacao = array('i')
+    ligacoes = []
+
+    for seccao, campos in parse_sndlib(linhas):
+
+        # <node_id> [(<longitude>, <latitude>)]
+        if seccao == "NODES":
+            indices_nos[campos[0]] = len(nomes)
+            nomes.append(campos[0])
+            if len(campos) > 3:
+                pos.extend((float(campos[2]), float(campos[3])))
+            else:
+                pos.extend((np.nan, np.nan))
+
+        # <link_id> ( <source> <target> ) ... ( {<module_capacity> <module_cost>}* )
+        elif seccao == "LINKS":
+            u, v = indices_nos[campos[2]], indices_nos[campos[3]]
+            routing_cost = float(campos[11])
+            origem.extend((u, v))
+            destino.extend((v, u))
+            custo.extend((routing_cost, routing_cost))
+            ligacao.extend((len(ligacoes), len(ligacoes)))
+            ligacoes.append(campos[0])
+
+    return build_csr(nomes, pos, origem, destino, custo, ligacao, ligacoes)
+
+# ------------------------------------------------------
+def save_csr(grafo, caminho):
+    """!
+    @brief Guarda um GrafoCSR no formato em disco.
+
+    O formato é um diretório com um ficheiro .npy por array (`nomes.npy`, `pos.npy`,
+    `indptr.npy`, `indices.npy`, `custo.npy`, `ligacao.npy` e `ligacoes.npy`). Os nomes
+    são guardados como arrays de largura fixa, para poderem também ser mapeados em memória.
+
+    @param grafo GrafoCSR a guardar.
+    @param caminho Caminho do diretório (p.ex., 'output/rede.csr'). É criado se não existir.
+    """
+
+    os.makedirs(caminho, exist_ok=True)
+    for campo in CSR_CAMPOS:
+        np.save(os.path.join(caminho, f"{campo}.npy"), np.asarray(getattr(grafo, campo)))
+
+# ------------------------------------------------------
+def open_csr(caminho):
+    """!
+    @brief Abre um grafo guardado com `save_csr`, mapeado em memória.
+
+    Os arrays são abertos com `numpy.memmap` (só de leitura): nada é lido do disco
+    até ser acedido, e o sistema operativo partilha as mesmas páginas entre todos
+    os processos que abram o mesmo diretório, sem cópias.
+
+    @param caminho Caminho do diretório criado por `save_csr`.
+    @return GrafoCSR cujos arrays são `numpy.memmap`.
+    @note Para usar o grafo noutro processo deve passar-se o `caminho` e abri-lo lá
+          (ver `attach_engine`); enviar o próprio GrafoCSR (pickle) copiaria os arrays.
+    """
+
+    return GrafoCSR(*(np.load(os.path.join(caminho, f"{campo}.npy"), mmap_mode='r') for campo in CSR_CAMPOS))
@@ -6,7 +6,7 @@ import matplotlib.lines as mlines
 """!
 @file draw.py
 @brief Módulo para visualização de grafos e caminhos.
-Contém funções para desenhar grafos direcionados, destacando caminhos específicos encontrados por algoritmos como TSA e Suurballe, além de visualizações intermediárias.
+Contém funções para desenhar grafos direcionados, destacando caminhos específicos encontrados por algoritmos como TSA e Suurballe (ou k caminhos disjuntos), além de visualizações intermediárias.
 """
 
 def draw_network(G, node_mapping, origem, destino, caminho_tsa, caminho2, caminho_sur, caminho3, algoritmo):
@@ -35,6 +35,7 @@ def draw_network(G, node_mapping, origem, destino, caminho_tsa, caminho2, caminh
                      2 - Apenas Suurballe (usa `caminho_sur` e `caminho3`).
                      3 - Ambos os algoritmos (TSA e Suurballe), exibidos em subplots separados.
                          (usa `caminho_tsa`, `caminho2`, `caminho_sur`, `caminho3`).
+                     4 - Apenas Bhandari (usa `caminho_sur` e `caminho3`).
     @note Se `algoritmo` for 3, a função cria dois subplots. Caso contrário, um único plot.
     @note A imagem gerada é guardada em "output/Rede Final.png".
     """
@@ -109,6 +110,9 @@ def draw_network(G, node_mapping, origem, destino, caminho_tsa, caminho2, caminh
     elif algoritmo == 2:
         legenda.append(mlines.Line2D([], [], color='orange', linewidth=3, label="Caminho Inicial Surballe"))
         legenda.append(mlines.Line2D([], [], color='blue', linewidth=3, label="Suurballe"))
+    elif algoritmo == 4:
+        legenda.append(mlines.Line2D([], [], color='orange', linewidth=3, label="Caminho 1 Bhandari"))
+        legenda.append(mlines.Line2D([], [], color='blue', linewidth=3, label="Bhandari"))
     elif algoritmo == 3:
             # Subplots: um para TSA, outro para Suurballe
             fig, axs = plt.subplots(1, 2, figsize=(18, 7))
@@ -166,6 +170,58 @@ def draw_network(G, node_mapping, origem, destino, caminho_tsa, caminho2, caminh
     plt.show()
     
 
+# ------------------------------------------------------
+def draw_k_paths(G, node_mapping, origem, destino, caminhos):
+    """!
+    @brief Desenha o grafo destacando k caminhos disjuntos, cada um com a sua cor.
+
+    @param G O grafo NetworkX direcionado.
+    @param node_mapping Dicionário que mapeia o índice numérico ao nome real do nó.
+    @param origem O nome (string) do nó de origem.
+    @param destino O nome (string) do nó de destino.
+    @param caminhos Lista de caminhos (listas de nomes), p.ex. devolvida por `k_disjoint_paths`.
+    @note A imagem gerada é guardada em "output/Rede Final.png".
+    """
+
+    pos = nx.get_node_attributes(G, 'pos')
+    labels = {nome: f"{num}: {nome}" for num, nome in node_mapping.items()}
+    cores = ['orange', 'blue', 'purple', 'green', 'brown', 'magenta', 'cyan', 'olive']
+
+    node_colors = {
+        nome: 'green' if nome == origem else
+            'red' if nome == destino else
+            'lightblue'
+        for nome in G.nodes
+    }
+
+    plt.figure(figsize=(10, 7))
+    plt.subplots_adjust(left=0, right=1, top=1, bottom=0)
+
+    nx.draw_networkx_edges(G, pos, edge_color='black', alpha=0.8, width=1.2)
+
+    legenda = [
+        mlines.Line2D([], [], color='green', marker='s', markersize=8, linestyle='None', label="Nó Origem"),
+        mlines.Line2D([], [], color='red', marker='s', markersize=8, linestyle='None', label="Nó Destino")
+    ]
+
+    for i, caminho in enumerate(caminhos):
+        cor = cores[i % len(cores)]
+        path_edges = list(zip(caminho, caminho[1:]))
+        nx.draw_networkx_edges(G, pos, edgelist=path_edges, edge_color=cor, width=3, arrows=True, arrowsize=20)
+        legenda.append(mlines.Line2D([], [], color=cor, linewidth=3, label=f"Caminho {i + 1}"))
+
+    for nome, (x, y) in pos.items():
+        label_text = labels.get(nome, nome)
+        plt.text(x, y, label_text, fontsize=8, fontweight='bold',
+                bbox=dict(facecolor=node_colors.get(nome, 'lightblue'), edgecolor='black', boxstyle='round,pad=0.3'),
+                horizontalalignment='center', verticalalignment='center')
+
+    plt.legend(handles=legenda, loc='upper right')
+    plt.box(False)
+    plt.title(f"Rede Final ({len(caminhos)} caminhos disjuntos)")
+    plt.savefig("output/Rede Final.png", dpi=300)
+    plt.show()
+
 # ------------------------------------------------------
 def draw_empty_network(G, node_mapping):
     """!
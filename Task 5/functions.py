@@ -1,5 +1,11 @@
+import io
+import xml.etree.ElementTree as ET
+from array import array
+import numpy as np
 import networkx as nx
 from draw import *
+from sndlib import *
+from motor import *
 
 """!
 @file functions.py
@@ -7,19 +13,34 @@ from draw import *
 Inclui funções para processar dados de entrada, encontrar caminhos disjuntos com TSA e Suurballe, e realizar transformações no grafo como node splitting.
 """
 
+# Estrutura de uma procura (secção DEMANDS): índices dos nós de origem e destino
+# (os mesmos do node_mapping), unidade de encaminhamento e valor da procura
+DEMAND_DTYPE = np.dtype([('origem', np.int32), ('destino', np.int32), ('unidade', np.int32), ('valor', np.float64)])
+
+# Estrutura de uma ligação (secção LINKS): índices dos nós (node_mapping), capacidade
+# pré-instalada e respetivo custo, custo de encaminhamento e custo de instalação (setup)
+LINK_DTYPE = np.dtype([('origem', np.int32), ('destino', np.int32), ('capacidade', np.float64),
+                       ('custo_capacidade', np.float64), ('custo_encaminhamento', np.float64), ('custo_setup', np.float64)])
+
 def retrieve_data(data):
     
     """!
-    @brief Processa os dados de entrada (string) para criar um grafo direcionado NetworkX.
-
-    Esta função analisa uma string contendo informações sobre nós (com coordenadas)
-    e links (arestas com custos) para construir um grafo. Os nós são adicionados
-    com um atributo 'pos' para as suas coordenadas, e as arestas são adicionadas
-    com um atributo 'cost'. As arestas são consideradas bidirecionais (adiciona
-    target->source com o mesmo custo).
-
-    @param data A string de entrada que contém os dados da rede a serem analisados.
-                Deve seguir um formato específico com seções "NODES (...)" e "LINKS (...)".
+    @brief Processa os dados de entrada para criar um grafo direcionado NetworkX.
+
+    Esta função percorre os registos de um ficheiro SNDlib (formato nativo), lidos
+    sequencialmente por `parse_sndlib`, e constrói o grafo à medida que os lê.
+    Os nós são adicionados com um atributo 'pos' para as suas coordenadas, e as arestas
+    são adicionadas com um atributo 'cost' (e com o identificador da ligação em 'link').
+    As arestas são consideradas bidirecionais (adiciona target->source com o mesmo custo).
+    As procuras da secção DEMANDS são guardadas num array NumPy (`DEMAND_DTYPE`),
+    em `G.graph['demands']`, com os nós identificados pelos índices do `node_mapping`,
+    e os respetivos identificadores em `G.graph['demand_ids']`.
+    Os restantes dados de cada ligação (capacidade pré-instalada, custos e módulos)
+    são guardados em arrays por ligação (ver `set_links`).
+
+    @param data Os dados da rede a serem analisados: um iterável de linhas (p.ex., o
+                ficheiro aberto, lido linha a linha) ou uma string com o conteúdo completo.
+                Deve seguir o formato SNDlib, com secções "NODES (...)" e "LINKS (...)".
 
     @return Tuple (G, node_mapping):
         - G (nx.DiGraph): O grafo direcionado criado a partir dos dados.
@@ -31,78 +52,255 @@ def retrieve_data(data):
     G = nx.DiGraph()
     
     node_mapping = {}  
-    
-    # fetch secção dos nós
-    nodes_section = data[data.find("NODES ("):data.find("# LINK ")]
-    nodes_section = nodes_section.split('\n')
-
-    linhas_nos = []
-    for linha in nodes_section:
-        linha = linha.strip()
-        if not (linha.startswith('#') or linha.startswith(')')):
-            linhas_nos.append(linha)
-
-    # elimina linhas indesejadas
-    linhas_nos = linhas_nos[1:-2]
-
-    # adicionar nós ao graph
-    for index, linha in enumerate(linhas_nos):
-
-        # dividir cada linha em nome [esquerda] e coordenadas [direita]
-        no = linha.split('(')
-        nome_no = no[0].strip()
-        coordenadas = no[1].strip(' )').split()
-        # adicionar nó
-        G.add_node(nome_no, pos = (float(coordenadas[0]), float(coordenadas[1])))
-        node_mapping[index] = nome_no
-
-    
-    # fetch secção dos links
-    links_section = data[data.find("LINKS ("):data.find("DEMANDS (")]
+    indices = {}    # nome do nó -> índice no node_mapping
+
+    # colunas das procuras (arrays compactos, convertidos no fim)
+    procura_origem = array('i')
+    procura_destino = array('i')
+    procura_unidade = array('i')
+    procura_valor = array('d')
+    procura_ids = []
+
+    # colunas das ligações e lista plana dos módulos (capacidade, custo)
+    ligacao_colunas = tuple(array('d') for _ in LINK_DTYPE.names)
+    modulos_ptr = array('q', [0])
+    modulos = array('d')
+    ligacao_ids = []
+
+    # uma string é lida linha a linha, sem a dividir numa lista
+    if isinstance(data, str):
+        data = io.StringIO(data)
+
+    for seccao, campos in parse_sndlib(data):
+
+        # NODE SECTION
+        #
+        # <node_id> [(<longitude>, <latitude>)]
+        if seccao == "NODES":
+            nome_no = campos[0]
+            # adicionar nó
+            if len(campos) > 3:
+                G.add_node(nome_no, pos = (float(campos[2]), float(campos[3])))
+            else:
+                G.add_node(nome_no)
+            indices[nome_no] = len(node_mapping)
+            node_mapping[len(node_mapping)] = nome_no
+
+        # LINK SECTION
+        #
+        # <link_id> ( <source> <target> ) <pre_installed_capacity> <pre_installed_capacity_cost> <routing_cost> <setup_cost> ( {<module_capacity> <module_cost>}* )
+        elif seccao == "LINKS":
+            source, target = campos[2], campos[3]  # Nó origem e destino
+            routing_cost = float(campos[11])  # Custo da aresta
+
+            # Adiciona a aresta com custo como atributo
+            # Estamos a guardar na variável 'cost' para ser compatível com o método de Dijkstra
+            # O identificador da ligação fica em 'link' (usado para escrever ADMISSIBLE_PATHS)
+            G.add_edge(source, target, cost=routing_cost, link=campos[0])
+            G.add_edge(target, source, cost=routing_cost, link=campos[0])
+
+            # dados completos da ligação: capacidade e custos [5:9] e módulos [10:-1]
+            for coluna, valor in zip(ligacao_colunas, (indices[source], indices[target], *map(float, campos[5:9]))):
+                coluna.append(valor)
+            modulos.extend(map(float, campos[10:-1]))
+            modulos_ptr.append(len(modulos) // 2)
+            ligacao_ids.append(campos[0])
+
+        # DEMAND SECTION
+        #
+        # <demand_id> ( <source> <target> ) <routing_unit> <demand_value> <max_path_length>
+        elif seccao == "DEMANDS":
+            procura_origem.append(indices[campos[2]])
+            procura_destino.append(indices[campos[3]])
+            procura_unidade.append(int(campos[5]))
+            procura_valor.append(float(campos[6]))
+            procura_ids.append(campos[0])
+
+    # matriz de procuras, alinhada com o node_mapping
+    set_demands(G, procura_origem, procura_destino, procura_unidade, procura_valor, procura_ids)
+    set_links(G, ligacao_colunas, modulos_ptr, modulos, ligacao_ids)
 
-    linhas_links = []
-    for linha in links_section.split('\n'):
-        linha = linha.strip()
-        if not linha.startswith('#'):
-            linhas_links.append(linha)
+    return G, node_mapping
+# ------------------------------------------------------
 
-    linhas_links = linhas_links[1:-3]
-    
-    # LINK SECTION
-    #
-    # <link_id> ( <source> <target> ) <pre_installed_capacity> <pre_installed_capacity_cost> <routing_cost> <setup_cost> ( {<module_capacity> <module_cost>}* )
+def retrieve_xml_data(ficheiro):
+    """!
+    @brief Lê uma rede no formato XML do SNDlib para o mesmo grafo criado por `retrieve_data`.
+
+    O ficheiro é percorrido com `ElementTree.iterparse`: cada nó, ligação e procura é
+    processado assim que o respetivo elemento termina e é logo descartado, pelo que a
+    memória usada não depende do tamanho do ficheiro.
+    Como no formato nativo, o custo ('cost') de cada aresta é o custo do primeiro módulo
+    adicional da ligação (ou o routingCost, se a ligação não tiver módulos), e as arestas
+    são bidirecionais.
+
+    @param ficheiro Caminho (ou ficheiro aberto em modo binário) do ficheiro XML.
+    @return Tuple (G, node_mapping), com a mesma estrutura devolvida por `retrieve_data`
+            (incluindo as procuras e os arrays das ligações).
+    """
 
-    # adicionar arestas
-    for linha in linhas_links:
+    G = nx.DiGraph()
+    node_mapping = {}
+    indices = {}    # nome do nó -> índice no node_mapping
+
+    procura_origem = array('i')
+    procura_destino = array('i')
+    procura_unidade = array('i')
+    procura_valor = array('d')
+    procura_ids = []
+
+    ligacao_colunas = tuple(array('d') for _ in LINK_DTYPE.names)
+    modulos_ptr = array('q', [0])
+    modulos_flat = array('d')
+    ligacao_ids = []
+
+    def texto(elem, caminho, omissao=None):
+        # texto de um elemento filho, ignorando o namespace do SNDlib
+        filho = elem.find('/'.join('{*}' + parte for parte in caminho.split('/')))
+        return filho.text.strip() if filho is not None and filho.text else omissao
+
+    pais = []   # elementos abertos (para descartar os já processados)
+    for evento, elem in ET.iterparse(ficheiro, events=('start', 'end')):
+        if evento == 'start':
+            pais.append(elem)
+            continue
+        pais.pop()
+        tag = elem.tag.rsplit('}', 1)[-1]
+
+        # <node id="..."><coordinates><x>..</x><y>..</y></coordinates></node>
+        if tag == 'node':
+            nome_no = elem.get('id')
+            x, y = texto(elem, 'coordinates/x'), texto(elem, 'coordinates/y')
+            if x is not None and y is not None:
+                G.add_node(nome_no, pos = (float(x), float(y)))
+            else:
+                G.add_node(nome_no)
+            indices[nome_no] = len(node_mapping)
+            node_mapping[len(node_mapping)] = nome_no
+
+        # <link id="..."><source/><target/><preInstalledModule/><routingCost/><setupCost/><additionalModules/></link>
+        elif tag == 'link':
+            source, target = texto(elem, 'source'), texto(elem, 'target')
+            modulos = [(float(texto(modulo, 'capacity')), float(texto(modulo, 'cost')))
+                       for modulo in elem.iterfind('{*}additionalModules/{*}addModule')]
+            routing_cost = modulos[0][1] if modulos else float(texto(elem, 'routingCost', 0))
+
+            G.add_edge(source, target, cost=routing_cost, link=elem.get('id'))
+            G.add_edge(target, source, cost=routing_cost, link=elem.get('id'))
+
+            dados = (indices[source], indices[target],
+                     float(texto(elem, 'preInstalledModule/capacity', 0)), float(texto(elem, 'preInstalledModule/cost', 0)),
+                     float(texto(elem, 'routingCost', 0)), float(texto(elem, 'setupCost', 0)))
+            for coluna, valor in zip(ligacao_colunas, dados):
+                coluna.append(valor)
+            for capacidade, custo in modulos:
+                modulos_flat.extend((capacidade, custo))
+            modulos_ptr.append(len(modulos_flat) // 2)
+            ligacao_ids.append(elem.get('id'))
+
+        # <demand id="..."><source/><target/><demandValue/></demand>
+        elif tag == 'demand':
+            procura_origem.append(indices[texto(elem, 'source')])
+            procura_destino.append(indices[texto(elem, 'target')])
+            procura_unidade.append(int(texto(elem, 'routingUnit', 1)))
+            procura_valor.append(float(texto(elem, 'demandValue')))
+            procura_ids.append(elem.get('id'))
 
-        if linha.startswith('#') or linha.startswith(')'):
+        else:
             continue
 
-        # dividir cada linha em nome [esquerda], fonte e destino [meio] e resto [direita]
-        # só nos interessa a fonte e o destino de cada aresta
-        elementos = linha.split()
-        source, target = elementos[2], elementos[3]  # Nó origem e destino
-        routing_cost = float(elementos[11])  # Custo da aresta
-        
-        # Adiciona a aresta com custo como atributo
-        # Estamos a guardar na variável 'cost' para ser compatível com o método de Dijkstra
-        G.add_edge(source, target, cost=routing_cost)
-        G.add_edge(target, source, cost=routing_cost)
+        # descarta o elemento processado (e a referência guardada no pai)
+        elem.clear()
+        if pais:
+            pais[-1].clear()
+
+    set_demands(G, procura_origem, procura_destino, procura_unidade, procura_valor, procura_ids)
+    set_links(G, ligacao_colunas, modulos_ptr, modulos_flat, ligacao_ids)
 
     return G, node_mapping
 # ------------------------------------------------------
 
-def find_best_paths(G, origem, destino, algoritmo):
+def set_demands(G, origem, destino, unidade, valor, ids):
+    """!
+    @brief Guarda a matriz de procuras no grafo, num array NumPy com a estrutura `DEMAND_DTYPE`.
+
+    @param G O grafo onde guardar as procuras (`G.graph['demands']` e `G.graph['demand_ids']`).
+    @param origem Sequência com o índice (node_mapping) do nó de origem de cada procura.
+    @param destino Sequência com o índice (node_mapping) do nó de destino de cada procura.
+    @param unidade Sequência com a unidade de encaminhamento de cada procura.
+    @param valor Sequência com o valor de cada procura.
+    @param ids Lista com o identificador de cada procura.
+    """
+
+    demands = np.empty(len(valor), dtype=DEMAND_DTYPE)
+    demands['origem'] = origem
+    demands['destino'] = destino
+    demands['unidade'] = unidade
+    demands['valor'] = valor
+    G.graph['demands'] = demands
+    G.graph['demand_ids'] = np.array(ids, dtype=str)
+# ------------------------------------------------------
+
+def set_links(G, colunas, modulos_ptr, modulos, ids):
+    """!
+    @brief Guarda os dados das ligações no grafo, em arrays NumPy indexados pela ordem das ligações.
+
+    - `G.graph['links']`: array com a estrutura `LINK_DTYPE` (uma linha por ligação).
+    - `G.graph['link_ids']`: identificador de cada ligação (o atributo 'link' das arestas).
+    - `G.graph['modules']`: array (k x 2) com a capacidade e o custo de cada módulo.
+    - `G.graph['modules_ptr']`: os módulos da ligação i estão em `modules[modules_ptr[i]:modules_ptr[i+1]]`.
+
+    @param G O grafo onde guardar os dados.
+    @param colunas Sequências com os valores de cada campo de `LINK_DTYPE`, pela mesma ordem.
+    @param modulos_ptr Sequência com o índice do primeiro módulo de cada ligação (e o total no fim).
+    @param modulos Sequência plana com (capacidade, custo) de todos os módulos.
+    @param ids Lista com o identificador de cada ligação.
+    """
+
+    links = np.empty(len(ids), dtype=LINK_DTYPE)
+    for campo, coluna in zip(LINK_DTYPE.names, colunas):
+        links[campo] = coluna
+    G.graph['links'] = links
+    G.graph['link_ids'] = np.array(ids, dtype=str)
+    G.graph['modules'] = np.asarray(modulos, dtype=np.float64).reshape(-1, 2)
+    G.graph['modules_ptr'] = np.asarray(modulos_ptr, dtype=np.int64)
+# ------------------------------------------------------
+
+def demand_pairs(G, node_mapping):
+    """!
+    @brief Devolve os pares (origem, destino) distintos da matriz de procuras do grafo.
+
+    Os pares são devolvidos pela ordem em que aparecem na secção DEMANDS, já
+    convertidos para os nomes dos nós, e podem ser passados diretamente a
+    `calculos_auxiliares` em vez de todos os pares de nós.
+
+    @param G O grafo criado por `retrieve_data` (com `G.graph['demands']`).
+    @param node_mapping Dicionário que mapeia o índice numérico para o nome do nó.
+    @return Lista de tuplos (origem, destino) com os nomes dos nós.
+            Lista vazia se o grafo não tiver procuras.
+    """
+
+    demands = G.graph.get('demands')
+    if demands is None or len(demands) == 0:
+        return []
+
+    # pares únicos, mantendo a ordem do ficheiro
+    pares = dict.fromkeys(zip(demands['origem'].tolist(), demands['destino'].tolist()))
+    return [(node_mapping[origem], node_mapping[destino]) for origem, destino in pares if origem != destino]
+# ------------------------------------------------------
+
+def find_best_paths(G, origem, destino, algoritmo, ligacoes=False):
     """!
     @brief Encontra os dois melhores caminhos disjuntos em termos de nós (exceto origem/destino)
            entre dois nós, com base no menor custo, usando a abordagem Two-Step.
 
     Esta função primeiro calcula o caminho mais curto (path1) entre os nós de origem e
     destino usando Dijkstra (baseado no atributo 'cost' das arestas).
-    Em seguida, cria uma cópia do grafo e remove todas as arestas de path1 e todos os
-    nós intermediários de path1 (nós que não são nem a origem nem o destino).
-    Depois, calcula o caminho mais curto (path2) nesta cópia modificada do grafo.
+    Em seguida, remove todas as arestas de path1 e todos os nós intermediários de path1
+    (nós que não são nem a origem nem o destino) e calcula o caminho mais curto (path2)
+    no grafo restante. Na versão disjunta em ligações só as arestas de path1 são removidas.
     Se não existir um segundo caminho, notifica e retorna None para path2 e cost2.
+    Os cálculos são feitos pelo motor CSR (`tsa_engine`), sobre os índices inteiros dos nós.
 
     @param G O grafo NetworkX direcionado.
     @param origem O nome (string) do nó de origem.
@@ -110,69 +308,77 @@ def find_best_paths(G, origem, destino, algoritmo):
     @param algoritmo Inteiro que indica o contexto do algoritmo (p.ex., 1 para TSA, 3 para Ambos).
                      Usado para controlar mensagens de impressão específicas do algoritmo.
                      Se None, impressões genéricas ou nenhumas são feitas.
+    @param ligacoes Booleano. Se True, os caminhos são disjuntos em ligações (podem partilhar
+                    nós); caso contrário (por omissão), são disjuntos em nós.
 
     @return Tuple (path1, cost1, path2, cost2), onde:
         - path1 (list/None): O primeiro caminho mais curto (lista de nós). None se não houver caminho.
         - cost1 (float/None): O custo total do primeiro caminho. None se não houver caminho.
-        - path2 (list/None): O segundo caminho mais curto disjunto em nós. None se não existir.
+        - path2 (list/None): O segundo caminho mais curto disjunto (em nós ou em ligações). None se não existir.
         - cost2 (float/None): O custo total do segundo caminho. None se não existir.
     """
 
-    # primeiro - verificar se existe caminho entre nós selecionados
-    if not nx.has_path(G, origem, destino):
+    # os dois caminhos são calculados pelo motor, com os índices inteiros dos nós
+    motor = engine_graph(G)
+    path1, cost1, path2, cost2 = tsa_engine(motor, motor.indice[origem], motor.indice[destino], ligacoes)
+    path1, path2 = engine_names(motor, path1), engine_names(motor, path2)
+
+    if path1 is None:
         print("Não há caminho entre os nós selecionados.")
         return None, None, None, None
 
     # Primeiro caminho
-    path1 = nx.shortest_path(G, source=origem, target=destino, weight='cost')
-    cost1 = nx.shortest_path_length(G, source=origem, target=destino, weight='cost')
     if algoritmo == 1:
         print(f"Primeiro caminho: {path1} (Custo: {cost1})")
     elif algoritmo == 3: 
         print("CAMINHO MAIS CURTO: ")
         print(f"\tCaminho: {path1}")
-    
-    # Cópia do grafo para podermos remover o primeiro caminho e calcular o segundo
-    G_copia = G.copy()
-
-    # Remoção do primeiro caminho
-    for i in range(len(path1) - 1):
-
-        # se tem a aresta, remove-a
-        if G_copia.has_edge(path1[i], path1[i+1]):
-            G_copia.remove_edge(path1[i], path1[i+1])
-        
-        # se tem a aresta inversa, remove-a (grafos bidirecionais)
-        if G_copia.has_edge(path1[i+1], path1[i]):  
-            G_copia.remove_edge(path1[i+1], path1[i])
-
-    # Remoção dos nós intermediários
-    for node in path1[1:-1]:
-        G_copia.remove_node(node)
 
     # Segundo caminho
-    try:
-        path2 = nx.shortest_path(G_copia, source=origem, target=destino, weight='cost')
-        cost2 = nx.shortest_path_length(G_copia, source=origem, target=destino, weight='cost')
+    if path2 is not None:
         if algoritmo == 3:
             print("Método TSA: ")
             print(f"\tCaminho: {path2}")
         if algoritmo == 1:          
             print(f"Segundo caminho: {path2} (Custo: {cost2})")
         
-    except nx.NetworkXNoPath:
+    else:
         if algoritmo == 3:
             print("Método TSA: ")
         if algoritmo == 1 or algoritmo == 3:
             
             print("\tAviso: Não há um segundo caminho possível.")
-            
-        path2, cost2 = None, None
 
     return path1, cost1, path2, cost2
 # ------------------------------------------------------
 
-def suurballe(G, origem_orig, destino_orig, algoritmo, option, calculo):
+def find_best_paths_from_source(G, origem, destinos=None, ligacoes=False):
+    """!
+    @brief Aplica o Two-Step Approach de uma origem para vários destinos.
+
+    O primeiro caminho de todos os destinos sai de uma só árvore de caminhos mais curtos
+    da origem (ver `tsa_source_engine`); para cada destino só é feita a segunda pesquisa.
+    Usado nos cálculos estatísticos, pelo que nada é impresso.
+
+    @param G O grafo NetworkX direcionado.
+    @param origem O nome (string) do nó de origem.
+    @param destinos Opcional. Lista com os nomes dos nós de destino (por omissão, todos os outros nós).
+    @param ligacoes Booleano. Se True, os caminhos são disjuntos em ligações (podem partilhar
+                    nós); caso contrário (por omissão), são disjuntos em nós.
+
+    @return dict: `{destino: (path1, cost1, path2, cost2)}`, com os mesmos valores que
+            `find_best_paths` devolveria para cada par.
+    """
+
+    motor = engine_graph(G)
+    indices = None if destinos is None else [motor.indice[destino] for destino in destinos]
+    resultados = tsa_source_engine(motor, motor.indice[origem], indices, ligacoes)
+
+    return {motor.nomes[destino]: (engine_names(motor, path1), cost1, engine_names(motor, path2), cost2)
+            for destino, (path1, cost1, path2, cost2) in resultados.items()}
+
+# ------------------------------------------------------
+def suurballe(G, origem_orig, destino_orig, algoritmo, option, calculo, ligacoes=False):
     """!
     @brief Implementa o algoritmo de Suurballe para encontrar dois caminhos disjuntos em arestas
            entre nós de origem e destino num grafo.
@@ -185,6 +391,10 @@ def suurballe(G, origem_orig, destino_orig, algoritmo, option, calculo):
     3. Encontra o segundo caminho P2_split no grafo residual H_residual.
     4. Remove arcos opostos (desentrelaçamento) para formar os caminhos finais P1 e P2.
     Finalmente, os caminhos P1 e P2 são mapeados de volta para os nós do grafo original.
+    Quando os passos intermédios não são desenhados, o cálculo é feito pelo motor CSR
+    (`suurballe_engine`); caso contrário, é feito passo a passo sobre grafos NetworkX.
+    Na versão disjunta em ligações não há node splitting (o cálculo é sempre feito pelo motor,
+    sobre o grafo original, sem desenho dos passos intermédios).
 
     @param G O grafo NetworkX direcionado original.
     @param origem_orig O nome (string) do nó de origem no grafo original.
@@ -195,6 +405,8 @@ def suurballe(G, origem_orig, destino_orig, algoritmo, option, calculo):
                   Usado para acelerar quando apenas o resultado final é desejado.
     @param calculo Booleano. Se True, suprime a maioria das mensagens de impressão.
                    Útil quando a função é chamada em loop para cálculos estatísticos.
+    @param ligacoes Booleano. Se True, os caminhos são disjuntos em ligações (podem partilhar
+                    nós); caso contrário (por omissão), são disjuntos em nós.
 
     @return Tuple (P1, cost1, P2, cost2), onde:
         - P1 (list/None): O primeiro caminho disjunto em arestas (lista de nós).
@@ -204,6 +416,29 @@ def suurballe(G, origem_orig, destino_orig, algoritmo, option, calculo):
         - cost2 (float/None): O custo total do segundo caminho. None se P2 for None.
     """
 
+    # Sem desenho dos passos intermédios, os caminhos são calculados pelo motor CSR
+    # (os mesmos passos, sobre os índices inteiros dos nós)
+    if algoritmo != 2 or option or ligacoes:
+        motor = engine_graph(G)
+        P1, cost1, P2, cost2 = suurballe_engine(motor, motor.indice[origem_orig], motor.indice[destino_orig], ligacoes)
+        P1, P2 = engine_names(motor, P1), engine_names(motor, P2)
+
+        if P1 is None:
+            print("Não há caminho inicial.")
+            return None, None, None, None
+
+        if P2 is None:
+            if not calculo:
+                print("Não existe segundo caminho disjunto.")
+            return P1, cost1, None, None
+
+        if algoritmo == 2 or algoritmo == 3:
+            print("\nMétodo Suurballe (disjuntos em ligações):" if ligacoes else "\nMétodo Suurballe:")
+            print(f"\n\tCaminho 1: {P1} (Custo: {cost1})")
+            print(f"\n\tCaminho 2: {P2} (Custo: {cost2})")
+
+        return P1, cost1, P2, cost2
+
     # --- PASSO 0: Encontrar P1 no grafo original ---
     if algoritmo == 2 and not option: 
         print("\n--- Step 0: Encontrar 1º caminho no grafo original ---")
@@ -233,11 +468,11 @@ def suurballe(G, origem_orig, destino_orig, algoritmo, option, calculo):
         path = nx.shortest_path(H, source=s, weight='cost')
     except nx.NetworkXNoPath:
         print(f"Destino {t} não alcançável.")
-        return merge_split_path(P1_original), None, None, None
+        return P1_original, None, None, None
 
     if t not in path:
         print(f"Destino {t} não alcançável a partir de {s}.")
-        return merge_split_path(P1_original), None, None, None
+        return P1_original, None, None, None
 
     # P1_split é o caminho encontrado no grafo transformado
     # até o nó de destino
@@ -284,12 +519,12 @@ def suurballe(G, origem_orig, destino_orig, algoritmo, option, calculo):
     for u, v in node_pairs:
 
         # fica só os nomes sem _in/_out
-        base_u = u.rsplit('_', 1)[0]
-        base_v = v.rsplit('_', 1)[0]
+        base_u = H.graph['original'][u]
+        base_v = H.graph['original'][v]
 
-        # criar os nomes dos arcos inversos para facilitar
-        reverse_u = f"{base_v}_out"
-        reverse_v = f"{base_u}_in"
+        # nós do arco inverso (de v_out para u_in)
+        reverse_u = H.graph['split'][base_v][1]
+        reverse_v = H.graph['split'][base_u][0]
 
         # remove o arco de v para u
         if H_residual.has_edge(reverse_u, reverse_v):
@@ -329,13 +564,13 @@ def suurballe(G, origem_orig, destino_orig, algoritmo, option, calculo):
     except nx.NetworkXNoPath:
         if not calculo:
             print("Não existe segundo caminho disjunto.")
-        return merge_split_path(P1_original), None, None, None
+        return P1_original, None, None, None
     
     # Validação do P2
-    if not is_valid_path(P2_split, G):
+    if not is_valid_path(P2_split, G, H.graph['original']):
         if not calculo:
             print("P2 não corresponde a um caminho válido no grafo original.")
-        return merge_split_path(P1_original), None, None, None
+        return P1_original, None, None, None
     
     # --- Step 4: Remover arcos opostos ---
     if algoritmo == 2 and not option:
@@ -392,8 +627,8 @@ def suurballe(G, origem_orig, destino_orig, algoritmo, option, calculo):
 
     # Merge final para nós originais
     # P1_final e P2_final são os caminhos finais
-    P1 = merge_split_path(P1_final)
-    P2 = merge_split_path(P2_final)
+    P1 = merge_split_path(P1_final, H.graph['original'])
+    P2 = merge_split_path(P2_final, H.graph['original'])
 
     cost1 = path_cost(P1, G)
     cost2 = path_cost(P2, G)
@@ -416,6 +651,121 @@ def suurballe(G, origem_orig, destino_orig, algoritmo, option, calculo):
 
     return P1, cost1, P2, cost2
 
+# ------------------------------------------------------
+def suurballe_from_source(G, origem, destinos=None, ligacoes=False):
+    """!
+    @brief Aplica o algoritmo de Suurballe de uma origem para vários destinos.
+
+    Os pares de todos os destinos são calculados numa só passagem pelo algoritmo de
+    Suurballe e Tarjan (ver `suurballe_source_engine`), em vez de uma chamada a `suurballe`
+    por destino. Usado nos cálculos estatísticos, pelo que nada é impresso.
+
+    @param G O grafo NetworkX direcionado original.
+    @param origem O nome (string) do nó de origem.
+    @param destinos Opcional. Lista com os nomes dos nós de destino (por omissão, todos os outros nós).
+    @param ligacoes Booleano. Se True, os caminhos são disjuntos em ligações (podem partilhar
+                    nós); caso contrário (por omissão), são disjuntos em nós.
+
+    @return dict: `{destino: (P1, cost1, P2, cost2)}`, com o mesmo custo total que `suurballe`
+            devolveria para cada par (None nos caminhos que não existirem).
+    """
+
+    motor = engine_graph(G)
+    indices = None if destinos is None else [motor.indice[destino] for destino in destinos]
+    resultados = suurballe_source_engine(motor, motor.indice[origem], indices, ligacoes)
+
+    return {motor.nomes[destino]: (engine_names(motor, P1), cost1, engine_names(motor, P2), cost2)
+            for destino, (P1, cost1, P2, cost2) in resultados.items()}
+
+# ------------------------------------------------------
+def bhandari(G, origem, destino, algoritmo, calculo, ligacoes=False):
+    """!
+    @brief Implementa o algoritmo de Bhandari para encontrar dois caminhos disjuntos de custo mínimo.
+
+    Alternativa ao Suurballe com o mesmo resultado ótimo:
+    1. Encontra o caminho mais curto P1.
+    2. Remove os arcos de P1 e acrescenta-os no sentido inverso, com custo negativo
+       (na versão disjunta em nós, os nós intermédios de P1 são divididos).
+    3. Encontra o segundo caminho com um Dijkstra modificado (que aceita arcos negativos).
+    4. Remove os arcos em comum e separa os dois caminhos.
+    Não são precisos custos reduzidos nem o grafo de desentrelaçamento do Suurballe.
+    O cálculo é feito pelo motor CSR (`bhandari_engine`).
+
+    @param G O grafo NetworkX direcionado original.
+    @param origem O nome (string) do nó de origem.
+    @param destino O nome (string) do nó de destino.
+    @param algoritmo Inteiro que indica o contexto (p.ex., 4 para Bhandari). Controla as impressões.
+    @param calculo Booleano. Se True, suprime a maioria das mensagens de impressão.
+    @param ligacoes Booleano. Se True, os caminhos são disjuntos em ligações (podem partilhar
+                    nós); caso contrário (por omissão), são disjuntos em nós, como no Suurballe.
+
+    @return Tuple (P1, cost1, P2, cost2), como em `suurballe`.
+    """
+
+    motor = engine_graph(G)
+    P1, cost1, P2, cost2 = bhandari_engine(motor, motor.indice[origem], motor.indice[destino], ligacoes)
+    P1, P2 = engine_names(motor, P1), engine_names(motor, P2)
+
+    if P1 is None:
+        print("Não há caminho inicial.")
+        return None, None, None, None
+
+    if P2 is None:
+        if not calculo:
+            print("Não existe segundo caminho disjunto.")
+        return P1, cost1, None, None
+
+    if algoritmo == 4:
+        print(f"\nMétodo Bhandari (disjuntos em {'ligações' if ligacoes else 'nós'}):")
+        print(f"\n\tCaminho 1: {P1} (Custo: {cost1})")
+        print(f"\n\tCaminho 2: {P2} (Custo: {cost2})")
+
+    return P1, cost1, P2, cost2
+
+# ------------------------------------------------------
+def k_disjoint_paths(G, origem, destino, k, algoritmo, calculo, ligacoes=False):
+    """!
+    @brief Encontra k caminhos disjuntos (k >= 2) com custo total mínimo.
+
+    Generalização do Suurballe (que está limitado a dois caminhos): o fluxo entre a origem e o
+    destino é aumentado k vezes pelo caminho mais curto no grafo residual, com os potenciais de
+    Johnson no grafo dividido, e o fluxo final é decomposto nos k caminhos. Ao contrário de
+    repetir k vezes a remoção do TSA, o conjunto obtido é ótimo e basta uma pesquisa por caminho.
+    O cálculo é feito pelo motor CSR (`k_disjoint_engine`).
+
+    @param G O grafo NetworkX direcionado original.
+    @param origem O nome (string) do nó de origem.
+    @param destino O nome (string) do nó de destino.
+    @param k Número de caminhos pretendido (p.ex., 3 para proteção 1+2).
+    @param algoritmo Inteiro que indica o contexto (p.ex., 5 para k caminhos). Controla as impressões.
+    @param calculo Booleano. Se True, suprime a maioria das mensagens de impressão.
+    @param ligacoes Booleano. Se True, os caminhos são disjuntos em ligações (podem partilhar
+                    nós); caso contrário (por omissão), são disjuntos em nós.
+
+    @return Tuple (caminhos, custos): listas com os caminhos (nomes dos nós), por ordem
+            crescente de custo, e os respetivos custos. Se não existirem k caminhos
+            disjuntos, são devolvidos os que existirem.
+    """
+
+    motor = engine_graph(G)
+    resultado = k_disjoint_engine(motor, motor.indice[origem], motor.indice[destino], k, ligacoes)
+    caminhos = [engine_names(motor, caminho) for caminho, _ in resultado]
+    custos = [custo for _, custo in resultado]
+
+    if not caminhos:
+        print("Não há caminho inicial.")
+        return [], []
+
+    if len(caminhos) < k and not calculo:
+        print(f"Só existem {len(caminhos)} caminhos disjuntos.")
+
+    if algoritmo == 5:
+        print(f"\n{len(caminhos)} caminhos disjuntos em {'ligações' if ligacoes else 'nós'} (custo total: {sum(custos)}):")
+        for i, (caminho, custo) in enumerate(zip(caminhos, custos), 1):
+            print(f"\n\tCaminho {i}: {caminho} (Custo: {custo})")
+
+    return caminhos, custos
+
 # ------------------------------------------------------
 def split_nodes(G, source_orig, target_orig, path=None):
 
@@ -444,7 +794,9 @@ def split_nodes(G, source_orig, target_orig, path=None):
                 A lógica atual implica que APENAS nós em `path` são divididos.
 
     @return Tuple (H, s, t):
-        - H (nx.DiGraph): O novo grafo com nós divididos.
+        - H (nx.DiGraph): O novo grafo com nós divididos. `H.graph['original']` mapeia
+                          cada nó de H para o nome do nó original e `H.graph['split']`
+                          cada nó original para os nós (entrada, saída) de H.
         - s (str): O nó de origem em H (p.ex., `source_orig_out` ou `source_orig`).
         - t (str): O nó de destino em H (p.ex., `target_orig_in` ou `target_orig`).
     """
@@ -492,6 +844,11 @@ def split_nodes(G, source_orig, target_orig, path=None):
     if not H.has_node(s): H.add_node(s)
     if not H.has_node(t): H.add_node(t)
 
+    # nome original de cada nó de H (para voltar aos nomes originais sem analisar os sufixos,
+    # que podiam fazer parte do próprio nome do nó)
+    H.graph['original'] = {no: node for node, nos in new_mapping.items() for no in nos}
+    H.graph['split'] = new_mapping
+
     # Copia atributos 'pos' para o novo grafo (opcional, para debug/visualização)
     pos_orig = nx.get_node_attributes(G, 'pos')
     new_pos = {}
@@ -506,7 +863,7 @@ def split_nodes(G, source_orig, target_orig, path=None):
     return H, s, t
 
 # ------------------------------------------------------
-def merge_split_path(split_path):
+def merge_split_path(split_path, original=None):
     """!
     @brief Converte um caminho do grafo dividido (com nós '_in'/'_out') de volta para os nomes originais dos nós.
 
@@ -518,6 +875,9 @@ def merge_split_path(split_path):
 
     @param split_path Lista de strings, onde cada string é um nome de nó do grafo dividido.
                       Pode conter nomes como 'A_in', 'A_out', ou 'B' (se 'B' não foi dividido).
+    @param original Opcional. Dicionário com o nome original de cada nó do grafo dividido
+                    (`H.graph['original']`, criado por `split_nodes`). Se for indicado, os
+                    sufixos não são analisados, pelo que nomes com '_' são tratados corretamente.
     @return Uma lista de strings com os nomes dos nós originais, sem sufixos e sem
             duplicatas consecutivas. Retorna lista vazia se `split_path` for None ou vazio.
     @note Exemplo: ['S_out', 'A_in', 'A_out', 'B_in', 'B_out', 'T_in'] -> ['S', 'A', 'B', 'T']
@@ -526,13 +886,13 @@ def merge_split_path(split_path):
     if not split_path: return []
     original_path = []
     for node in split_path:
-        original_node = node.rsplit('_', 1)[0]
+        original_node = original.get(node, node) if original is not None else node.rsplit('_', 1)[0]
         if not original_path or original_path[-1] != original_node:
             original_path.append(original_node)
     return original_path
 
 # ------------------------------------------------------
-def is_valid_path(path, original_graph):
+def is_valid_path(path, original_graph, original=None):
 
     """!
     @brief Verifica se um caminho (potencialmente de um grafo dividido) corresponde a um caminho
@@ -545,11 +905,12 @@ def is_valid_path(path, original_graph):
 
     @param path A lista de nós do caminho, possivelmente com sufixos `_in`/`_out`.
     @param original_graph O grafo NetworkX original (sem nós divididos).
+    @param original Opcional. Nome original de cada nó do grafo dividido (ver `merge_split_path`).
     @return True se o caminho merged for válido (não vazio, com pelo menos 2 nós, e todas
             as arestas existem no `original_graph`), False caso contrário.
     """
 
-    merged_path = merge_split_path(path)
+    merged_path = merge_split_path(path, original)
     if not merged_path or len(merged_path) < 2:
         return False
     for u, v in zip(merged_path[:-1], merged_path[1:]):
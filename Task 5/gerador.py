@@ -0,0 +1,297 @@
+import os
+import math
+import random
+import argparse
+
+"""!
+@file gerador.py
+@brief Gerador de topologias sintéticas no formato nativo SNDlib.
+Gera redes geométricas (Waxman), em grelha, em anel com cordas e Barabási–Albert, com qualquer
+número de nós, e escreve-as em ficheiros que `retrieve_data` lê sem alterações. Com a mesma semente
+(seed) o ficheiro gerado é sempre o mesmo, o que permite repetir os testes de escala.
+"""
+
+# dimensão da área onde os nós são colocados (coordenadas entre 0 e LADO)
+LADO = 1000.0
+
+def gerar_waxman(n, grau=4, alpha=0.5, seed=0):
+    """!
+    @brief Gera uma topologia geométrica com o modelo de Waxman.
+
+    Os nós são colocados aleatoriamente num quadrado. Cada par de nós a uma distância
+    d inferior a um raio de vizinhança r é ligado com probabilidade exp(-d / (alpha * r)).
+    O raio é escolhido para que o grau médio fique próximo de `grau`, e só são testados
+    os pares em células vizinhas de uma grelha de lado r, pelo que o tempo de geração
+    cresce linearmente com o número de nós.
+    No fim, as componentes desligadas são unidas entre si (pela ordem da coordenada x),
+    para que a rede seja conexa.
+
+    @param n Número de nós.
+    @param grau Grau médio pretendido.
+    @param alpha Parâmetro de Waxman: valores maiores favorecem ligações mais longas.
+    @param seed Semente do gerador aleatório.
+    @return Tuple (pos, ligacoes):
+        - pos (list): Coordenadas (x, y) de cada nó.
+        - ligacoes (list): Pares (u, v) de índices de nós ligados (u < v).
+    """
+
+    rng = random.Random(seed)
+    pos = [(rng.uniform(0, LADO), rng.uniform(0, LADO)) for _ in range(n)]
+
+    # probabilidade média de ligação dentro do raio (integral de exp(-d/(alpha*r)) no disco)
+    a = alpha
+    p_media = 2 * a * a * (1 - math.exp(-1 / a) * (1 + 1 / a))
+    r = LADO * math.sqrt(grau / (math.pi * max(n - 1, 1) * p_media))
+
+    # grelha de células de lado r
+    celulas = {}
+    for i, (x, y) in enumerate(pos):
+        celulas.setdefault((int(x // r), int(y // r)), []).append(i)
+
+    ligacoes = []
+    for (cx, cy), nos in sorted(celulas.items()):
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                vizinhos = celulas.get((cx + dx, cy + dy), [])
+                for u in nos:
+                    for v in vizinhos:
+                        if u < v:
+                            d = math.dist(pos[u], pos[v])
+                            if d < r and rng.random() < math.exp(-d / (alpha * r)):
+                                ligacoes.append((u, v))
+
+    ligacoes.extend(ligar_componentes(pos, ligacoes))
+    return pos, ligacoes
+
+# ------------------------------------------------------
+def gerar_grelha(linhas, colunas, seed=0):
+    """!
+    @brief Gera uma topologia em grelha (cada nó ligado aos vizinhos de cima, baixo, esquerda e direita).
+
+    As posições dos nós são ligeiramente perturbadas (até 20% do espaçamento), para
+    que os custos (distâncias) não sejam todos iguais.
+
+    @param linhas Número de linhas da grelha.
+    @param colunas Número de colunas da grelha.
+    @param seed Semente do gerador aleatório.
+    @return Tuple (pos, ligacoes), como em `gerar_waxman`.
+    """
+
+    rng = random.Random(seed)
+    passo = LADO / max(linhas, colunas)
+    pos = [(c * passo + rng.uniform(-0.2, 0.2) * passo, l * passo + rng.uniform(-0.2, 0.2) * passo)
+           for l in range(linhas) for c in range(colunas)]
+
+    ligacoes = []
+    for l in range(linhas):
+        for c in range(colunas):
+            u = l * colunas + c
+            if c + 1 < colunas:
+                ligacoes.append((u, u + 1))
+            if l + 1 < linhas:
+                ligacoes.append((u, u + colunas))
+
+    return pos, ligacoes
+
+# ------------------------------------------------------
+def gerar_anel(n, cordas=None, seed=0):
+    """!
+    @brief Gera uma topologia em anel com cordas aleatórias.
+
+    Os nós são colocados numa circunferência e ligados ao seguinte; depois são
+    acrescentadas `cordas` ligações entre pares de nós escolhidos ao acaso.
+
+    @param n Número de nós (pelo menos 3).
+    @param cordas Número de cordas. Se None, são usadas n // 4 cordas.
+    @param seed Semente do gerador aleatório.
+    @return Tuple (pos, ligacoes), como em `gerar_waxman`.
+    @note Levanta ValueError se n < 3: com 2 nós, a ligação que fecha o anel repetiria (0, 1).
+    """
+
+    if n < 3:
+        raise ValueError(f"Um anel precisa de pelo menos 3 nós (n = {n}).")
+
+    rng = random.Random(seed)
+    if cordas is None:
+        cordas = n // 4
+
+    raio = LADO / 2
+    pos = [(raio + raio * math.cos(2 * math.pi * i / n), raio + raio * math.sin(2 * math.pi * i / n)) for i in range(n)]
+
+    ligacoes = [(i, i + 1) for i in range(n - 1)] + [(0, n - 1)]
+    existentes = set(ligacoes)
+
+    # no máximo, todas as ligações que ainda não existem
+    cordas = min(cordas, n * (n - 1) // 2 - len(existentes))
+    while cordas > 0:
+        u, v = sorted(rng.sample(range(n), 2))
+        if (u, v) not in existentes:
+            existentes.add((u, v))
+            ligacoes.append((u, v))
+            cordas -= 1
+
+    return pos, ligacoes
+
+# ------------------------------------------------------
+def gerar_barabasi_albert(n, m=2, seed=0):
+    """!
+    @brief Gera uma topologia Barabási–Albert (ligação preferencial).
+
+    Começa com `m` nós; cada novo nó liga-se a `m` nós já existentes, escolhidos com
+    probabilidade proporcional ao seu grau. As posições dos nós são aleatórias.
+
+    @param n Número de nós (maior que m).
+    @param m Número de ligações de cada novo nó.
+    @param seed Semente do gerador aleatório.
+    @return Tuple (pos, ligacoes), como em `gerar_waxman`.
+    """
+
+    rng = random.Random(seed)
+    pos = [(rng.uniform(0, LADO), rng.uniform(0, LADO)) for _ in range(n)]
+
+    ligacoes = []
+    repetidos = []              # cada nó aparece tantas vezes quanto o seu grau
+    alvos = list(range(m))      # nós a que o próximo nó se liga
+    for novo in range(m, n):
+        ligacoes.extend((alvo, novo) for alvo in alvos)
+        repetidos.extend(alvos)
+        repetidos.extend([novo] * m)
+
+        escolhidos = set()
+        while len(escolhidos) < m:
+            escolhidos.add(rng.choice(repetidos))
+        alvos = sorted(escolhidos)
+
+    return pos, ligacoes
+
+# ------------------------------------------------------
+def ligar_componentes(pos, ligacoes):
+    """!
+    @brief Devolve as ligações necessárias para tornar a rede conexa.
+
+    As componentes conexas são identificadas com union-find e ligadas em cadeia,
+    pela ordem da coordenada x do seu primeiro nó (o que evita ligações muito longas).
+
+    @param pos Coordenadas (x, y) de cada nó.
+    @param ligacoes Pares (u, v) já existentes.
+    @return list: Novas ligações (u, v), uma entre cada par de componentes consecutivas.
+    """
+
+    pai = list(range(len(pos)))
+
+    def raiz(u):
+        while pai[u] != u:
+            pai[u] = pai[pai[u]]
+            u = pai[u]
+        return u
+
+    for u, v in ligacoes:
+        pai[raiz(u)] = raiz(v)
+
+    # primeiro nó de cada componente
+    representantes = {}
+    for u in range(len(pos)):
+        representantes.setdefault(raiz(u), u)
+
+    ordem = sorted(representantes.values(), key=lambda u: pos[u][0])
+    return [tuple(sorted(par)) for par in zip(ordem[:-1], ordem[1:])]
+
+# ------------------------------------------------------
+def escrever_sndlib(ficheiro, nome, pos, ligacoes, procuras=None, seed=0):
+    """!
+    @brief Escreve uma topologia num ficheiro no formato nativo SNDlib.
+
+    São escritas as secções NODES (com coordenadas), LINKS e DEMANDS, e uma secção
+    ADMISSIBLE_PATHS vazia, tal como nos ficheiros da pasta 'networks/'.
+    O custo de cada ligação é a distância entre os nós (arredondada às centésimas)
+    e é escrito como custo do único módulo da ligação, que é o valor usado como
+    'cost' por `retrieve_data`. As procuras ligam pares de nós distintos escolhidos
+    ao acaso, com valores inteiros entre 1 e 100.
+
+    @param ficheiro Caminho do ficheiro a criar.
+    @param nome Nome da rede (escrito no cabeçalho).
+    @param pos Coordenadas (x, y) de cada nó.
+    @param ligacoes Pares (u, v) de índices de nós ligados.
+    @param procuras Número de procuras a gerar. Se None, é gerada uma procura por nó.
+    @param seed Semente usada para as procuras.
+    """
+
+    rng = random.Random(seed)
+    n = len(pos)
+    if procuras is None:
+        procuras = n
+    procuras = min(procuras, n * (n - 1))
+
+    with open(ficheiro, 'w') as file:
+        file.write(f"?SNDlib native format; type: network; version: 1.0\n# network {nome}\n\n")
+
+        file.write("# META SECTION\n#\n# <attribute> <content>\n\nMETA (\n")
+        file.write(f"  granularity  = generated\n  time  = seed {seed}\n  unit  = UNIT\n  origin  = gerador.py\n)\n\n")
+
+        file.write("# NODE SECTION\n#\n# <node_id> [(<longitude>, <latitude>)]\n\nNODES (\n")
+        for i, (x, y) in enumerate(pos):
+            file.write(f"  N{i + 1} ( {x:.2f} {y:.2f} )\n")
+        file.write(")\n\n")
+
+        file.write("# LINK SECTION\n#\n# <link_id> ( <source> <target> ) <pre_installed_capacity> <pre_installed_capacity_cost> "
+                   "<routing_cost> <setup_cost> ( {<module_capacity> <module_cost>}* )\n\nLINKS (\n")
+        for k, (u, v) in enumerate(ligacoes, 1):
+            custo = max(round(math.dist(pos[u], pos[v]), 2), 0.01)
+            file.write(f"  L{k} ( N{u + 1} N{v + 1} ) 0.00 0.00 0.00 0.00 ( 40.00 {custo:.2f} )\n")
+        file.write(")\n\n")
+
+        file.write("# DEMAND SECTION\n#\n# <demand_id> ( <source> <target> ) <routing_unit> <demand_value> <max_path_length>\n\nDEMANDS (\n")
+        pares = set()
+        while len(pares) < procuras:
+            u, v = rng.sample(range(n), 2)
+            if (u, v) not in pares:
+                pares.add((u, v))
+                file.write(f"  D{len(pares)} ( N{u + 1} N{v + 1} ) 1 {rng.randint(1, 100)}.00 UNLIMITED\n")
+        file.write(")\n\n")
+
+        file.write("# ADMISSIBLE PATHS SECTION\n#\n# <demand_id> ( {<path_id> ( <link_id>+ )}+ )\n\nADMISSIBLE_PATHS ( \n)\n")
+
+# ------------------------------------------------------
+def main():
+    """!
+    @brief Gera uma rede a partir da linha de comandos.
+
+    Exemplos:
+    - `python gerador.py waxman 1000 --seed 1` -> networks/waxman-1000-s1.txt
+    - `python gerador.py grelha 100 --colunas 50`
+    - `python gerador.py anel 5000 --cordas 500`
+    - `python gerador.py ba 10000 --m 3 -o networks/ba.txt`
+    """
+
+    parser = argparse.ArgumentParser(description="Gera uma topologia sintética no formato SNDlib.")
+    parser.add_argument("tipo", choices=["waxman", "grelha", "anel", "ba"], help="tipo de topologia")
+    parser.add_argument("n", type=int, help="número de nós (na grelha: número de linhas)")
+    parser.add_argument("--seed", type=int, default=0, help="semente do gerador aleatório")
+    parser.add_argument("--grau", type=float, default=4, help="waxman: grau médio pretendido")
+    parser.add_argument("--alpha", type=float, default=0.5, help="waxman: parâmetro alpha")
+    parser.add_argument("--colunas", type=int, default=None, help="grelha: número de colunas (por omissão, igual a n)")
+    parser.add_argument("--cordas", type=int, default=None, help="anel: número de cordas")
+    parser.add_argument("--m", type=int, default=2, help="ba: ligações de cada novo nó")
+    parser.add_argument("--procuras", type=int, default=None, help="número de procuras (por omissão, uma por nó)")
+    parser.add_argument("-o", "--output", default=None, help="ficheiro de saída")
+    args = parser.parse_args()
+
+    if args.tipo == "waxman":
+        pos, ligacoes = gerar_waxman(args.n, args.grau, args.alpha, args.seed)
+    elif args.tipo == "grelha":
+        pos, ligacoes = gerar_grelha(args.n, args.colunas or args.n, args.seed)
+    elif args.tipo == "anel":
+        if args.n < 3:
+            parser.error("anel: n deve ser pelo menos 3")
+        pos, ligacoes = gerar_anel(args.n, args.cordas, args.seed)
+    else:
+        pos, ligacoes = gerar_barabasi_albert(args.n, args.m, args.seed)
+
+    nome = f"{args.tipo}-{len(pos)}-s{args.seed}"
+    ficheiro = args.output or os.path.join("networks", f"{nome}.txt")
+    escrever_sndlib(ficheiro, nome, pos, ligacoes, args.procuras, args.seed)
+    print(f"{ficheiro}: {len(pos)} nós, {len(ligacoes)} ligações")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 import os
 import matplotlib.pyplot as plt
 from functions import *
+from cache import *
+from catalogo import *
 
 """!
 @file menus.py
@@ -8,26 +10,29 @@ from functions import *
 Contém funções para exibir menus, solicitar entradas do utilizador e gerir a interação com o programa.
 """
 
-networks = ["networks/abilene.txt", "networks/atlanta.txt", "networks/nobel-eu.txt", "networks/nobel-germany.txt"]
-
 def show_ask_network():
 
     """!
-    @brief Apresenta um menu para o utilizador selecionar uma rede de uma lista predefinida
+    @brief Apresenta um menu para o utilizador selecionar uma rede do catálogo
            ou inserir o caminho para um novo ficheiro de rede.
 
-    A função limpa o ecrã, exibe as redes disponíveis na lista `networks`.
+    A função limpa o ecrã e exibe as redes do catálogo (ver `catalogo.py`), com o número
+    de nós e de ligações e o tempo de leitura de cada uma, ou "a carregar..." se a leitura
+    em segundo plano ainda não tiver terminado.
     O utilizador pode escolher uma rede pelo número ou optar por inserir o nome de um
-    novo ficheiro de rede (que deve estar na pasta 'networks/' e ter extensão '.txt').
-    Se um novo ficheiro for adicionado com sucesso, ele é acrescentado à lista `networks`
+    novo ficheiro de rede (que deve estar na pasta 'networks/' e ter extensão '.txt' ou '.xml').
+    Se um novo ficheiro for adicionado com sucesso, ele é acrescentado ao catálogo
     para a sessão atual.
-    Finalmente, lê os dados da rede escolhida, cria o grafo usando `retrieve_data`
-    e retorna o grafo e o mapeamento de nós.
+    Finalmente, obtém o grafo da rede escolhida com `get_network` (imediato se a rede
+    já tiver sido lida; caso contrário, espera pelo fim da leitura) e retorna o grafo
+    e o mapeamento de nós.
 
     @return Tuple (G, node_mapping):
         - G (nx.DiGraph): O grafo NetworkX criado a partir do ficheiro de rede selecionado.
+                          Numa rede grande (ver `large_network`), é a `RedeCSR` aberta no
+                          formato CSR em disco, sem grafo NetworkX.
         - node_mapping (dict): Um dicionário que mapeia índices numéricos (da ordem de leitura)
-                               para os nomes dos nós (strings).
+                               para os nomes dos nós (strings). None numa rede grande.
     @note Se o ficheiro não for encontrado ou houver erro na leitura/formato,
           a função pode levantar exceções (p.ex., FileNotFoundError, ValueError de retrieve_data).
     """
@@ -35,47 +40,59 @@ def show_ask_network():
     clear_screen()
     print(" ----------- Redes disponíveis ---------------\n")
     
+    networks = list_networks()
     for i, ficheiro in enumerate(networks, 1):
         display_name = ficheiro.replace('networks/', '')
-        print(f"  {i}. {display_name}")
+        print(f"  {i}. {display_name} ({network_info(ficheiro)})")
         
-    print(f"\n  {i+1}. Inserir outra rede")
+    print(f"\n  {len(networks)+1}. Inserir outra rede")
     print(" ---------------------------------------------\n")
     escolha = int(input("Selecione a rede pretendida: ")) - 1
     
     if escolha == len(networks):
             novo_ficheiro = ask_network()
             if novo_ficheiro != "":
-                networks.append(novo_ficheiro)
-                escolha = len(networks) - 1
+                add_network(novo_ficheiro)
+                networks = list_networks()
+                escolha = networks.index(novo_ficheiro)
             else:
                 return None, None
                 
-    with open(networks[escolha], 'r') as file:
-        """!
-        @brief Leitura dos dados do ficheiro escolhido.
-        """
-        # leitura da info do ficheiro escolhido
-        network_data = file.read()
-
-        """!
-        @brief Criação do grafo e mapeamento dos nós.
-        @param network_data Dados da rede do ficheiro.
-        @return G Grafo criado.
-        @return node_mapping Mapa dos nós.
-        """
-        # criação do grafo e mapeamento dos nós
-        G, node_mapping = retrieve_data(network_data)
-        
-        return G, node_mapping
+    """!
+    @brief Criação do grafo e mapeamento dos nós.
+    @param networks[escolha] Ficheiro da rede escolhida.
+    @return G Grafo criado.
+    @return node_mapping Mapa dos nós.
+    """
+    # grafo e mapeamento dos nós, já lidos em segundo plano pelo catálogo
+    G, node_mapping = get_network(networks[escolha])
+    
+    return G, node_mapping
     
+# ------------------------------------------------------
+def show_large_network():
+    """!
+    @brief Informa que a opção escolhida não está disponível para uma rede grande.
+
+    As redes grandes são abertas no formato CSR em disco (`RedeCSR`), sem grafo NetworkX,
+    pelo que não podem ser desenhadas nem usadas nas opções que precisam do grafo; só os
+    cálculos estatísticos do TSA e do Suurballe (sobre o motor) estão disponíveis.
+
+    @note Espera que o utilizador pressione Enter para continuar.
+    """
+
+    clear_screen()
+    print("Esta rede é grande e foi aberta no formato CSR em disco, sem grafo NetworkX.")
+    print("Só estão disponíveis os cálculos estatísticos do TSA e do Suurballe (opções 1, 2, 3, 5 e 6 dos cálculos).")
+    input("Pressione Enter para continuar...")
+
 # ------------------------------------------------------
 def ask_network():
     """!
     @brief Solicita ao utilizador o nome do ficheiro da rede.
 
     Esta função pede ao utilizador para digitar o nome de um ficheiro de rede
-    (que se espera ter a extensão '.txt'). Constrói o caminho completo para o
+    (que se espera ter a extensão '.txt' ou, no formato XML do SNDlib, '.xml'). Constrói o caminho completo para o
     ficheiro, assumindo que ele reside no diretório 'networks/'.
 
     @return str: O caminho completo para o ficheiro da rede (p.ex., "networks/nome_ficheiro.txt").
@@ -83,17 +100,17 @@ def ask_network():
                  dependendo da gestão de erros implementada posteriormente.
                  A versão atual retorna o caminho mesmo que o ficheiro não exista ou
                  a extensão seja incorreta, a validação é feita no chamador.
-    @note A função valida se o nome do ficheiro termina com '.txt'. Se não, imprime
+    @note A função valida se o nome do ficheiro termina com '.txt' ou '.xml'. Se não, imprime
           uma mensagem de erro e, na implementação atual, o comportamento de retorno
           para nomes inválidos não impede a continuação (o chamador deve validar).
           Também informa sobre FileNotFoundError, mas não o trata diretamente aqui.
     """
     
-    novo_ficheiro = input("Digite o nome da rede (com extensão .txt): ")
+    novo_ficheiro = input("Digite o nome da rede (com extensão .txt ou .xml): ")
     caminho_ficheiro = f"networks/{novo_ficheiro}"
     
     
-    if caminho_ficheiro.endswith('.txt'):
+    if caminho_ficheiro.endswith('.txt') or caminho_ficheiro.endswith('.xml'):
         if not os.path.exists(caminho_ficheiro):
             clear_screen()
             print("O ficheiro não foi encontrado. Tente novamente.")
@@ -103,7 +120,7 @@ def ask_network():
             return caminho_ficheiro
     else:
         clear_screen()
-        print("O nome do arquivo deve terminar com '.txt'. Tente novamente.")
+        print("O nome do arquivo deve terminar com '.txt' ou '.xml'. Tente novamente.")
         input("Pressione Enter para continuar...")
         return ""
             
@@ -179,9 +196,11 @@ def ask_which_algorithm():
     1. Two-Step Approach
     2. Suurballe
     3. Usar ambos os métodos (para comparação visual lado a lado)
+    4. Bhandari
+    5. k caminhos disjuntos
     Valida a entrada do utilizador para garantir que a escolha é uma das opções válidas.
 
-    @return int: A opção escolhida pelo utilizador (1, 2 ou 3).
+    @return int: A opção escolhida pelo utilizador (1 a 5).
     """
     
     clear_screen()
@@ -190,13 +209,15 @@ def ask_which_algorithm():
     print(" 1. Two Step Approach")
     print(" 2. Suurballe")
     print(" 3. Usar ambos os métodos")
+    print(" 4. Bhandari")
+    print(" 5. k caminhos disjuntos")
     print(" ---------------------------------------------------------------")
 
     while True:
         try:
             option = int(input("\nDigite a opção pretendida: "))
             
-            if option in [1, 2, 3]:
+            if option in [1, 2, 3, 4, 5]:
                 break
             else:
                 print("\nNúmero inválido. Por favor, escolha um número da lista.")
@@ -205,6 +226,103 @@ def ask_which_algorithm():
 
     return option
 
+# ------------------------------------------------------
+def ask_number_paths():
+
+    """!
+    @brief Pergunta ao utilizador quantos caminhos disjuntos pretende (k >= 2).
+
+    @return int: O número de caminhos escolhido.
+    """
+
+    clear_screen()
+
+    print("\n-------------- Número de caminhos disjuntos ---------------\n")
+
+    while True:
+        try:
+            k = int(input("\nDigite o número de caminhos (p.ex., 3 para proteção 1+2): "))
+
+            if k >= 2:
+                break
+            else:
+                print("\nNúmero inválido. Escolha pelo menos 2 caminhos.")
+        except ValueError:
+            print("\nNúmero inválido. Escolha pelo menos 2 caminhos.")
+
+    return k
+
+# ------------------------------------------------------
+def ask_disjoint_type():
+
+    """!
+    @brief Pergunta ao utilizador o tipo de disjunção dos caminhos.
+
+    Apresenta as opções:
+    1. Disjuntos em nós (os caminhos não partilham nós intermédios nem ligações).
+    2. Disjuntos em ligações (os caminhos podem partilhar nós, mas não ligações).
+    Valida a entrada do utilizador.
+
+    @return bool: True se o utilizador escolher caminhos disjuntos em ligações (opção 2),
+                  False se escolher caminhos disjuntos em nós (opção 1).
+    """
+
+    clear_screen()
+
+    print("\n-------------- Tipo de disjunção ---------------\n")
+    print(" 1. Caminhos disjuntos em nós")
+    print(" 2. Caminhos disjuntos em ligações")
+    print(" ------------------------------------------------")
+
+    while True:
+        try:
+            option = int(input("\nDigite a opção pretendida: "))
+
+            if option in [1, 2]:
+                break
+            else:
+                print("\nNúmero inválido. Por favor, escolha um número da lista.")
+        except ValueError:
+            print("\nNúmero inválido. Por favor, escolha um número da lista.")
+
+    return option == 2
+
+# ------------------------------------------------------
+def ask_pairs_type(procuras):
+
+    """!
+    @brief Pergunta ao utilizador que pares de nós devem ser analisados nos cálculos estatísticos.
+
+    Apresenta as opções:
+    1. Todos os pares de nós.
+    2. Só os pares da matriz de procuras da rede (secção DEMANDS).
+    Valida a entrada do utilizador.
+
+    @param procuras Número de pares da matriz de procuras (apresentado no menu).
+    @return bool: True se o utilizador escolher os pares da matriz de procuras (opção 2),
+                  False se escolher todos os pares de nós (opção 1).
+    """
+
+    clear_screen()
+
+    print("\n-------------- Pares a analisar ---------------\n")
+    print(" 1. Todos os pares de nós")
+    print(f" 2. Pares da matriz de procuras ({procuras} pares)")
+    print(" -----------------------------------------------")
+
+    while True:
+        try:
+            option = int(input("\nDigite a opção pretendida: "))
+
+            if option in [1, 2]:
+                break
+            else:
+                print("\nNúmero inválido. Por favor, escolha um número da lista.")
+        except ValueError:
+            print("\nNúmero inválido. Por favor, escolha um número da lista.")
+
+    return option == 2
+
 # ------------------------------------------------------
 def ask_skip_forward():
     """!
@@ -256,9 +374,12 @@ def ask_which_calculus():
        solução com custo igual ao do Suurballe, considerando Suurballe como ótimo).
     3. Calcular erro médio do custo (erro percentual médio do custo do TSA em
        relação ao Suurballe).
+    4. Comparar os tempos de execução do Suurballe e do Bhandari.
+    5. Comparar as taxas de resolução com caminhos disjuntos em nós e em ligações.
+    6. Calcular as três estatísticas (1, 2 e 3) de uma só vez.
     Valida a entrada do utilizador.
 
-    @return int: A opção escolhida pelo utilizador (1, 2 ou 3).
+    @return int: A opção escolhida pelo utilizador (1 a 6).
     """
 
     clear_screen()
@@ -266,13 +387,16 @@ def ask_which_calculus():
     print(" 1. Calcular taxa de resolução")
     print(" 2. Calcular taxa de resolução ótima")
     print(" 3. Calcular erro médio do custo")
+    print(" 4. Comparar tempos Suurballe / Bhandari")
+    print(" 5. Comparar taxas de resolução (nós / ligações)")
+    print(" 6. Calcular todas as estatísticas")
     
     print(" -------------------------------------------------------------")
     
     while True:
         try:
             escolha = int(input("\nDigite a opção pretendida: "))
-            if escolha in [1, 2, 3]:
+            if escolha in [1, 2, 3, 4, 5, 6]:
                 break
             else:
                 print("\nNúmero inválido. Por favor, escolha um número da lista.")
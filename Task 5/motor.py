@@ -0,0 +1,1131 @@
+import heapq
+import itertools
+from array import array
+from contextlib import contextmanager
+from collections import namedtuple
+from multiprocessing import shared_memory
+import numpy as np
+from csr import *
+
+"""!
+@file motor.py
+@brief Motor de cálculo dos caminhos disjuntos sobre o grafo em formato CSR.
+Os algoritmos (TSA, Suurballe, Bhandari e k caminhos disjuntos) trabalham apenas com os índices
+inteiros dos nós (os mesmos do `node_mapping`) e com listas de vizinhos e custos no formato CSR.
+Os nomes dos nós só são usados para apresentar os resultados (ver `engine_names`).
+"""
+
+INF = float('inf')
+
+# tolerância relativa nas comparações de distâncias com arcos de custo negativo (Bhandari)
+TOLERANCIA = 1e-9
+
+# versão do motor: deve ser incrementada sempre que uma alteração possa mudar os caminhos
+# calculados (os resultados guardados com outra versão deixam de ser usados)
+ENGINE_VERSION = 2
+
+# Grafo do motor (formato CSR, em listas Python para acesso rápido elemento a elemento):
+# - nomes: nome de cada nó
+# - indice: dicionário nome -> índice
+# - indptr: os arcos do nó i são os índices k em range(indptr[i], indptr[i+1])
+# - indices: nó de destino de cada arco
+# - custo: custo de cada arco
+# - nos_bloqueados, arcos_bloqueados: máscaras (uma posição por nó/arco) com os nós e arcos
+#   a ignorar nas pesquisas; estão a zero fora de `blocked` e são reutilizadas em todas as chamadas
+# - nos_divididos: máscara com os nós divididos no node splitting implícito (ver `split_node`)
+Motor = namedtuple('Motor', ['nomes', 'indice', 'indptr', 'indices', 'custo',
+                             'nos_bloqueados', 'arcos_bloqueados', 'nos_divididos'])
+
+# arrays do motor publicados em memória partilhada (ver `share_engine`) ou lidos do formato em
+# disco (ver `csr_engine`), com o código de tipo (do módulo array) de cada um
+SHARED_FIELDS = (('indptr', 'q'), ('indices', 'i'), ('custo', 'd'))
+
+def engine_graph(G):
+    """!
+    @brief Devolve o grafo do motor correspondente a um grafo NetworkX.
+
+    O grafo é construído com `graph_to_csr` (os nós são numerados pela ordem de `G.nodes`,
+    que é a do `node_mapping`) e guardado em `G.graph['motor']`, para ser reutilizado
+    nas chamadas seguintes com o mesmo grafo. É reconstruído se o grafo tiver sido alterado
+    depois disso: quem alterar os nós, as arestas ou os custos de G deve chamar `graph_changed`.
+    Os arrays são convertidos em listas Python (um objeto por arco): para redes demasiado
+    grandes para um grafo NetworkX, o motor deve ser criado com `csr_engine`.
+    Com uma rede aberta no formato em disco (`RedeCSR`), é isso que é feito: o motor é
+    criado com `csr_engine` sobre os arrays mapeados em memória e guardado em `G.graph['motor']`.
+
+    @param G O grafo NetworkX direcionado (arestas com atributo 'cost'), ou uma `RedeCSR`.
+    @return Motor com os arrays do grafo.
+    """
+
+    if isinstance(G, RedeCSR):
+        if 'motor' not in G.graph:
+            G.graph['motor'] = csr_engine(G.grafo)
+        return G.graph['motor']
+
+    motor = G.graph.get('motor')
+    versao = G.graph.get('versao_grafo', 0)
+    if motor is None or G.graph.get('versao_motor') != versao \
+            or len(motor.nomes) != G.number_of_nodes() or len(motor.indices) != G.number_of_edges():
+        nomes = list(G.nodes)
+        grafo = graph_to_csr(G, dict(enumerate(nomes)))
+        motor = Motor(nomes, {nome: i for i, nome in enumerate(nomes)},
+                      grafo.indptr.tolist(), grafo.indices.tolist(), grafo.custo.tolist(),
+                      bytearray(len(nomes)), bytearray(len(grafo.indices)), bytearray(len(nomes)))
+        G.graph['motor'] = motor
+        G.graph['versao_motor'] = versao
+    return motor
+
+# ------------------------------------------------------
+def csr_engine(grafo):
+    """!
+    @brief Cria o grafo do motor diretamente a partir de um GrafoCSR, sem grafo NetworkX.
+
+    Os arrays `indptr`, `indices` e `custo` não são copiados nem convertidos em listas:
+    o motor usa vistas (`memoryview`) sobre eles. Com um grafo aberto por `open_csr`, os
+    arcos são lidos do disco à medida que são precisos e as páginas são partilhadas por
+    todos os processos que abram o mesmo diretório. Só os nomes dos nós e as máscaras
+    (um byte por nó e por arco) ficam na memória de cada processo.
+
+    @param grafo GrafoCSR (p.ex., devolvido por `open_csr` ou `load_csr`).
+    @return Motor com os arrays do grafo, numerado pelos índices do GrafoCSR.
+    """
+
+    # vistas com o tipo do módulo array (os elementos são lidos como int/float do Python)
+    indptr, indices, custo = (memoryview(np.ascontiguousarray(getattr(grafo, campo), dtype=codigo)).cast('B').cast(codigo)
+                              for campo, codigo in SHARED_FIELDS)
+    nomes = grafo.nomes.tolist()
+    n, m = len(indptr) - 1, len(indices)
+    return Motor(nomes, {nome: i for i, nome in enumerate(nomes)}, indptr, indices, custo,
+                 bytearray(n), bytearray(m), bytearray(n))
+
+# ------------------------------------------------------
+def graph_changed(G):
+    """!
+    @brief Assinala que um grafo foi alterado (nós, arestas ou custos).
+
+    O grafo do motor guardado em `G.graph['motor']` deixa de ser usado e é reconstruído
+    na próxima chamada a `engine_graph`.
+
+    @param G O grafo NetworkX alterado.
+    """
+
+    G.graph['versao_grafo'] = G.graph.get('versao_grafo', 0) + 1
+
+# ------------------------------------------------------
+def share_engine(motor):
+    """!
+    @brief Publica os arrays do motor em memória partilhada (`multiprocessing.shared_memory`).
+
+    Os arrays `indptr`, `indices` e `custo` são copiados uma única vez para blocos de memória
+    partilhada; os processos que os abrirem com `attach_engine` usam esses blocos diretamente,
+    sem cópias nem pickle do grafo.
+
+    @param motor Grafo do motor.
+    @return Tuple (memorias, descritor): os blocos criados (a libertar com `release_engine`
+            quando já não forem precisos) e um descritor pequeno (nomes dos blocos, tipos e
+            tamanhos) a enviar aos outros processos.
+    """
+
+    memorias = []
+    blocos = []
+    try:
+        for campo, codigo in SHARED_FIELDS:
+            valores = array(codigo, getattr(motor, campo))
+            memoria = shared_memory.SharedMemory(create=True, size=max(1, len(valores) * valores.itemsize))
+            memorias.append(memoria)
+            with memoria.buf.cast(codigo) as vista:
+                vista[:len(valores)] = valores
+            blocos.append((memoria.name, codigo, len(valores)))
+    except BaseException:
+        release_engine(memorias)
+        raise
+    return memorias, tuple(blocos)
+
+# ------------------------------------------------------
+def attach_engine(descritor):
+    """!
+    @brief Abre um motor publicado por `share_engine` noutro processo (sem cópias).
+
+    Os arrays do motor passam a ser vistas (`memoryview`) sobre a memória partilhada; só as
+    máscaras (um byte por nó e por arco) são próprias de cada processo. O motor não tem nomes
+    dos nós (`nomes` e `indice` são None): os resultados são devolvidos em índices.
+    O descritor pode também ser o caminho de um grafo no formato em disco (ver `save_csr`):
+    o grafo é então aberto com `open_csr` e o motor criado com `csr_engine`, sobre os
+    arrays mapeados em memória.
+
+    @param descritor Descritor devolvido por `share_engine`, ou caminho do diretório do grafo em disco.
+    @return Tuple (memorias, motor). Os blocos de `memorias` devem manter-se abertos
+            enquanto o motor for usado (lista vazia com um grafo em disco).
+    """
+
+    if isinstance(descritor, str):
+        return [], csr_engine(open_csr(descritor))
+
+    memorias = []
+    vistas = []
+    for nome, codigo, tamanho in descritor:
+        memoria = shared_memory.SharedMemory(name=nome)
+        memorias.append(memoria)
+        vistas.append(memoria.buf.cast(codigo)[:tamanho])
+    indptr, indices, custo = vistas
+    n, m = len(indptr) - 1, len(indices)
+    return memorias, Motor(None, None, indptr, indices, custo, bytearray(n), bytearray(m), bytearray(n))
+
+# ------------------------------------------------------
+def release_engine(memorias):
+    """!
+    @brief Fecha e apaga os blocos de memória partilhada criados por `share_engine`.
+    """
+
+    for memoria in memorias:
+        memoria.close()
+        memoria.unlink()
+
+# ------------------------------------------------------
+def dijkstra(motor, origem, destino=None):
+    """!
+    @brief Algoritmo de Dijkstra (com heap) a partir de um nó.
+
+    Se for indicado um destino, a pesquisa termina assim que o destino é fixado
+    (as distâncias dos restantes nós podem então não ser as finais).
+    Os nós e arcos marcados nas máscaras do motor (ver `blocked`) são ignorados.
+    As distâncias e a árvore são guardadas em dicionários com apenas os nós
+    alcançados, pelo que uma pesquisa curta não aloca memória proporcional ao grafo.
+    Empates: os vizinhos são relaxados pela ordem do CSR (a ordem de inserção das arestas
+    em G) e o predecessor de um nó só é substituído por uma distância estritamente menor,
+    pelo que cada nó fica com o primeiro predecessor fixado que o alcança com a distância
+    mínima; os nós com a mesma distância são fixados pela ordem em que essa distância foi
+    registada (contador do heap). O código original usava `nx.shortest_path`, que com
+    origem e destino faz uma pesquisa bidirecional e resolve os empates de outra forma:
+    quando há vários caminhos mais curtos com o mesmo custo, o primeiro caminho do TSA
+    (e, por isso, o segundo) pode ser outro, e os resultados do TSA diferem dos do código
+    original (p.ex., na nobel-germany o TSA resolve 108 pares em vez de 107).
+
+    @param motor Grafo do motor.
+    @param origem Índice do nó de origem.
+    @param destino Opcional. Índice do nó de destino.
+    @return Tuple (dist, pred): dicionários com a distância de cada nó alcançado à origem
+            e com o nó anterior de cada nó na árvore de caminhos mais curtos.
+    """
+
+    indptr, indices, custo = motor.indptr, motor.indices, motor.custo
+    nos_bloqueados, arcos_bloqueados = motor.nos_bloqueados, motor.arcos_bloqueados
+    dist = {origem: 0}
+    pred = {}
+    visitado = set()
+    contador = itertools.count()
+
+    heap = [(0, next(contador), origem)]
+    while heap:
+        d, _, u = heapq.heappop(heap)
+        if u in visitado:
+            continue
+        visitado.add(u)
+        if u == destino:
+            break
+        for k in range(indptr[u], indptr[u + 1]):
+            v = indices[k]
+            if arcos_bloqueados[k] or nos_bloqueados[v] or v in visitado:
+                continue
+            nd = d + custo[k]
+            if nd < dist.get(v, INF):
+                dist[v] = nd
+                pred[v] = u
+                heapq.heappush(heap, (nd, next(contador), v))
+
+    return dist, pred
+
+# ------------------------------------------------------
+def shortest_path_engine(motor, origem, destino):
+    """!
+    @brief Caminho mais curto entre dois nós, com o respetivo custo, numa só pesquisa.
+
+    A pesquisa termina quando o destino é fixado; se o heap se esgotar antes disso,
+    o destino não é alcançável (não é precisa uma verificação prévia, como `nx.has_path`).
+
+    @param motor Grafo do motor.
+    @param origem Índice do nó de origem.
+    @param destino Índice do nó de destino.
+    @return Tuple (caminho, custo), com o caminho em índices, ou (None, None) se o
+            destino não for alcançável.
+    """
+
+    dist, pred = dijkstra(motor, origem, destino)
+    caminho = tree_path(pred, origem, destino)
+    if caminho is None:
+        return None, None
+    return caminho, dist[destino]
+
+# ------------------------------------------------------
+def tree_path(pred, origem, destino):
+    """!
+    @brief Reconstrói o caminho da origem até um nó a partir da árvore de `dijkstra`.
+
+    @param pred Dicionário com o nó anterior de cada nó.
+    @param origem Índice do nó de origem.
+    @param destino Índice do nó de destino.
+    @return Lista de índices dos nós do caminho, ou None se o destino não estiver na árvore.
+    """
+
+    if destino != origem and destino not in pred:
+        return None
+    caminho = [destino]
+    while caminho[-1] != origem:
+        caminho.append(pred[caminho[-1]])
+    caminho.reverse()
+    return caminho
+
+# ------------------------------------------------------
+def arc_index(motor, u, v):
+    """!
+    @brief Devolve a posição do arco (u, v) nos arrays do motor, ou -1 se o arco não existir.
+    """
+
+    for k in range(motor.indptr[u], motor.indptr[u + 1]):
+        if motor.indices[k] == v:
+            return k
+    return -1
+
+# ------------------------------------------------------
+@contextmanager
+def marked(mascara, posicoes):
+    """!
+    @brief Marca temporariamente posições de uma máscara do motor (bytearray).
+
+    Dentro do bloco `with` as posições indicadas ficam a 1; no fim do bloco voltam a 0.
+    Só são tocadas as posições indicadas, pelo que o custo não depende do tamanho do grafo.
+
+    @param mascara A máscara (p.ex., `motor.nos_bloqueados`).
+    @param posicoes Posições a marcar (as negativas são ignoradas).
+    """
+
+    posicoes = [i for i in posicoes if i >= 0]
+    for i in posicoes:
+        mascara[i] = 1
+    try:
+        yield mascara
+    finally:
+        for i in posicoes:
+            mascara[i] = 0
+
+# ------------------------------------------------------
+@contextmanager
+def blocked(motor, nos=(), arcos=()):
+    """!
+    @brief Bloqueia temporariamente nós e arcos do motor (vista do grafo sem eles, sem cópias).
+
+    Dentro do bloco `with`, as pesquisas do motor ignoram os nós e arcos indicados
+    (ver `marked`).
+
+    @param motor Grafo do motor.
+    @param nos Índices dos nós a bloquear.
+    @param arcos Posições (ver `arc_index`) dos arcos a bloquear.
+    @note As máscaras pertencem ao motor: o mesmo motor não deve ser usado por várias
+          threads em simultâneo (cada processo tem o seu).
+    """
+
+    with marked(motor.nos_bloqueados, nos), marked(motor.arcos_bloqueados, arcos):
+        yield motor
+
+# ------------------------------------------------------
+def arc_cost(motor, u, v):
+    """!
+    @brief Devolve o custo do arco (u, v), ou None se o arco não existir.
+    """
+
+    k = arc_index(motor, u, v)
+    return motor.custo[k] if k >= 0 else None
+
+# ------------------------------------------------------
+def engine_path_cost(motor, caminho):
+    """!
+    @brief Calcula o custo de um caminho (lista de índices), como `path_cost`.
+
+    @return O custo total, ou None se o caminho for vazio ou algum arco não existir.
+    """
+
+    if not caminho or len(caminho) < 2:
+        return None
+    custo = 0
+    for u, v in zip(caminho[:-1], caminho[1:]):
+        c = arc_cost(motor, u, v)
+        if c is None:
+            return None
+        custo += c
+    return custo
+
+# ------------------------------------------------------
+def engine_names(motor, caminho):
+    """!
+    @brief Converte um caminho de índices para os nomes dos nós (None se o caminho for None).
+    """
+
+    if caminho is None:
+        return None
+    return [motor.nomes[i] for i in caminho]
+
+# ------------------------------------------------------
+def merge_engine_path(caminho):
+    """!
+    @brief Converte um caminho do grafo dividido para os nós originais, como `merge_split_path`.
+
+    @param caminho Lista de índices de nós do grafo dividido (2i e 2i+1 para o nó i).
+    @return Lista de índices dos nós originais (os nós de entrada e saída passam a um só).
+    """
+
+    original = []
+    for x in caminho:
+        if not original or original[-1] != x >> 1:
+            original.append(x >> 1)
+    return original
+
+# ------------------------------------------------------
+def split_node(motor, v):
+    """!
+    @brief Índice do nó de entrada de v no grafo dividido.
+
+    No node splitting implícito, o nó i dá origem aos nós 2i (entrada) e 2i+1 (saída),
+    ligados por um arco de custo 0. Os nós não divididos (ver `motor.nos_divididos`)
+    são representados apenas pelo nó 2i+1, que serve de entrada e de saída.
+    """
+
+    return 2 * v if motor.nos_divididos[v] else 2 * v + 1
+
+# ------------------------------------------------------
+def split_path(motor, caminho):
+    """!
+    @brief Converte um caminho do grafo original para o grafo dividido (ver `split_node`).
+
+    @param motor Grafo do motor (com os nós divididos marcados em `motor.nos_divididos`).
+    @param caminho Lista de índices dos nós do caminho.
+    @return Lista de índices do grafo dividido (2v e 2v+1 para os nós divididos, 2v+1 para os restantes).
+    """
+
+    return [x for v in caminho for x in ((2 * v, 2 * v + 1) if motor.nos_divididos[v] else (2 * v + 1,))]
+
+# ------------------------------------------------------
+def residual_overlay(motor, arcos):
+    """!
+    @brief Alterações ao grafo dividido que dão o grafo residual de um conjunto de arcos com fluxo.
+
+    Os arcos com fluxo e os seus opostos (de v_out para u_in: a ligação já está usada) são
+    removidos, e cada arco com fluxo é acrescentado no sentido inverso, com o custo simétrico
+    (0 nos arcos internos dos nós divididos).
+
+    @param motor Grafo do motor (com os nós divididos marcados em `motor.nos_divididos`).
+    @param arcos Arcos (x, y) do grafo dividido com fluxo (p.ex., os arcos de P1).
+    @return Tuple (removidos, invertidos), como em `residual_path` e `bhandari_path`.
+    """
+
+    removidos = set()
+    invertidos = {}
+    for x, y in arcos:
+        u, v = x >> 1, y >> 1
+        removidos.add((x, y))
+        if u == v:
+            invertidos.setdefault(y, []).append((x, 0))
+        else:
+            removidos.add((2 * v + 1, split_node(motor, u)))
+            invertidos.setdefault(y, []).append((x, -arc_cost(motor, u, v)))
+    return removidos, invertidos
+
+# ------------------------------------------------------
+def residual_path(motor, s, t, removidos, invertidos, potencial):
+    """!
+    @brief Caminho mais curto num grafo residual, sem o construir (custos reduzidos de Johnson).
+
+    O grafo residual é o grafo dividido implícito (ver `split_node`) sem os arcos de
+    `removidos`, mais os arcos de `invertidos` (os arcos com fluxo, no sentido inverso).
+    Só estas alterações (da ordem do tamanho dos caminhos) são guardadas; o custo reduzido
+    c(x, y) + pi(x) - pi(y) de cada arco é calculado quando o arco é relaxado. Com potenciais
+    válidos os custos reduzidos não são negativos e basta o Dijkstra; nos arcos invertidos
+    (custo reduzido teoricamente nulo) os erros de arredondamento são cortados em 0.
+
+    @param motor Grafo do motor (com os nós divididos marcados em `motor.nos_divididos`).
+    @param s Índice da origem no grafo dividido.
+    @param t Índice do destino no grafo dividido.
+    @param removidos Conjunto de arcos (x, y) do grafo dividido que não existem no residual.
+    @param invertidos Dicionário x -> lista de (y, custo) com os arcos acrescentados
+                      (custo original, ou seja, simétrico do custo do arco com fluxo).
+    @param potencial Função que devolve o potencial pi(x) de um nó do grafo dividido.
+    @return Tuple (caminho, dist): lista de índices (do grafo dividido) do caminho, ou None
+            se t não for alcançável, e dicionário com as distâncias reduzidas dos nós alcançados
+            (a pesquisa termina quando t é fixado).
+    """
+
+    indptr, indices, custo, divididos = motor.indptr, motor.indices, motor.custo, motor.nos_divididos
+    dist_r = {s: 0}
+    pred = {}
+    visitado = set()
+    contador = itertools.count()
+
+    heap = [(0, next(contador), s)]
+    while heap:
+        d, _, x = heapq.heappop(heap)
+        if x in visitado:
+            continue
+        visitado.add(x)
+        if x == t:
+            return tree_path(pred, s, t), dist_r
+
+        pi_x = potencial(x)
+        if x & 1:
+            u = x >> 1
+            arcos = []
+            for k in range(indptr[u], indptr[u + 1]):
+                v = indices[k]
+                y = 2 * v if divididos[v] else 2 * v + 1
+                if (x, y) not in removidos:
+                    arcos.append((y, custo[k] + pi_x - potencial(y)))
+        elif (x, x + 1) not in removidos:
+            # nó de entrada de um nó dividido: arco interno (custo 0)
+            arcos = [(x + 1, pi_x - potencial(x + 1))]
+        else:
+            arcos = []
+        for y, c in invertidos.get(x, ()):
+            arcos.append((y, max(c + pi_x - potencial(y), 0)))
+
+        for y, c in arcos:
+            if y in visitado:
+                continue
+            nd = d + c
+            if nd < dist_r.get(y, INF):
+                dist_r[y] = nd
+                pred[y] = x
+                heapq.heappush(heap, (nd, next(contador), y))
+
+    return None, dist_r
+
+# ------------------------------------------------------
+def tsa_engine(motor, origem, destino, ligacoes=False):
+    """!
+    @brief Two-Step Approach sobre o grafo do motor.
+
+    Calcula o caminho mais curto e, no mesmo grafo com os seus arcos (nos dois sentidos)
+    e os nós intermédios bloqueados (ver `blocked`), calcula o segundo caminho.
+    Na versão disjunta em ligações, só os arcos são bloqueados.
+
+    @param motor Grafo do motor.
+    @param origem Índice do nó de origem.
+    @param destino Índice do nó de destino.
+    @param ligacoes Booleano. Se True, os caminhos são disjuntos em ligações (podem
+                    partilhar nós); caso contrário, são disjuntos em nós.
+    @return Tuple (path1, cost1, path2, cost2) com os caminhos em índices; None nos
+            elementos que não existirem (p.ex., (None, None, None, None) sem caminho).
+    """
+
+    path1, cost1 = shortest_path_engine(motor, origem, destino)
+    if path1 is None:
+        return None, None, None, None
+
+    path2, cost2 = tsa_second_path(motor, path1, ligacoes)
+    return path1, cost1, path2, cost2
+
+# ------------------------------------------------------
+def tsa_second_path(motor, path1, ligacoes=False):
+    """!
+    @brief Segundo passo do TSA: caminho mais curto sem os arcos (e os nós intermédios) de path1.
+
+    @param motor Grafo do motor.
+    @param path1 Caminho mais curto entre a origem e o destino (índices).
+    @param ligacoes Booleano. Se True, só os arcos de path1 são bloqueados.
+    @return Tuple (path2, cost2), ou (None, None) se não existir segundo caminho.
+    """
+
+    # segunda pesquisa no mesmo grafo, com os arcos de path1 (nos dois sentidos)
+    # e os nós intermédios bloqueados
+    arcos = [arc_index(motor, u, v) for u, v in zip(path1[:-1], path1[1:])]
+    arcos += [arc_index(motor, v, u) for u, v in zip(path1[:-1], path1[1:])]
+    with blocked(motor, () if ligacoes else path1[1:-1], arcos):
+        return shortest_path_engine(motor, path1[0], path1[-1])
+
+# ------------------------------------------------------
+def tsa_source_engine(motor, origem, destinos=None, ligacoes=False):
+    """!
+    @brief Two-Step Approach de uma origem para vários destinos, com uma só árvore de caminhos mais curtos.
+
+    O primeiro caminho de todos os destinos sai da mesma árvore (um Dijkstra completo a
+    partir da origem); para cada destino só é feita a segunda pesquisa, sobre a vista com
+    os arcos e nós de path1 bloqueados (`tsa_second_path`), que reutiliza as máscaras do
+    motor em vez de copiar o grafo. Os resultados são os mesmos de `tsa_engine` para cada par.
+
+    @param motor Grafo do motor.
+    @param origem Índice do nó de origem.
+    @param destinos Opcional. Índices dos nós de destino (por omissão, todos os outros nós).
+    @param ligacoes Booleano. Se True, os caminhos são disjuntos em ligações.
+    @return Dicionário destino -> (path1, cost1, path2, cost2), como em `tsa_engine`.
+    """
+
+    if destinos is None:
+        destinos = [v for v in range(len(motor.nomes)) if v != origem]
+
+    dist, pred = dijkstra(motor, origem)
+
+    resultados = {}
+    for destino in destinos:
+        path1 = tree_path(pred, origem, destino)
+        if path1 is None:
+            resultados[destino] = (None, None, None, None)
+        else:
+            resultados[destino] = (path1, dist[destino]) + tsa_second_path(motor, path1, ligacoes)
+    return resultados
+
+# ------------------------------------------------------
+def suurballe_engine(motor, origem, destino, ligacoes=False):
+    """!
+    @brief Algoritmo de Suurballe (caminhos disjuntos em nós ou em ligações) sobre o grafo do motor.
+
+    Segue os mesmos passos de `suurballe`:
+    0. e 1. caminho mais curto P1 e distâncias, numa só pesquisa no grafo original
+       (as distâncias no grafo dividido são as mesmas, porque o arco interno custa 0);
+    0.5. node splitting implícito dos nós intermédios de P1 (ver `split_node`): o grafo
+         dividido não é construído, os seus arcos são gerados a partir do grafo do motor;
+    2. grafo residual: custos reduzidos, remoção dos arcos opostos aos de P1 e inversão
+       dos arcos de P1 (custo 0), guardado apenas como as alterações ao grafo do motor;
+    3. caminho mais curto P2 no grafo residual (ver `residual_path`);
+    4. remoção dos arcos em comum (desentrelaçamento) e conversão para os nós originais.
+    Na versão disjunta em ligações nenhum nó é dividido: a pesquisa de P2 corre sobre o
+    grafo original (metade dos nós do grafo dividido).
+
+    @param motor Grafo do motor.
+    @param origem Índice do nó de origem.
+    @param destino Índice do nó de destino.
+    @param ligacoes Booleano. Se True, os caminhos são disjuntos em ligações (podem
+                    partilhar nós); caso contrário, são disjuntos em nós.
+    @return Tuple (P1, cost1, P2, cost2) com os caminhos em índices; None nos
+            elementos que não existirem.
+    """
+
+    # --- Passos 0 e 1: uma só pesquisa dá P1 e as distâncias (potenciais) ---
+    dist, pred = dijkstra(motor, origem, destino)
+    P1_original = tree_path(pred, origem, destino)
+    if P1_original is None:
+        return None, None, None, None
+
+    # Potenciais: pi(v) = min(d(v), d(t)). A pesquisa parou no destino, pelo que os nós
+    # ainda não fixados ficam com d(t); os custos reduzidos continuam não negativos.
+    # No grafo dividido, os nós 2v e 2v+1 têm o potencial de v (arco interno de custo 0).
+    d_t = dist[destino]
+
+    return suurballe_second_path(motor, P1_original, lambda x: min(dist.get(x >> 1, d_t), d_t), ligacoes)
+
+# ------------------------------------------------------
+def suurballe_second_path(motor, P1_original, potencial, ligacoes=False):
+    """!
+    @brief Passos 0.5 a 4 do Suurballe: segundo caminho e desentrelaçamento, a partir de P1.
+
+    @param motor Grafo do motor.
+    @param P1_original Caminho mais curto entre a origem e o destino (índices).
+    @param potencial Função com o potencial pi(x) de cada nó do grafo dividido (o de x >> 1,
+                     obtido das distâncias à origem; ver `residual_path`).
+    @param ligacoes Booleano. Se True, os caminhos são disjuntos em ligações.
+    @return Tuple (P1, cost1, P2, cost2), como em `suurballe_engine`.
+    """
+
+    origem, destino = P1_original[0], P1_original[-1]
+
+    # --- Passo 0.5: node splitting implícito dos nós intermédios de P1 (só disjuntos em nós) ---
+    with marked(motor.nos_divididos, () if ligacoes else P1_original[1:-1]):
+        s, t = 2 * origem + 1, split_node(motor, destino)
+        P1_split = split_path(motor, P1_original)
+
+        # --- Passo 2: grafo residual (sobreposição ao grafo do motor) ---
+        # 2.2: arcos opostos aos de P1 removidos e 2.3: arcos de P1 invertidos (custo reduzido 0)
+        removidos, invertidos = residual_overlay(motor, zip(P1_split[:-1], P1_split[1:]))
+
+        # --- Passo 3: P2 no grafo residual (2.1: custos reduzidos calculados durante a pesquisa) ---
+        P2_split, _ = residual_path(motor, s, t, removidos, invertidos, potencial)
+    if P2_split is None:
+        return P1_original, engine_path_cost(motor, P1_original), None, None
+
+    # --- Passo 4: remover os arcos em comum e separar os dois caminhos ---
+    P1, P2 = untangle_paths(P1_split, P2_split, s, t)
+
+    return P1, engine_path_cost(motor, P1), P2, engine_path_cost(motor, P2)
+
+# ------------------------------------------------------
+def suurballe_source_engine(motor, origem, destinos=None, ligacoes=False):
+    """!
+    @brief Suurballe de uma origem para todos os destinos numa só passagem (algoritmo de Suurballe e Tarjan).
+
+    A árvore de caminhos mais curtos da origem é calculada uma única vez (um Dijkstra completo)
+    e dá o P1 de cada destino. Os segundos caminhos de todos os destinos são depois marcados
+    numa só pesquisa sobre os custos reduzidos da árvore (ver `suurballe_tarjan_labels`), em
+    vez de uma pesquisa no grafo residual por destino: uma origem custa dois Dijkstra, e não
+    um por destino. Cada par é reconstruído a partir das marcações (ver `suurballe_tarjan_pair`).
+    Na versão disjunta em nós a pesquisa corre sobre o grafo dividido implícito com todos os
+    nós divididos (ver `split_node`), sobre o qual os caminhos disjuntos em arcos são
+    disjuntos em nós; na versão disjunta em ligações, sobre o grafo original.
+    O custo total de cada par é o mesmo de `suurballe_engine` (os caminhos podem ser outros
+    quando há vários pares com o mesmo custo).
+
+    @param motor Grafo do motor.
+    @param origem Índice do nó de origem.
+    @param destinos Opcional. Índices dos nós de destino (por omissão, todos os outros nós).
+    @param ligacoes Booleano. Se True, os caminhos são disjuntos em ligações.
+    @return Dicionário destino -> (P1, cost1, P2, cost2), como em `suurballe_engine`.
+    """
+
+    n = len(motor.indptr) - 1
+    if destinos is None:
+        destinos = [v for v in range(n) if v != origem]
+
+    # --- Passos 0 e 1 (para todos os destinos): árvore completa e distâncias ---
+    dist, pred = dijkstra(motor, origem)
+
+    # árvore no grafo dividido: o nó v é alcançado por 2v (disjuntos em nós, com o arco
+    # interno 2v -> 2v+1) ou por 2v+1 (disjuntos em ligações, sem divisão)
+    s = 2 * origem + 1
+    pai = {}
+    for v, u in pred.items():
+        if ligacoes:
+            pai[2 * v + 1] = 2 * u + 1
+        else:
+            pai[2 * v] = 2 * u + 1
+            pai[2 * v + 1] = 2 * v
+
+    delta, via = suurballe_tarjan_labels(motor, s, pai, dist, ligacoes)
+
+    # intervalos da árvore (pré-ordem), para saber se um nó é descendente de outro
+    filhos = {}
+    for x, u in pai.items():
+        filhos.setdefault(u, []).append(x)
+    inicio, fim = {}, {}
+    pilha = [(s, False)]
+    while pilha:
+        x, saida = pilha.pop()
+        if saida:
+            fim[x] = len(inicio)
+        else:
+            inicio[x] = len(inicio)
+            pilha.append((x, True))
+            pilha.extend((f, False) for f in filhos.get(x, ()))
+
+    resultados = {}
+    for destino in destinos:
+        t = 2 * destino + (1 if ligacoes else 0)
+        if destino not in pred:
+            resultados[destino] = (None, None, None, None)
+        elif t not in delta:
+            P1 = tree_path(pred, origem, destino)
+            resultados[destino] = (P1, engine_path_cost(motor, P1), None, None)
+        else:
+            P1, P2 = suurballe_tarjan_pair(s, t, pai, via, inicio, fim)
+            resultados[destino] = (P1, engine_path_cost(motor, P1), P2, engine_path_cost(motor, P2))
+    return resultados
+
+# ------------------------------------------------------
+def suurballe_tarjan_labels(motor, s, pai, dist, ligacoes=False):
+    """!
+    @brief Marcações do algoritmo de Suurballe e Tarjan: custo do segundo caminho de todos os destinos.
+
+    Para cada nó y, delta(y) é o custo (reduzido) do caminho mais curto de s para y no grafo
+    residual de y (o grafo com o caminho da árvore até y invertido), ou seja, o custo total
+    do par de caminhos disjuntos até y menos 2 d(y). Os nós são marcados por ordem crescente
+    de delta, como no Dijkstra. Marcar v retira-o da árvore (de uma floresta que começa com
+    a árvore toda): a componente de v divide-se nas subárvores dos filhos de v e na parte
+    acima de v. Um arco (x, y) entre duas dessas partes dá a y o valor delta(v) + c'(x, y)
+    (c' é o custo reduzido), porque no grafo residual de y se chega de v a x sem custo
+    (descendo a árvore, ou subindo pelo caminho de y invertido e descendo de novo).
+    Só os nós das partes mais pequenas mudam de componente e só os seus arcos são
+    percorridos, pelo que cada nó muda O(log n) vezes e a pesquisa é O(m log n).
+
+    @param motor Grafo do motor.
+    @param s Índice da origem no grafo dividido (2 * origem + 1).
+    @param pai Dicionário com o pai de cada nó na árvore de caminhos mais curtos (grafo dividido).
+    @param dist Distâncias da origem a cada nó do grafo original (`dijkstra`).
+    @param ligacoes Booleano. Se True, nenhum nó é dividido (só os nós 2v+1 existem).
+    @return Tuple (delta, via): dicionários com delta(y) de cada nó marcado e com o par (v, x)
+            que o deu (o nó marcado v e o arco (x, y)), para reconstruir os caminhos.
+    """
+
+    indptr, indices, custo = motor.indptr, motor.indices, motor.custo
+    entrada = 1 if ligacoes else 0
+
+    # arcos que chegam a cada nó do grafo original: v -> lista de (u, custo)
+    anteriores = {}
+    for u in range(len(indptr) - 1):
+        for k in range(indptr[u], indptr[u + 1]):
+            anteriores.setdefault(indices[k], []).append((u, custo[k]))
+
+    def saidas(x):
+        # arcos (y, custo) do grafo dividido que saem de x
+        if not x & 1:
+            return ((x + 1, 0),)
+        u = x >> 1
+        return [(2 * indices[k] + entrada, custo[k]) for k in range(indptr[u], indptr[u + 1])]
+
+    def chegadas(y):
+        # arcos (x, custo) do grafo dividido que chegam a y
+        if y & 1 and not ligacoes:
+            return ((y - 1, 0),)
+        return [(2 * u + 1, c) for u, c in anteriores.get(y >> 1, ())]
+
+    filhos = {}
+    for x, u in pai.items():
+        filhos.setdefault(u, []).append(x)
+
+    def parte(raiz, c):
+        # nós da parte da componente c com esta raiz (percorridos um a um)
+        pilha = [raiz]
+        while pilha:
+            x = pilha.pop()
+            yield x
+            pilha.extend(f for f in filhos.get(x, ()) if comp.get(f) == c)
+
+    # componente de cada nó da árvore na floresta (-1 depois de marcado) e raiz de cada componente
+    comp = dict.fromkeys(pai, 0)
+    comp[s] = 0
+    raizes = {0: s}
+    novas = itertools.count(1)
+
+    delta = {s: 0}
+    via = {}
+    contador = itertools.count()
+    heap = [(0, next(contador), s)]
+    while heap:
+        d, _, v = heapq.heappop(heap)
+        if comp[v] < 0 or d > delta[v]:
+            continue
+
+        # --- retirar v da floresta: a componente divide-se nas subárvores dos filhos e na parte acima ---
+        antiga = comp[v]
+        comp[v] = -1
+        inicios = [f for f in filhos.get(v, ()) if comp[f] == antiga]
+        if raizes[antiga] != v:
+            inicios.append(raizes[antiga])
+
+        # as partes são percorridas em paralelo até só faltar uma (a maior, que mantém a componente)
+        percursos = [parte(raiz, antiga) for raiz in inicios]
+        nos = [[] for _ in inicios]
+        ativas = list(range(len(inicios)))
+        while len(ativas) > 1:
+            for i in list(ativas):
+                x = next(percursos[i], None)
+                if x is None:
+                    ativas.remove(i)
+                else:
+                    nos[i].append(x)
+        maior = ativas[0] if ativas else max(range(len(inicios)), key=lambda i: len(nos[i]), default=None)
+
+        mudados = []
+        componentes = {antiga}
+        for i, raiz in enumerate(inicios):
+            if i == maior:
+                raizes[antiga] = raiz
+                continue
+            nova = next(novas)
+            raizes[nova] = raiz
+            componentes.add(nova)
+            for x in nos[i]:
+                comp[x] = nova
+            mudados.extend(nos[i])
+
+        # --- arcos entre partes diferentes da componente antiga (exceto os arcos da árvore) ---
+        def relaxar(y, x, c):
+            nd = d + max(c + dist[x >> 1] - dist[y >> 1], 0)
+            if nd < delta.get(y, INF):
+                delta[y] = nd
+                via[y] = (v, x)
+                heapq.heappush(heap, (nd, next(contador), y))
+
+        for x in itertools.chain((v,), mudados):
+            for y, c in saidas(x):
+                if comp.get(y) in componentes and comp[y] != comp[x] and pai.get(y) != x:
+                    relaxar(y, x, c)
+        for y in mudados:
+            for x, c in chegadas(y):
+                if comp.get(x) in componentes and comp[x] != comp[y] and pai[y] != x:
+                    relaxar(y, x, c)
+
+    return delta, via
+
+# ------------------------------------------------------
+def suurballe_tarjan_pair(s, t, pai, via, inicio, fim):
+    """!
+    @brief Reconstrói o par de caminhos disjuntos de um destino a partir das marcações de Suurballe e Tarjan.
+
+    O segundo caminho (no grafo residual de t) é a sequência das marcações que levaram a t:
+    para cada marcação (v, x) de um nó z, o troço de v até x sem custo (subir pelos arcos
+    invertidos até um antecessor de x e descer a árvore) e o arco (x, z). Somado ao caminho
+    da árvore até t, com os arcos percorridos nos dois sentidos cancelados, dá um fluxo de
+    duas unidades de s para t, que é separado em dois caminhos.
+
+    @param s Índice da origem no grafo dividido.
+    @param t Índice do destino no grafo dividido.
+    @param pai Dicionário com o pai de cada nó na árvore (grafo dividido).
+    @param via Marcações devolvidas por `suurballe_tarjan_labels`.
+    @param inicio, fim Intervalos da árvore em pré-ordem: y é descendente de a se
+                       inicio[a] <= inicio[y] < fim[a].
+    @return Tuple (P1, P2) com os índices dos nós originais; o primeiro é o que tem menos
+            arcos no grafo dividido (como em `untangle_paths`).
+    """
+
+    fluxo = {}
+
+    def somar(a, b, f):
+        fluxo[(a, b)] = fluxo.get((a, b), 0) + f
+
+    # caminho da árvore até t
+    y = t
+    while y != s:
+        somar(pai[y], y, 1)
+        y = pai[y]
+
+    # segundo caminho: os troços de cada marcação até t
+    z = t
+    while z != s:
+        v, x = via[z]
+        a = v
+        while not inicio[a] <= inicio[x] < fim[a]:
+            somar(pai[a], a, -1)
+            a = pai[a]
+        b = x
+        while b != a:
+            somar(pai[b], b, 1)
+            b = pai[b]
+        somar(x, z, 1)
+        z = v
+
+    # arcos usados nos dois sentidos cancelam-se
+    sucessores = {}
+    for (a, b), f in fluxo.items():
+        if f > 0 and fluxo.get((b, a), 0) <= 0:
+            sucessores.setdefault(a, []).append(b)
+
+    caminhos = []
+    while sucessores.get(s) and len(caminhos) < 2:
+        caminho = [s]
+        posicao = {s: 0}
+        while caminho[-1] != t:
+            b = sucessores[caminho[-1]].pop()
+            if b in posicao:
+                # ciclo de custo nulo: é retirado do caminho
+                for x in caminho[posicao[b] + 1:]:
+                    del posicao[x]
+                del caminho[posicao[b] + 1:]
+            else:
+                posicao[b] = len(caminho)
+                caminho.append(b)
+        caminhos.append(caminho)
+    caminhos.sort(key=len)
+
+    return tuple(merge_engine_path(caminho) for caminho in caminhos)
+
+# ------------------------------------------------------
+def untangle_paths(P1_split, P2_split, s, t):
+    """!
+    @brief Desentrelaça dois caminhos do grafo residual (passo 4 do Suurballe e do Bhandari).
+
+    Os arcos de um caminho percorridos em sentido contrário pelo outro cancelam-se; os
+    arcos restantes formam dois caminhos disjuntos de s para t, que são separados
+    seguindo os arcos a partir de s e convertidos para os nós originais.
+
+    @param P1_split Primeiro caminho (índices do grafo dividido).
+    @param P2_split Segundo caminho, no grafo residual (índices do grafo dividido).
+    @param s Índice da origem no grafo dividido.
+    @param t Índice do destino no grafo dividido.
+    @return Tuple (P1, P2) com os índices dos nós originais; o primeiro é o que tem
+            menos arcos no grafo dividido.
+    """
+
+    arcos_P1 = set(zip(P1_split[:-1], P1_split[1:]))
+    arcos_P2 = set(zip(P2_split[:-1], P2_split[1:]))
+    sucessores = {}
+    for u, v in itertools.chain(zip(P1_split[:-1], P1_split[1:]), zip(P2_split[:-1], P2_split[1:])):
+        if (v, u) not in arcos_P1 and (v, u) not in arcos_P2:
+            sucessores.setdefault(u, []).append(v)
+
+    # cada arco é usado uma só vez (nos caminhos disjuntos em ligações, um nó pode ter dois sucessores)
+    caminhos = []
+    while sucessores.get(s):
+        caminho = [s]
+        while caminho[-1] != t:
+            caminho.append(sucessores[caminho[-1]].pop(0))
+        caminhos.append(caminho)
+    caminhos.sort(key=len)
+
+    return tuple(merge_engine_path(caminho) for caminho in caminhos)
+
+# ------------------------------------------------------
+def bhandari_path(motor, s, t, removidos, invertidos):
+    """!
+    @brief Caminho mais curto no grafo residual do Bhandari (com arcos de custo negativo).
+
+    O grafo residual é o grafo dividido implícito (ver `split_node`) sem os arcos de
+    `removidos`, mais os arcos de `invertidos` (os arcos de P1 invertidos, com o custo
+    simétrico). Como há arcos negativos, é usada a versão modificada do Dijkstra: um nó
+    já fixado volta ao heap se a sua distância diminuir, e a pesquisa só termina quando
+    o heap se esgota. Não há ciclos negativos, porque P1 é um caminho mais curto.
+
+    @param motor Grafo do motor (com os nós divididos marcados em `motor.nos_divididos`).
+    @param s Índice da origem no grafo dividido.
+    @param t Índice do destino no grafo dividido.
+    @param removidos Conjunto de arcos (x, y) do grafo dividido que não existem no residual.
+    @param invertidos Dicionário x -> lista de (y, custo) com os arcos acrescentados.
+    @return Lista de índices (do grafo dividido) do caminho, ou None se t não for alcançável.
+    """
+
+    indptr, indices, custo, divididos = motor.indptr, motor.indices, motor.custo, motor.nos_divididos
+    dist = {s: 0}
+    pred = {}
+    contador = itertools.count()
+
+    heap = [(0, next(contador), s)]
+    while heap:
+        d, _, x = heapq.heappop(heap)
+        if d > dist[x]:
+            continue
+
+        if x & 1:
+            u = x >> 1
+            arcos = []
+            for k in range(indptr[u], indptr[u + 1]):
+                v = indices[k]
+                y = 2 * v if divididos[v] else 2 * v + 1
+                if (x, y) not in removidos:
+                    arcos.append((y, custo[k]))
+        elif (x, x + 1) not in removidos:
+            arcos = [(x + 1, 0)]
+        else:
+            arcos = []
+        arcos.extend(invertidos.get(x, ()))
+
+        for y, c in arcos:
+            nd = d + c
+            # tolerância relativa: um ciclo de custo nulo (p.ex., um caminho alternativo com o
+            # mesmo custo de um troço de P1) pode ter soma ligeiramente negativa por arredondamento
+            if nd < dist.get(y, INF) - TOLERANCIA * abs(nd):
+                dist[y] = nd
+                pred[y] = x
+                heapq.heappush(heap, (nd, next(contador), y))
+
+    return tree_path(pred, s, t)
+
+# ------------------------------------------------------
+def bhandari_engine(motor, origem, destino, ligacoes=False):
+    """!
+    @brief Algoritmo de Bhandari (par de caminhos disjuntos de custo mínimo) sobre o grafo do motor.
+
+    1. caminho mais curto P1 (Dijkstra);
+    2. grafo residual: os arcos de P1 (e os opostos) são removidos e P1 é acrescentado
+       no sentido inverso, com custos negativos. Na versão disjunta em nós, os nós
+       intermédios de P1 são divididos (node splitting implícito, ver `split_node`);
+       na versão disjunta em ligações, nenhum nó é dividido;
+    3. caminho mais curto P2 no grafo residual, com o Dijkstra modificado (`bhandari_path`);
+    4. remoção dos arcos em comum (desentrelaçamento, ver `untangle_paths`).
+    Ao contrário do Suurballe, não há custos reduzidos.
+
+    @param motor Grafo do motor.
+    @param origem Índice do nó de origem.
+    @param destino Índice do nó de destino.
+    @param ligacoes Booleano. Se True, os caminhos são disjuntos em ligações (podem
+                    partilhar nós); caso contrário, são disjuntos em nós.
+    @return Tuple (P1, cost1, P2, cost2) com os caminhos em índices; None nos
+            elementos que não existirem.
+    """
+
+    # --- Passo 1: P1 ---
+    P1_original, _ = shortest_path_engine(motor, origem, destino)
+    if P1_original is None:
+        return None, None, None, None
+
+    with marked(motor.nos_divididos, () if ligacoes else P1_original[1:-1]):
+        s, t = 2 * origem + 1, split_node(motor, destino)
+        P1_split = split_path(motor, P1_original)
+
+        # --- Passo 2: grafo residual (sobreposição ao grafo do motor) ---
+        removidos, invertidos = residual_overlay(motor, zip(P1_split[:-1], P1_split[1:]))
+
+        # --- Passo 3: P2 no grafo residual ---
+        P2_split = bhandari_path(motor, s, t, removidos, invertidos)
+    if P2_split is None:
+        return P1_original, engine_path_cost(motor, P1_original), None, None
+
+    # --- Passo 4: remover os arcos em comum ---
+    P1, P2 = untangle_paths(P1_split, P2_split, s, t)
+
+    return P1, engine_path_cost(motor, P1), P2, engine_path_cost(motor, P2)
+
+# ------------------------------------------------------
+def k_disjoint_engine(motor, origem, destino, k, ligacoes=False):
+    """!
+    @brief k caminhos disjuntos de custo total mínimo (caminhos mais curtos sucessivos).
+
+    Generaliza o Suurballe a k >= 2 caminhos: o fluxo é aumentado de uma unidade de cada vez
+    pelo caminho mais curto no grafo residual (`residual_path`), com os potenciais de Johnson
+    atualizados após cada pesquisa (pi(x) += min(d(x), d(t))), o que mantém os custos reduzidos
+    não negativos. Os nós por onde passa fluxo são divididos (node splitting implícito) e
+    continuam divididos até ao fim, para que os potenciais dos nós 2v e 2v+1 se mantenham válidos.
+    No fim, o fluxo (conjunto de arcos do grafo original) é decomposto em caminhos.
+
+    @param motor Grafo do motor.
+    @param origem Índice do nó de origem.
+    @param destino Índice do nó de destino.
+    @param k Número de caminhos pretendido.
+    @param ligacoes Booleano. Se True, os caminhos são disjuntos em ligações (podem
+                    partilhar nós); caso contrário, são disjuntos em nós.
+    @return Lista de tuplos (caminho, custo), com os caminhos em índices, por ordem crescente
+            de custo. Se não existirem k caminhos disjuntos, são devolvidos os que existirem
+            (o maior número possível, com custo total mínimo); lista vazia se o destino não
+            for alcançável.
+    """
+
+    # fluxo: arcos (u, v) do grafo original, pela ordem em que foram acrescentados
+    fluxo = {}
+    divididos = []
+    # pi(x) = pot.get(x, 0) + acumulado (acumulado: soma dos d(t) das pesquisas anteriores)
+    pot = {}
+    acumulado = 0
+
+    for _ in range(k):
+        with marked(motor.nos_divididos, () if ligacoes else divididos):
+            s, t = 2 * origem + 1, split_node(motor, destino)
+            arcos = []
+            for u, v in fluxo:
+                x, y = 2 * u + 1, split_node(motor, v)
+                arcos.append((x, y))
+                if not y & 1:
+                    arcos.append((y, y + 1))
+            removidos, invertidos = residual_overlay(motor, arcos)
+
+            caminho, dist_r = residual_path(motor, s, t, removidos, invertidos,
+                                            lambda x: pot.get(x, 0) + acumulado)
+        if caminho is None:
+            break
+
+        # potenciais de Johnson: pi(x) += min(d(x), d(t))
+        d_t = dist_r[t]
+        for x, d in dist_r.items():
+            if d < d_t:
+                pot[x] = pot.get(x, 0) + d - d_t
+        acumulado += d_t
+
+        # aumento do fluxo: um arco percorrido em sentido inverso cancela o fluxo
+        for x, y in zip(caminho[:-1], caminho[1:]):
+            u, v = x >> 1, y >> 1
+            if u == v:
+                continue
+            if (v, u) in fluxo:
+                del fluxo[(v, u)]
+            else:
+                fluxo[(u, v)] = True
+                if not ligacoes and v != destino and v not in divididos:
+                    # novo nó dividido: a entrada fica com o potencial que o nó tinha
+                    if 2 * v + 1 in pot:
+                        pot[2 * v] = pot[2 * v + 1]
+                    divididos.append(v)
+
+    # --- decomposição do fluxo em caminhos ---
+    sucessores = {}
+    for u, v in fluxo:
+        sucessores.setdefault(u, []).append(v)
+    caminhos = []
+    while sucessores.get(origem):
+        caminho = [origem]
+        while caminho[-1] != destino:
+            caminho.append(sucessores[caminho[-1]].pop(0))
+        caminhos.append((caminho, engine_path_cost(motor, caminho)))
+    caminhos.sort(key=lambda par: par[1])
+
+    return caminhos
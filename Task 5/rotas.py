@@ -0,0 +1,232 @@
+import os
+import re
+import itertools
+from sndlib import *
+from cache import *
+
+"""!
+@file rotas.py
+@brief Módulo da cache de rotas pré-calculadas (secção ADMISSIBLE_PATHS).
+Guarda os pares de caminhos disjuntos calculados pelo TSA e pelo Suurballe num ficheiro auxiliar
+com a sintaxe SNDlib (secções DEMANDS e ADMISSIBLE_PATHS), para serem reutilizados em vez de recalculados.
+"""
+
+# identificadores dos caminhos de cada algoritmo na secção ADMISSIBLE_PATHS
+PATH_IDS = {'TSA': ('TSA_1', 'TSA_2'), 'SUR': ('SUR_1', 'SUR_2')}
+
+# extensão do ficheiro auxiliar de cada modo (caminhos disjuntos em nós / em ligações)
+ROUTES_EXTENSIONS = {False: '.paths', True: '.links.paths'}
+
+def routes_path(G, ligacoes=False):
+    """!
+    @brief Devolve o caminho do ficheiro auxiliar com as rotas de uma rede.
+
+    O ficheiro fica junto da entrada da cache compilada da rede e tem no nome a versão do
+    motor (p.ex., 'output/.cache/abilene.txt-<diretório>-<hash>.v2.paths'), pelo que uma
+    alteração ao ficheiro da rede ou ao motor (`ENGINE_VERSION`) invalida também as rotas
+    guardadas.
+    As rotas disjuntas em ligações ficam num ficheiro à parte
+    (p.ex., 'output/.cache/abilene.txt-<diretório>-<hash>.v2.links.paths').
+
+    @param G O grafo criado por `load_network` (com `G.graph['ficheiro']` e `G.graph['hash']`).
+    @param ligacoes Booleano. Se True, devolve o ficheiro das rotas disjuntas em ligações.
+    @return str: Caminho do ficheiro auxiliar, ou None se o grafo não vier de um ficheiro.
+            As redes abertas no formato CSR em disco (`RedeCSR`) não têm ficheiro de rotas
+            (os resultados ficam só no arquivo, ver `save_results`).
+    """
+
+    if isinstance(G, RedeCSR) or 'ficheiro' not in G.graph or 'hash' not in G.graph:
+        return None
+    base = os.path.splitext(cache_path(G.graph['ficheiro'], G.graph['hash']))[0]
+    return f"{base}.v{ENGINE_VERSION}{ROUTES_EXTENSIONS[ligacoes]}"
+
+# ------------------------------------------------------
+def remove_routes(G, ligacoes=False):
+    """!
+    @brief Apaga as rotas guardadas para uma rede.
+
+    @param G O grafo criado por `load_network`.
+    @param ligacoes Booleano. Se True, apaga as rotas disjuntas em ligações.
+    """
+
+    caminho = routes_path(G, ligacoes)
+    if caminho is not None and os.path.exists(caminho):
+        os.remove(caminho)
+
+# ------------------------------------------------------
+def iter_routes(G, ligacoes=False):
+    """!
+    @brief Lê as rotas guardadas para uma rede, um par de cada vez.
+
+    O ficheiro auxiliar é uma sequência de blocos (um por `append_routes`), cada um com uma
+    secção DEMANDS e a secção ADMISSIBLE_PATHS correspondente. Cada procura da secção DEMANDS
+    corresponde a um par (origem, destino) já calculado. Os caminhos da secção
+    ADMISSIBLE_PATHS (listas de ligações) são convertidos de volta em listas de nós, a partir
+    da origem. Um caminho que não aparece no ficheiro não existe (p.ex., quando o TSA não
+    encontrou o segundo caminho). Só os pares do bloco em leitura ficam em memória.
+    Se vários pares do bloco tiverem o mesmo identificador (como nos ficheiros escritos antes
+    de `append_routes` gerar identificadores únicos), cada registo da secção ADMISSIBLE_PATHS
+    é atribuído ao primeiro desses pares cujos extremos coincidem com os dos seus caminhos;
+    os registos que não correspondem a nenhum par são ignorados.
+
+    @param G O grafo criado por `load_network`.
+    @param ligacoes Booleano. Se True, lê as rotas disjuntas em ligações.
+    @return Gerador de tuplos `((origem, destino), {'TSA': [path1, path2], 'SUR': [P1, P2]})`,
+            com None nos caminhos inexistentes. Vazio se não houver rotas guardadas.
+    """
+
+    caminho = routes_path(G, ligacoes)
+    if caminho is None or not os.path.exists(caminho):
+        return
+
+    # extremos de cada ligação
+    extremos = {data['link']: (u, v) for u, v, data in G.edges(data=True) if 'link' in data}
+
+    procuras = {}   # demand_id -> lista de pares (origem, destino), no bloco em leitura
+    pendentes = {}  # pares do bloco em leitura ainda sem caminhos
+    anterior = None
+    with open(caminho, 'r') as file:
+        for seccao, campos in parse_sndlib(file):
+
+            # <demand_id> ( <source> <target> ) <routing_unit> <demand_value> <max_path_length>
+            if seccao == "DEMANDS":
+                if anterior == "ADMISSIBLE_PATHS":
+                    # novo bloco: os pares do anterior que ficaram sem caminhos
+                    yield from pendentes.items()
+                    procuras.clear()
+                    pendentes.clear()
+                procuras.setdefault(campos[0], []).append((campos[2], campos[3]))
+                pendentes[(campos[2], campos[3])] = {'TSA': [None, None], 'SUR': [None, None]}
+
+            # <demand_id> ( {<path_id> ( <link_id>+ )}+ )
+            elif seccao == "ADMISSIBLE_PATHS":
+                # caminhos do registo: (path_id, ligações)
+                caminhos = []
+                i = 2
+                while campos[i] != ')':
+                    fim = campos.index(')', i + 2)
+                    caminhos.append((campos[i], campos[i + 2:fim]))
+                    i = fim + 1
+
+                # primeiro par ainda pendente com este identificador cujos caminhos ligam a origem ao destino
+                par = None
+                for origem, destino in procuras.get(campos[0], ()):
+                    if (origem, destino) in pendentes:
+                        paths = [(path_id, links_path(extremos, origem, links)) for path_id, links in caminhos]
+                        if all(path is not None and path[-1] == destino for _, path in paths):
+                            par = (origem, destino)
+                            break
+
+                if par is not None:
+                    rota = pendentes.pop(par)
+                    for path_id, path in paths:
+                        for algoritmo, ids in PATH_IDS.items():
+                            if path_id in ids:
+                                rota[algoritmo][ids.index(path_id)] = path
+                    yield par, rota
+            anterior = seccao
+
+    yield from pendentes.items()
+
+# ------------------------------------------------------
+def links_path(extremos, origem, links):
+    """!
+    @brief Converte uma lista de ligações num caminho (lista de nós), a partir da origem.
+
+    @param extremos Dicionário link_id -> (u, v) com os extremos de cada ligação.
+    @param origem Nó de origem do caminho.
+    @param links Lista de identificadores das ligações, pela ordem do caminho.
+    @return Lista de nós do caminho, ou None se as ligações não formarem um caminho a partir da origem.
+    """
+
+    path = [origem]
+    for link in links:
+        u, v = extremos.get(link, (None, None))
+        if path[-1] == u:
+            path.append(v)
+        elif path[-1] == v:
+            path.append(u)
+        else:
+            return None
+    return path
+
+# ------------------------------------------------------
+def append_routes(G, rotas, ligacoes=False):
+    """!
+    @brief Acrescenta rotas de uma rede ao ficheiro auxiliar, com a sintaxe SNDlib.
+
+    As rotas são escritas num novo bloco no fim do ficheiro: os pares na secção DEMANDS e os
+    caminhos na secção ADMISSIBLE_PATHS, como listas de ligações. Cada par é identificado
+    pela procura da rede, quando existe, ou por `R<n>` (um contador do bloco, que salta os
+    identificadores das procuras), pelo que os identificadores de um bloco são únicos
+    (`<origem>_<destino>` não o seria: 'A_B'->'C' e 'A'->'B_C' dariam ambos 'A_B_C').
+    As rotas já guardadas não são reescritas. Quando o ficheiro é criado, as rotas antigas
+    da mesma rede (de outro hash ou de outra versão do motor) são apagadas.
+
+    @param G O grafo criado por `load_network`.
+    @param rotas Dicionário `{(origem, destino): {'TSA': [path1, path2], 'SUR': [P1, P2]}}`,
+                 só com os pares que ainda não estão no ficheiro.
+    @param ligacoes Booleano. Se True, as rotas são as disjuntas em ligações.
+    """
+
+    caminho = routes_path(G, ligacoes)
+    if caminho is None or not rotas:
+        return
+
+    # identificadores das procuras da rede
+    ids_procuras = {}
+    demands = G.graph.get('demands')
+    if demands is not None:
+        nomes = list(G.nodes)
+        for demand_id, origem, destino in zip(G.graph['demand_ids'].tolist(), demands['origem'].tolist(), demands['destino'].tolist()):
+            ids_procuras.setdefault((nomes[origem], nomes[destino]), demand_id)
+
+    # identificador de cada par (único no bloco)
+    usados = set(ids_procuras.values())
+    contador = (f"R{n}" for n in itertools.count(1))
+    ids_pares = {}
+    atribuidos = set()
+    for par in rotas:
+        demand_id = ids_procuras.get(par)
+        if demand_id is None or demand_id in atribuidos:
+            demand_id = next(novo for novo in contador if novo not in usados)
+        ids_pares[par] = demand_id
+        atribuidos.add(demand_id)
+
+    # o bloco é escrito de uma só vez, no fim do ficheiro
+    bloco = ["# DEMAND SECTION\n#\n# <demand_id> ( <source> <target> ) <routing_unit> <demand_value> <max_path_length>\n\nDEMANDS (\n"]
+    for origem, destino in rotas:
+        bloco.append(f"  {ids_pares[(origem, destino)]} ( {origem} {destino} ) 1 0.00 UNLIMITED\n")
+    bloco.append(")\n\n")
+
+    bloco.append("# ADMISSIBLE PATHS SECTION\n#\n# <demand_id> ( {<path_id> ( <link_id>+ )}+ )\n\nADMISSIBLE_PATHS ( \n")
+    for (origem, destino), rota in rotas.items():
+        caminhos = []
+        for algoritmo, ids in PATH_IDS.items():
+            for path_id, path in zip(ids, rota[algoritmo]):
+                # só caminhos válidos no grafo (com pelo menos uma ligação)
+                if path and len(path) > 1 and all(G.has_edge(u, v) for u, v in zip(path[:-1], path[1:])):
+                    links = " ".join(G[u][v]['link'] for u, v in zip(path[:-1], path[1:]))
+                    caminhos.append(f"{path_id} ( {links} )")
+        if caminhos:
+            bloco.append(f"  {ids_pares[(origem, destino)]} ( {' '.join(caminhos)} )\n")
+    bloco.append(")\n\n")
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    novo = not os.path.exists(caminho)
+    with open(caminho, 'a') as file:
+        if novo:
+            nome = os.path.splitext(os.path.basename(G.graph['ficheiro']))[0]
+            file.write(f"?SNDlib native format; type: network; version: 1.0\n# network {nome} (admissible paths)\n\n")
+        file.write("".join(bloco))
+    if not novo:
+        return
+
+    # rotas antigas da mesma rede e do mesmo modo (de outro hash ou de outra versão do motor):
+    # '<nome>-<diretório>-<hash>.v<versão>.paths' (ou '.links.paths'), e as anteriores à versão
+    # no nome, '<nome>-<diretório>-<hash>.paths'
+    antigas = re.compile(re.escape(os.path.basename(caminho).rsplit('-', 1)[0] + '-')
+                         + r"[0-9a-f]{16}(?:\.v\d+)?" + re.escape(ROUTES_EXTENSIONS[ligacoes]))
+    for ficheiro in os.listdir(CACHE_DIR):
+        if antigas.fullmatch(ficheiro) and ficheiro != os.path.basename(caminho):
+            os.remove(os.path.join(CACHE_DIR, ficheiro))
@@ -0,0 +1,78 @@
+"""!
+@file sndlib.py
+@brief Módulo de leitura do formato nativo SNDlib.
+Contém um leitor sequencial (linha a linha) que reconhece todas as secções de um ficheiro SNDlib
+(META, NODES, LINKS, DEMANDS e ADMISSIBLE_PATHS) sem copiar o texto completo para memória.
+"""
+
+SECCOES_SNDLIB = ("META", "NODES", "LINKS", "DEMANDS", "ADMISSIBLE_PATHS")
+
+def parse_sndlib(linhas):
+    """!
+    @brief Lê um ficheiro SNDlib (formato nativo) de forma sequencial e devolve os seus registos.
+
+    As linhas são consumidas uma a uma a partir de um iterável (p.ex., um ficheiro aberto),
+    pelo que o texto nunca é guardado na íntegra nem dividido em listas intermédias.
+    Linhas vazias, comentários ('#') e o cabeçalho ('?SNDlib ...') são ignorados.
+    Cada registo é devolvido assim que fica completo. Um registo pode ocupar várias linhas
+    (como acontece na secção ADMISSIBLE_PATHS): as linhas são acumuladas até os parênteses
+    ficarem equilibrados.
+
+    Os campos de cada registo são os tokens separados por espaços, com os parênteses
+    como tokens próprios. Exemplo (secção LINKS):
+    `L1 ( N1 N6 ) 11000.00 0.00 67.80 0.00 ( 1000.00 950000.00 )` ->
+    `['L1', '(', 'N1', 'N6', ')', '11000.00', '0.00', '67.80', '0.00', '(', '1000.00', '950000.00', ')']`
+
+    Na secção META, cujos valores são texto livre, cada registo é `[atributo, conteudo]`.
+
+    @param linhas Iterável de strings (linhas do ficheiro), p.ex. um objeto ficheiro.
+    @return Gerador de tuplos (seccao, campos):
+        - seccao (str): Nome da secção do registo (um de `SECCOES_SNDLIB`).
+        - campos (list): Lista de tokens do registo.
+    @note Secções desconhecidas são ignoradas por completo.
+    """
+
+    seccao = None       # secção atual (None fora de qualquer secção)
+    ignorar = False     # True dentro de uma secção desconhecida
+    registo = []        # tokens do registo em construção
+    profundidade = 0    # parênteses abertos no registo em construção
+
+    for linha in linhas:
+        linha = linha.strip()
+
+        # linhas vazias, comentários e cabeçalho
+        if not linha or linha[0] == '#' or linha[0] == '?':
+            continue
+
+        # fora de uma secção: procura o início da próxima
+        if seccao is None and not ignorar:
+            nome = linha.split('(', 1)[0].strip()
+            if nome in SECCOES_SNDLIB:
+                seccao = nome
+            elif linha.endswith('('):
+                ignorar = True
+            continue
+
+        # fim da secção
+        if profundidade == 0 and linha == ')':
+            seccao = None
+            ignorar = False
+            continue
+
+        if ignorar:
+            continue
+
+        # META: <attribute> = <content>
+        if seccao == "META":
+            atributo, _, conteudo = linha.partition('=')
+            yield seccao, [atributo.strip(), conteudo.strip()]
+            continue
+
+        campos = linha.replace('(', ' ( ').replace(')', ' ) ').split()
+        registo.extend(campos)
+        profundidade += campos.count('(') - campos.count(')')
+
+        # registo completo
+        if profundidade == 0:
+            yield seccao, registo
+            registo = []
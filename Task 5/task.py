@@ -1,3 +1,6 @@
+import argparse
+import cache
+import calculos
 from functions import *
 from menus import *
 from draw import *
@@ -9,7 +12,11 @@ from calculos import *
 
 @section intro_sec Introdução
 Este programa implementa e compara dois algoritmos para encontrar pares de caminhos
-disjuntos em grafos de rede: o Two-Step Approach (TSA) e o algoritmo de Suurballe.
+disjuntos em grafos de rede: o Two-Step Approach (TSA) e o algoritmo de Suurballe
+(e, como alternativa ao Suurballe, o algoritmo de Bhandari). Permite ainda encontrar
+k caminhos disjuntos de custo total mínimo (p.ex., três caminhos para proteção 1+2).
+Os caminhos podem ser disjuntos em nós ou, quando basta a diversidade das ligações,
+disjuntos em ligações (sem node splitting, sobre o grafo original).
 Permite ao utilizador carregar redes, selecionar nós de origem e destino, executar
 os algoritmos e visualizar os resultados. Adicionalmente, oferece funcionalidades
 para realizar cálculos estatísticos comparativos entre os algoritmos.
@@ -17,20 +24,40 @@ para realizar cálculos estatísticos comparativos entre os algoritmos.
 @section dependencies Dependências
 - Python 3.x
 - NetworkX: Para manipulação de grafos.
+- NumPy: Para a matriz de procuras.
 - Matplotlib: Para visualização de grafos.
 - Módulos locais:
     - functions.py: Contém as implementações dos algoritmos (retrieve_data, find_best_paths, suurballe, etc.).
+    - motor.py: Motor de cálculo sobre o grafo CSR, com os índices inteiros dos nós (tsa_engine, tsa_source_engine, suurballe_engine, suurballe_source_engine, k_disjoint_engine).
+    - sndlib.py: Leitor sequencial do formato SNDlib (parse_sndlib).
+    - csr.py: Grafo em arrays no formato CSR e formato em disco mapeado em memória (graph_to_csr, sndlib_to_csr, open_csr).
+    - cache.py: Cache compilada das redes em 'output/.cache' e grafos em disco (load_network, load_csr, load_large_network).
+    - catalogo.py: Catálogo das redes, lidas em segundo plano no arranque (start_catalog, get_network).
+    - rotas.py: Cache de rotas calculadas, na sintaxe ADMISSIBLE_PATHS (iter_routes, append_routes).
+    - arquivo.py: Arquivo SQLite dos resultados por par, com consultas (query_pairs, tsa_failures, top_tsa_errors).
+    - gerador.py: Gerador de topologias sintéticas em ficheiros SNDlib (`python gerador.py waxman 1000 --seed 1`).
     - menus.py: Funções para interação com o utilizador através de menus (ask_network, ask_origin_destiny, etc.).
-    - draw.py: Funções para desenhar os grafos e caminhos (draw_network, draw_empty_network, draw_suurballe).
+    - draw.py: Funções para desenhar os grafos e caminhos (draw_network, draw_k_paths, draw_empty_network, draw_suurballe).
     - calculos.py: Funções para realizar cálculos estatísticos (calculo_taxa_resolusao, etc.).
 
 @section execution Como Executar
 1. Certifique-se de que todas as dependências estão instaladas.
-2. Coloque os ficheiros de rede (formato .txt esperado) no diretório 'networks/'.
+2. Coloque os ficheiros de rede (formato SNDlib .txt ou .xml) no diretório 'networks/'.
 3. Execute o script `task.py` a partir da linha de comandos: `python task.py`
+   (opcionalmente com outros diretórios de redes: `python task.py outras_redes/`, e com o
+   número de processos dos cálculos estatísticos: `python task.py --workers 32`).
 4. Siga as instruções apresentadas nos menus.
 
 @note O programa cria um diretório 'output/' para guardar as imagens geradas dos grafos.
+@note As redes grandes (ficheiros com pelo menos `GRANDE_REDE` bytes; ver `--grande`) são abertas
+      no formato CSR em disco, mapeadas em memória e sem grafo NetworkX (`load_large_network`):
+      para estas redes só estão disponíveis os cálculos estatísticos do TSA e do Suurballe.
+@note Desde o motor CSR (motor.py), o primeiro caminho do TSA é obtido com o Dijkstra do motor,
+      que desempata os caminhos mais curtos com o mesmo custo de forma diferente do NetworkX.
+      Os resultados do Suurballe não mudam, mas os do TSA podem mudar nos pares com empates:
+      p.ex., em nobel-germany (disjuntos em nós) o TSA resolve 108 pares em vez de 107 (102
+      ótimos em vez de 101) e um par de nobel-eu tem outro custo. Os valores obtidos com as
+      versões anteriores não devem ser comparados diretamente com os atuais.
 """
 
 def main():
@@ -58,6 +85,10 @@ def main():
             
             if G is None and node_mapping is None:
                 continue
+            # redes grandes: sem grafo NetworkX, não podem ser desenhadas
+            if isinstance(G, RedeCSR):
+                show_large_network()
+                continue
 
             draw_empty_network(G, node_mapping)
 
@@ -86,7 +117,9 @@ def main():
                 @return custo2 Custo do segundo caminho.
                 """
                 # encontrar os caminhos mais curtos
-                caminho1, custo1, caminho2, custo2 = find_best_paths(G, origem, destino, algoritmo=algoritmo)
+                ligacoes = ask_disjoint_type()
+                clear_screen()
+                caminho1, custo1, caminho2, custo2 = find_best_paths(G, origem, destino, algoritmo=algoritmo, ligacoes=ligacoes)
 
                 """!
                 @brief Desenha o grafo com os caminhos encontrados.
@@ -103,15 +136,32 @@ def main():
 
             if algoritmo == 2:
 
-                option = ask_skip_forward()
-                caminho_sur, _, caminho3, _ = suurballe(G, origem, destino, algoritmo=algoritmo, option=option, calculo=False)
+                ligacoes = ask_disjoint_type()
+                # os passos intermédios só são desenhados com node splitting (disjuntos em nós)
+                option = True if ligacoes else ask_skip_forward()
+                caminho_sur, _, caminho3, _ = suurballe(G, origem, destino, algoritmo=algoritmo, option=option, calculo=False, ligacoes=ligacoes)
                 draw_network(G, node_mapping, origem, destino, None, None, caminho_sur, caminho3, algoritmo=algoritmo)            
             if algoritmo == 3:
 
                 option = 0
-                caminho_tsa, custo1, caminho2, custo2 = find_best_paths(G, origem, destino, algoritmo=algoritmo)
-                caminho_sur, _, caminho3, _ = suurballe(G, origem, destino, algoritmo=algoritmo, option=option, calculo=False)
+                ligacoes = ask_disjoint_type()
+                clear_screen()
+                caminho_tsa, custo1, caminho2, custo2 = find_best_paths(G, origem, destino, algoritmo=algoritmo, ligacoes=ligacoes)
+                caminho_sur, _, caminho3, _ = suurballe(G, origem, destino, algoritmo=algoritmo, option=option, calculo=False, ligacoes=ligacoes)
                 draw_network(G, node_mapping, origem, destino, caminho_tsa, caminho2, caminho_sur, caminho3, algoritmo=algoritmo)
+            if algoritmo == 4:
+
+                ligacoes = ask_disjoint_type()
+                clear_screen()
+                caminho_bh, _, caminho3, _ = bhandari(G, origem, destino, algoritmo=algoritmo, calculo=False, ligacoes=ligacoes)
+                draw_network(G, node_mapping, origem, destino, None, None, caminho_bh, caminho3, algoritmo=algoritmo)
+            if algoritmo == 5:
+
+                k = ask_number_paths()
+                ligacoes = ask_disjoint_type()
+                clear_screen()
+                caminhos, _ = k_disjoint_paths(G, origem, destino, k, algoritmo=algoritmo, calculo=False, ligacoes=ligacoes)
+                draw_k_paths(G, node_mapping, origem, destino, caminhos)
 
 
         elif escolha == 2:
@@ -119,13 +169,33 @@ def main():
             if G is None and node_mapping is None:
                 continue
             escolha = ask_which_calculus()
+            # a comparação dos tempos do Suurballe e do Bhandari usa o grafo NetworkX
+            if escolha == 4 and isinstance(G, RedeCSR):
+                show_large_network()
+                continue
+
+            if escolha in [1, 2, 3, 6]:
+                ligacoes = ask_disjoint_type()
+
+            # pares analisados: todos ou os da matriz de procuras (se a rede a tiver)
+            pares = None
+            if escolha in [1, 2, 3, 5, 6]:
+                procuras = demand_pairs(G, node_mapping)
+                if procuras and ask_pairs_type(len(procuras)):
+                    pares = procuras
 
             if escolha == 1: 
-                calculo_taxa_resolusao(G)
+                calculo_taxa_resolusao(G, ligacoes, pares)
             if escolha == 2:
-                calculo_taxa_resolusao_otima(G)
+                calculo_taxa_resolusao_otima(G, ligacoes, pares)
             if escolha == 3:
-                calculo_erro(G)
+                calculo_erro(G, ligacoes, pares)
+            if escolha == 4:
+                calculo_tempos(G)
+            if escolha == 5:
+                calculo_taxa_resolusao_modos(G, pares)
+            if escolha == 6:
+                calculo_estatisticas(G, ligacoes, pares)
         elif escolha == 3:
             clear_screen()
             print("Obrigad@! Volte Sempre!")
@@ -140,4 +210,22 @@ if __name__ == "__main__":
     # Cria o diretório 'output' se não existir
     if not os.path.exists("output"):
         os.makedirs("output")
+    parser = argparse.ArgumentParser(description="Caminhos disjuntos: TSA, Suurballe e Bhandari.")
+    parser.add_argument("diretorios", nargs="*", help="diretórios com mais redes, além de 'networks/'")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processos usados nos cálculos estatísticos (0: um por CPU)")
+    parser.add_argument("--checkpoint", type=float, default=calculos.CHECKPOINT_SEGUNDOS,
+                        help="segundos entre os pontos de retoma guardados nos cálculos estatísticos")
+    parser.add_argument("--recomecar", action="store_true",
+                        help="recalcula as estatísticas de cada rede (uma vez por sessão) em vez de retomar os resultados guardados")
+    parser.add_argument("--grande", type=float, default=cache.GRANDE_REDE / 2**20,
+                        help="tamanho (em MB) a partir do qual uma rede é aberta no formato CSR em disco, sem grafo NetworkX")
+    args = parser.parse_args()
+
+    calculos.WORKERS = args.workers
+    calculos.CHECKPOINT_SEGUNDOS = args.checkpoint
+    calculos.RETOMAR = not args.recomecar
+    cache.GRANDE_REDE = int(args.grande * 2**20)
+    # lê todas as redes em segundo plano ('networks/' e os diretórios passados como argumentos)
+    start_catalog(NETWORK_DIRS + tuple(args.diretorios))
     main()
\ No newline at end of file
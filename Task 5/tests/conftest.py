@@ -0,0 +1,34 @@
+import os
+import sys
+import pytest
+
+# os módulos do projeto importam-se uns aos outros pelo nome, como quando task.py é
+# executado a partir do diretório 'Task 5'
+TASK_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, TASK_DIR)
+
+# rede pequena (formato SNDlib nativo) usada nos testes
+REDE = """?SNDlib native format; type: network; version: 1.0
+NODES (
+  A ( 0.00 0.00 )
+  B ( 1.00 0.00 )
+  C ( 1.00 1.00 )
+  D ( 0.00 1.00 )
+)
+LINKS (
+  L1 ( A B ) 0.00 0.00 0.00 0.00 ( 1.00 1.00 )
+  L2 ( B C ) 0.00 0.00 0.00 0.00 ( 1.00 1.00 )
+  L3 ( C D ) 0.00 0.00 0.00 0.00 ( 1.00 1.00 )
+  L4 ( D A ) 0.00 0.00 0.00 0.00 ( 1.00 1.00 )
+)
+"""
+
+@pytest.fixture
+def rede(tmp_path, monkeypatch):
+    """!
+    @brief Ficheiro da rede de teste, num diretório de trabalho temporário (com o seu 'output/.cache').
+    """
+
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "rede.txt").write_text(REDE)
+    return "rede.txt"
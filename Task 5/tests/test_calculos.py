@@ -0,0 +1,52 @@
+import os
+import shutil
+import pytest
+import cache
+from conftest import TASK_DIR
+from calculos import *
+from catalogo import *
+
+# estatísticas esperadas com o motor atual (ver NOTA_TSA): (total_pares, pares_validos,
+# resolvidos_tsa, resolvidos_sur, resolvidos_otimos, erro_medio). Com o NetworkX das versões
+# anteriores, nobel-germany em nós dava 107 pares resolvidos pelo TSA e 101 ótimos
+ESTATISTICAS = [
+    ("abilene", False, (66, 50, 50, 55, 50, 0.0)),
+    ("abilene", True, (66, 50, 50, 55, 50, 0.0)),
+    ("atlanta", False, (105, 96, 96, 105, 92, 1.5192324259531382)),
+    ("atlanta", True, (105, 105, 105, 105, 95, 1.3945841166037392)),
+    ("nobel-eu", False, (378, 327, 327, 378, 283, 1.008318751437894)),
+    ("nobel-eu", True, (378, 378, 378, 378, 325, 0.9204642022106901)),
+    ("nobel-germany", False, (136, 108, 108, 136, 102, 1.0389966439250857)),
+    ("nobel-germany", True, (136, 136, 136, 136, 128, 0.5367474264851656)),
+]
+
+@pytest.mark.parametrize("nome, ligacoes, esperado", ESTATISTICAS)
+def test_calculos_auxiliares_networks(nome, ligacoes, esperado, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    shutil.copy(os.path.join(TASK_DIR, "networks", f"{nome}.txt"), tmp_path)
+    G, _ = load_network(f"{nome}.txt")
+
+    *contagens, erro_medio = calculos_auxiliares(G, otimo=True, calcular_erro_medio=True,
+                                                 ligacoes=ligacoes, workers=1, retomar=False)
+
+    assert tuple(contagens) == esperado[:-1]
+    assert erro_medio == pytest.approx(esperado[-1])
+
+@pytest.mark.parametrize("workers", [1, 2])
+@pytest.mark.parametrize("nome, ligacoes, esperado", ESTATISTICAS[-2:])
+def test_calculos_auxiliares_large_network(nome, ligacoes, esperado, workers, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(cache, "GRANDE_REDE", 0)
+    monkeypatch.setattr("catalogo.load_network", None)
+    shutil.copy(os.path.join(TASK_DIR, "networks", f"{nome}.txt"), tmp_path)
+
+    # a rede grande vem do catálogo no formato CSR em disco, sem grafo NetworkX
+    rede, node_mapping = get_network(f"{nome}.txt")
+    assert isinstance(rede, RedeCSR) and node_mapping is None
+
+    *contagens, erro_medio = calculos_auxiliares(rede, otimo=True, calcular_erro_medio=True,
+                                                 ligacoes=ligacoes, workers=workers, retomar=False)
+
+    assert tuple(contagens) == esperado[:-1]
+    assert erro_medio == pytest.approx(esperado[-1])
+    assert load_record(rede, ligacoes) == sweep_record(rede, ligacoes=ligacoes)
@@ -0,0 +1,21 @@
+import os
+from rotas import *
+
+def test_append_routes_removes_unversioned_routes(rede):
+    G, _ = load_network(rede)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+
+    # rotas de outra versão do ficheiro, sem a versão do motor no nome (anteriores a ENGINE_VERSION)
+    prefixo = os.path.basename(routes_path(G)).rsplit('-', 1)[0]
+    antiga = os.path.join(CACHE_DIR, f"{prefixo}-0123456789abcdef.paths")
+    antiga_ligacoes = os.path.join(CACHE_DIR, f"{prefixo}-0123456789abcdef.links.paths")
+    for ficheiro in (antiga, antiga_ligacoes):
+        open(ficheiro, 'w').close()
+
+    append_routes(G, {('A', 'C'): {'TSA': [['A', 'B', 'C'], ['A', 'D', 'C']],
+                                   'SUR': [['A', 'B', 'C'], ['A', 'D', 'C']]}})
+
+    assert os.path.exists(routes_path(G))
+    assert not os.path.exists(antiga)
+    # as rotas do outro modo (disjuntas em ligações) não são tocadas
+    assert os.path.exists(antiga_ligacoes)